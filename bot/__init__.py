@@ -6,12 +6,12 @@ from inspect import signature
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from pyrogram import Client as tgClient, enums, utils as pyroutils
 from pymongo import MongoClient
-from asyncio import Lock
+from asyncio import Lock, wait
 from dotenv import load_dotenv, dotenv_values
 from threading import Thread
 from time import sleep, time
 from subprocess import Popen, run as srun
-from os import remove as osremove, path as ospath, environ, getcwd
+from os import remove as osremove, path as ospath, environ, getcwd, stat
 from aria2p import API as ariaAPI, Client as ariaClient
 from qbittorrentapi import Client as qbClient
 from socket import setdefaulttimeout
@@ -29,6 +29,8 @@ from logging import (
 )
 from uvloop import install
 
+from bot.helper.ext_utils.task_registry import TaskRegistry
+
 # from faulthandler import enable as faulthandler_enable
 # faulthandler_enable()
 
@@ -67,10 +69,12 @@ aria2_options = {}
 qbit_options = {}
 queued_dl = {}
 queued_up = {}
+queued_proc = {}
 bot_cache = {}
 bot_cache["pkgs"] = ["7z", "rclone", "ffmpeg"]
 non_queued_dl = set()
 non_queued_up = set()
+non_queued_proc = set()
 
 
 try:
@@ -85,7 +89,7 @@ status_reply_dict_lock = Lock()
 queue_dict_lock = Lock()
 qb_listener_lock = Lock()
 status_reply_dict = {}
-download_dict = {}
+download_dict = TaskRegistry()
 rss_dict = {}
 
 BOT_TOKEN = environ.get("BOT_TOKEN", "")
@@ -235,10 +239,33 @@ if len(EXCEP_CHATS) == 0:
     EXCEP_CHATS = ""
 
 
+PRE_UPLOADS = {}
+
+
+def reuse_uploads(client):
+    # Pyrogram's send_* methods only take a path and upload it inside save_file,
+    # so TgUploader's parts pushed ahead of posting are handed back here by inode.
+    save_file = client.save_file
+
+    async def reuse_save_file(path, *args, **kwargs):
+        task = None
+        if PRE_UPLOADS and isinstance(path, str) and ospath.isfile(path):
+            st = stat(path)
+            task = PRE_UPLOADS.pop((client, st.st_dev, st.st_ino), None)
+        if task is not None:
+            await wait([task])
+            if not task.cancelled() and task.exception() is None and task.result():
+                return task.result()
+        return await save_file(path, *args, **kwargs)
+
+    client.save_file = reuse_save_file
+    return client
+
+
 def wztgClient(*args, **kwargs):
     if "max_concurrent_transmissions" in signature(tgClient.__init__).parameters:
         kwargs["max_concurrent_transmissions"] = 1000
-    return tgClient(*args, **kwargs)
+    return reuse_uploads(tgClient(*args, **kwargs))
 
 
 IS_PREMIUM_USER = False
@@ -269,6 +296,9 @@ if len(MEGA_EMAIL) == 0 or len(MEGA_PASSWORD) == 0:
 
 METADATA = environ.get("METADATA", "")
 
+METADATA_WORKERS = environ.get("METADATA_WORKERS", "")
+METADATA_WORKERS = 4 if len(METADATA_WORKERS) == 0 else int(METADATA_WORKERS)
+
 GDTOT_CRYPT = environ.get("GDTOT_CRYPT", "")
 if len(GDTOT_CRYPT) == 0:
     GDTOT_CRYPT = ""
@@ -388,6 +418,13 @@ QUEUE_DOWNLOAD = "" if len(QUEUE_DOWNLOAD) == 0 else int(QUEUE_DOWNLOAD)
 QUEUE_UPLOAD = environ.get("QUEUE_UPLOAD", "")
 QUEUE_UPLOAD = "" if len(QUEUE_UPLOAD) == 0 else int(QUEUE_UPLOAD)
 
+QUEUE_PROCESS = environ.get("QUEUE_PROCESS", "")
+QUEUE_PROCESS = "" if len(QUEUE_PROCESS) == 0 else int(QUEUE_PROCESS)
+
+QUEUE_MODE = environ.get("QUEUE_MODE", "").lower()
+if QUEUE_MODE not in ["fifo", "sjf"]:
+    QUEUE_MODE = "fair"
+
 INCOMPLETE_TASK_NOTIFIER = environ.get("INCOMPLETE_TASK_NOTIFIER", "")
 INCOMPLETE_TASK_NOTIFIER = INCOMPLETE_TASK_NOTIFIER.lower() == "true"
 
@@ -418,6 +455,9 @@ SHOW_MEDIAINFO = SHOW_MEDIAINFO.lower() == "true"
 SCREENSHOTS_MODE = environ.get("SCREENSHOTS_MODE", "")
 SCREENSHOTS_MODE = SCREENSHOTS_MODE.lower() == "true"
 
+SCREENSHOTS_SHEET = environ.get("SCREENSHOTS_SHEET", "")
+SCREENSHOTS_SHEET = SCREENSHOTS_SHEET.lower() == "true"
+
 SOURCE_LINK = environ.get("SOURCE_LINK", "")
 SOURCE_LINK = SOURCE_LINK.lower() == "true"
 
@@ -427,6 +467,18 @@ DELETE_LINKS = DELETE_LINKS.lower() == "true"
 EQUAL_SPLITS = environ.get("EQUAL_SPLITS", "")
 EQUAL_SPLITS = EQUAL_SPLITS.lower() == "true"
 
+STREAM_LEECH = environ.get("STREAM_LEECH", "")
+STREAM_LEECH = STREAM_LEECH.lower() == "true"
+
+UPLOAD_LOOKAHEAD = environ.get("UPLOAD_LOOKAHEAD", "")
+UPLOAD_LOOKAHEAD = 2 if len(UPLOAD_LOOKAHEAD) == 0 else int(UPLOAD_LOOKAHEAD)
+
+TG_DOWNLOAD_WORKERS = environ.get("TG_DOWNLOAD_WORKERS", "")
+TG_DOWNLOAD_WORKERS = 4 if len(TG_DOWNLOAD_WORKERS) == 0 else int(TG_DOWNLOAD_WORKERS)
+
+TG_UPLOAD_WORKERS = environ.get("TG_UPLOAD_WORKERS", "")
+TG_UPLOAD_WORKERS = 4 if len(TG_UPLOAD_WORKERS) == 0 else int(TG_UPLOAD_WORKERS)
+
 MEDIA_GROUP = environ.get("MEDIA_GROUP", "")
 MEDIA_GROUP = MEDIA_GROUP.lower() == "true"
 
@@ -569,6 +621,9 @@ SAVE_MSG = SAVE_MSG.lower() == "true"
 SAFE_MODE = environ.get("SAFE_MODE", "")
 SAFE_MODE = SAFE_MODE.lower() == "true"
 
+PERF_SPANS_DB = environ.get("PERF_SPANS_DB", "")
+PERF_SPANS_DB = PERF_SPANS_DB.lower() == "true"
+
 SET_COMMANDS = environ.get("SET_COMMANDS", "")
 SET_COMMANDS = SET_COMMANDS.lower() == "true"
 
@@ -691,6 +746,10 @@ config_dict = {
     "GDTOT_CRYPT": GDTOT_CRYPT,
     "JIODRIVE_TOKEN": JIODRIVE_TOKEN,
     "EQUAL_SPLITS": EQUAL_SPLITS,
+    "STREAM_LEECH": STREAM_LEECH,
+    "UPLOAD_LOOKAHEAD": UPLOAD_LOOKAHEAD,
+    "TG_DOWNLOAD_WORKERS": TG_DOWNLOAD_WORKERS,
+    "TG_UPLOAD_WORKERS": TG_UPLOAD_WORKERS,
     "EXTENSION_FILTER": EXTENSION_FILTER,
     "GDRIVE_ID": GDRIVE_ID,
     "INCOMPLETE_TASK_NOTIFIER": INCOMPLETE_TASK_NOTIFIER,
@@ -711,10 +770,13 @@ config_dict = {
     "MEGA_EMAIL": MEGA_EMAIL,
     "MEGA_PASSWORD": MEGA_PASSWORD,
     "METADATA": METADATA,
+    "METADATA_WORKERS": METADATA_WORKERS,
     "OWNER_ID": OWNER_ID,
     "QUEUE_ALL": QUEUE_ALL,
     "QUEUE_DOWNLOAD": QUEUE_DOWNLOAD,
     "QUEUE_UPLOAD": QUEUE_UPLOAD,
+    "QUEUE_PROCESS": QUEUE_PROCESS,
+    "QUEUE_MODE": QUEUE_MODE,
     "RCLONE_FLAGS": RCLONE_FLAGS,
     "RCLONE_PATH": RCLONE_PATH,
     "RCLONE_SERVE_URL": RCLONE_SERVE_URL,
@@ -725,12 +787,14 @@ config_dict = {
     "RSS_DELAY": RSS_DELAY,
     "SAVE_MSG": SAVE_MSG,
     "SAFE_MODE": SAFE_MODE,
+    "PERF_SPANS_DB": PERF_SPANS_DB,
     "SEARCH_API_LINK": SEARCH_API_LINK,
     "SEARCH_LIMIT": SEARCH_LIMIT,
     "SEARCH_PLUGINS": SEARCH_PLUGINS,
     "SET_COMMANDS": SET_COMMANDS,
     "SHOW_MEDIAINFO": SHOW_MEDIAINFO,
     "SCREENSHOTS_MODE": SCREENSHOTS_MODE,
+    "SCREENSHOTS_SHEET": SCREENSHOTS_SHEET,
     "CLEAN_LOG_MSG": CLEAN_LOG_MSG,
     "SHOW_EXTRA_CMDS": SHOW_EXTRA_CMDS,
     "SOURCE_LINK": SOURCE_LINK,
@@ -35,6 +35,8 @@ from bot import (
 )
 from bot.version import get_version
 from .helper.ext_utils.fs_utils import start_cleanup, clean_all, exit_clean_up
+from .helper.ext_utils.sys_monitor import sys_sampler
+from .helper.ext_utils.bot_metrics import metrics_publisher
 from .helper.ext_utils.bot_utils import (
     get_readable_time,
     cmd_exec,
@@ -86,6 +88,7 @@ from .modules import (
     gd_clean,
     broadcast,
     category_select,
+    perf,
 )
 
 
@@ -384,6 +387,8 @@ async def main():
         log_check(),
     )
     await sync_to_async(start_aria2_listener, wait=False)
+    bot.loop.create_task(sys_sampler())
+    bot.loop.create_task(metrics_publisher())
 
     bot.add_handler(
         MessageHandler(start, filters=command(BotCommands.StartCommand) & private)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+from os import replace as osreplace
+from time import monotonic
+from asyncio import sleep
+from contextlib import contextmanager
+from aiofiles import open as aiopen
+
+from bot import LOGGER, queued_dl, queued_up, queued_proc
+from bot.helper.ext_utils.status_snapshot import get_status_snapshot
+
+METRICS_FILE = "metrics.prom"
+PUBLISH_INTERVAL = 5
+COUNTERS = {}
+SUBPROCS = {}
+LOOP_LAG = [0]
+
+
+def inc_metric(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    COUNTERS[key] = COUNTERS.get(key, 0) + value
+
+
+@contextmanager
+def subprocess_metric(tool):
+    start = monotonic()
+    SUBPROCS[tool] = SUBPROCS.get(tool, 0) + 1
+    try:
+        yield
+    finally:
+        SUBPROCS[tool] -= 1
+        inc_metric("wzml_subprocess_total", tool=tool)
+        inc_metric("wzml_subprocess_seconds_total", monotonic() - start, tool=tool)
+
+
+def __escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def __sample(name, value, labels=()):
+    if not labels:
+        return f"{name} {value}"
+    labels = ",".join(f'{key}="{__escape(val)}"' for key, val in labels)
+    return f"{name}{{{labels}}} {value}"
+
+
+def __family(lines, name, mtype, samples):
+    lines.append(f"# TYPE {name} {mtype}")
+    lines.extend(__sample(name, value, labels) for labels, value in samples)
+
+
+async def __render():
+    snapshot = await get_status_snapshot(PUBLISH_INTERVAL)
+    tasks = {}
+    for task in snapshot.tasks:
+        key = (("engine", task.eng), ("status", task.status))
+        tasks[key] = tasks.get(key, 0) + 1
+    speeds = snapshot.totals(lambda task: task.eng)
+    lines = []
+    __family(lines, "wzml_tasks", "gauge", tasks.items())
+    __family(
+        lines,
+        "wzml_queue_depth",
+        "gauge",
+        [
+            ((("queue", "dl"),), len(queued_dl)),
+            ((("queue", "up"),), len(queued_up)),
+            ((("queue", "proc"),), len(queued_proc)),
+        ],
+    )
+    __family(
+        lines,
+        "wzml_download_bytes_per_second",
+        "gauge",
+        [((("engine", eng),), speed[0]) for eng, speed in speeds.items()],
+    )
+    __family(
+        lines,
+        "wzml_upload_bytes_per_second",
+        "gauge",
+        [((("engine", eng),), speed[1]) for eng, speed in speeds.items()],
+    )
+    __family(
+        lines,
+        "wzml_subprocess_running",
+        "gauge",
+        [((("tool", tool),), count) for tool, count in SUBPROCS.items()],
+    )
+    __family(lines, "wzml_event_loop_lag_seconds", "gauge", [((), LOOP_LAG[0])])
+    families = {}
+    for (name, labels), value in list(COUNTERS.items()):
+        families.setdefault(name, []).append((labels, value))
+    for name, samples in families.items():
+        __family(lines, name, "counter", samples)
+    return "\n".join(lines) + "\n"
+
+
+async def metrics_publisher():
+    while True:
+        try:
+            text = await __render()
+            async with aiopen(f"{METRICS_FILE}.tmp", "w") as f:
+                await f.write(text)
+            osreplace(f"{METRICS_FILE}.tmp", METRICS_FILE)
+        except Exception as e:
+            LOGGER.error(f"Metrics Publisher: {e}")
+        start = monotonic()
+        await sleep(PUBLISH_INTERVAL)
+        LOOP_LAG[0] = max(monotonic() - start - PUBLISH_INTERVAL, 0)
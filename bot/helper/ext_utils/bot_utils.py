@@ -6,22 +6,16 @@ from os import path as ospath
 from pkg_resources import get_distribution, DistributionNotFound
 from aiofiles import open as aiopen
 from aiofiles.os import remove as aioremove, path as aiopath, mkdir
-from re import match as re_match
+from re import match as re_match, findall as re_findall
 from time import time
 from html import escape
 from uuid import uuid4
 from subprocess import run as srun
 from psutil import (
-    disk_usage,
-    disk_io_counters,
     Process,
-    cpu_percent,
-    swap_memory,
     cpu_count,
     cpu_freq,
     getloadavg,
-    virtual_memory,
-    net_io_counters,
     boot_time,
 )
 from asyncio import (
@@ -35,7 +29,6 @@ from functools import partial, wraps
 from concurrent.futures import ThreadPoolExecutor
 
 from aiohttp import ClientSession as aioClientSession
-from psutil import virtual_memory, cpu_percent, disk_usage
 from requests import get as rget
 from mega import MegaApi
 from pyrogram.enums import ChatType
@@ -43,7 +36,8 @@ from pyrogram.types import BotCommand
 from pyrogram.errors import PeerIdInvalid
 
 from bot.helper.ext_utils.db_handler import DbManger
-from bot.helper.themes import BotTheme
+from bot.helper.ext_utils.sys_monitor import get_sys_sample, get_sys_rates
+from bot.helper.themes import BotTheme, BotThemes
 from bot.version import get_version
 from bot import (
     OWNER_ID,
@@ -55,6 +49,8 @@ from bot import (
     aria2,
     download_dict,
     download_dict_lock,
+    status_reply_dict,
+    status_reply_dict_lock,
     botStartTime,
     user_data,
     config_dict,
@@ -71,9 +67,6 @@ THREADPOOL = ThreadPoolExecutor(max_workers=1000)
 MAGNET_REGEX = r"magnet:\?xt=urn:(btih|btmh):[a-zA-Z0-9]*\s*"
 URL_REGEX = r"^(?!\/)(rtmps?:\/\/|mms:\/\/|rtsp:\/\/|https?:\/\/|ftp:\/\/)?([^\/:]+:[^\/@]+@)?(www\.)?(?=[^\/:\s]+\.[^\/:\s]+)([^\/:\s]+\.[^\/:\s]+)(:\d+)?(\/[^#\s]*[\s\S]*)?(\?[^#\s]*)?(#.*)?$"
 SIZE_UNITS = ["B", "KB", "MB", "GB", "TB", "PB", "EB"]
-STATUS_START = 0
-PAGES = 1
-PAGE_NO = 1
 
 
 class MirrorStatus:
@@ -82,6 +75,7 @@ class MirrorStatus:
     STATUS_CLONING = "Clone"
     STATUS_QUEUEDL = "QueueDL"
     STATUS_QUEUEUP = "QueueUp"
+    STATUS_QUEUEPR = "QueuePr"
     STATUS_PAUSED = "Pause"
     STATUS_ARCHIVING = "Archive"
     STATUS_EXTRACTING = "Extract"
@@ -118,26 +112,31 @@ def get_readable_file_size(size_in_bytes):
     )
 
 
+def get_size_bytes(size_text):
+    if not (size := re_match(r"([\d.]+)\s*([KMGTPE]?)I?B", size_text.upper())):
+        return 0
+    return float(size.group(1)) * 1024 ** ("BKMGTPE".index(size.group(2) or "B"))
+
+
 async def getDownloadByGid(gid):
     async with download_dict_lock:
-        return next((dl for dl in download_dict.values() if dl.gid() == gid), None)
+        return download_dict.by_gid(gid)
 
 
 async def getAllDownload(req_status, user_id=None):
-    dls = []
-    async with download_dict_lock:
-        for dl in list(download_dict.values()):
-            if user_id and user_id != dl.message.from_user.id:
-                continue
-            status = dl.status()
-            if req_status in ["all", status]:
-                dls.append(dl)
-    return dls
+    if user_id:
+        async with download_dict_lock:
+            dls = download_dict.by_user(user_id)
+    else:
+        dls = [dl for _, dl in download_dict.published[1]]
+    if req_status == "all":
+        return dls
+    return [dl for dl in dls if dl.status() == req_status]
 
 
 async def get_user_tasks(user_id, maxtask):
-    if tasks := await getAllDownload("all", user_id):
-        return len(tasks) >= maxtask
+    async with download_dict_lock:
+        return download_dict.user_count(user_id) >= maxtask
 
 
 def bt_selection_buttons(id_):
@@ -254,117 +253,148 @@ class EngineStatus:
         self.STATUS_RCLONE = f"RClone {version_cache['rclone']}"
 
 
-def get_readable_message():
-    msg = ""
+class TaskMetrics:
+    __slots__ = ("processed", "total", "speed", "eta", "engine", "up_speed", "uploaded")
+
+    def __init__(
+        self, processed=0, total=0, speed=0, eta=None, engine="", up_speed=0, uploaded=0
+    ):
+        self.processed = processed or 0
+        self.total = total or 0
+        self.speed = speed or 0
+        if eta is None and self.speed > 0:
+            eta = max(self.total - self.processed, 0) / self.speed
+        self.eta = eta
+        self.engine = engine
+        self.up_speed = up_speed or 0
+        self.uploaded = uploaded or 0
+
+    @property
+    def progress(self):
+        try:
+            return min(self.processed / self.total * 100, 100)
+        except ZeroDivisionError:
+            return 0
+
+
+def get_status_pages(tasks):
+    STATUS_LIMIT = config_dict["STATUS_LIMIT"]
+    return max((tasks + STATUS_LIMIT - 1) // STATUS_LIMIT, 1)
+
+
+def get_readable_message(snapshot, page_no=1):
     button = None
     STATUS_LIMIT = config_dict["STATUS_LIMIT"]
-    tasks = len(download_dict)
-    globals()["PAGES"] = (tasks + STATUS_LIMIT - 1) // STATUS_LIMIT
-    if PAGE_NO > PAGES and PAGES != 0:
-        globals()["STATUS_START"] = STATUS_LIMIT * (PAGES - 1)
-        globals()["PAGE_NO"] = PAGES
-    for download in list(download_dict.values())[
-        STATUS_START : STATUS_LIMIT + STATUS_START
-    ]:
+    tasks = len(snapshot.tasks)
+    PAGES = get_status_pages(tasks)
+    PAGE_NO = min(page_no, PAGES)
+    STATUS_START = STATUS_LIMIT * (PAGE_NO - 1)
+    parts = []
+    for task in snapshot.tasks[STATUS_START : STATUS_LIMIT + STATUS_START]:
         msg_link = (
-            download.message.link
-            if download.message.chat.type in [ChatType.SUPERGROUP, ChatType.CHANNEL]
+            task.message.link
+            if task.message.chat.type in [ChatType.SUPERGROUP, ChatType.CHANNEL]
             and not config_dict["DELETE_LINKS"]
             else ""
         )
-        elapsed = time() - download.message.date.timestamp()
-        msg += BotTheme(
-            "STATUS_NAME",
-            Name=(
-                "Task is being Processed!"
-                if config_dict["SAFE_MODE"]
-                and elapsed >= config_dict["STATUS_UPDATE_INTERVAL"]
-                else escape(f"{download.name()}")
-            ),
+        elapsed = time() - task.message.date.timestamp()
+        metrics = task.metrics
+        parts.append(
+            (
+                "STATUS_NAME",
+                {
+                    "Name": (
+                        "Task is being Processed!"
+                        if config_dict["SAFE_MODE"]
+                        and elapsed >= config_dict["STATUS_UPDATE_INTERVAL"]
+                        else escape(f"{task.name}")
+                    )
+                },
+            )
         )
-        if download.status() not in [
+        if task.status not in [
             MirrorStatus.STATUS_SPLITTING,
             MirrorStatus.STATUS_SEEDING,
             MirrorStatus.STATUS_METADATA,
         ]:
-            msg += BotTheme(
-                "BAR",
-                Bar=f"{get_progress_bar_string(download.progress())} {download.progress()}",
-            )
-            msg += BotTheme(
-                "PROCESSED",
-                Processed=f"{download.processed_bytes()} of {download.size()}",
-            )
-            msg += BotTheme("STATUS", Status=download.status(), Url=msg_link)
-            msg += BotTheme("ETA", Eta=download.eta())
-            msg += BotTheme("SPEED", Speed=download.speed())
-            msg += BotTheme("ELAPSED", Elapsed=get_readable_time(elapsed))
-            msg += BotTheme("ENGINE", Engine=download.eng())
-            msg += BotTheme("STA_MODE", Mode=download.upload_details["mode"])
-            if hasattr(download, "seeders_num"):
-                try:
-                    msg += BotTheme("SEEDERS", Seeders=download.seeders_num())
-                    msg += BotTheme("LEECHERS", Leechers=download.leechers_num())
-                except Exception:
-                    pass
-        elif download.status() == MirrorStatus.STATUS_SEEDING:
-            msg += BotTheme("STATUS", Status=download.status(), Url=msg_link)
-            msg += BotTheme("SEED_SIZE", Size=download.size())
-            msg += BotTheme("SEED_SPEED", Speed=download.upload_speed())
-            msg += BotTheme("UPLOADED", Upload=download.uploaded_bytes())
-            msg += BotTheme("RATIO", Ratio=download.ratio())
-            msg += BotTheme("TIME", Time=download.seeding_time())
-            msg += BotTheme("SEED_ENGINE", Engine=download.eng())
+            parts += [
+                (
+                    "BAR",
+                    {
+                        "Bar": f"{get_progress_bar_string(metrics.progress)} {round(metrics.progress, 2)}%"
+                    },
+                ),
+                (
+                    "PROCESSED",
+                    {
+                        "Processed": f"{get_readable_file_size(metrics.processed)} of {get_readable_file_size(metrics.total)}"
+                    },
+                ),
+                (
+                    "STATUS",
+                    {
+                        "Status": (
+                            f"{task.status} #{task.queue_pos}"
+                            if task.queue_pos
+                            else task.status
+                        ),
+                        "Url": msg_link,
+                    },
+                ),
+                (
+                    "ETA",
+                    {
+                        "Eta": (
+                            get_readable_time(metrics.eta)
+                            if metrics.eta is not None
+                            else "-"
+                        )
+                    },
+                ),
+                ("SPEED", {"Speed": f"{get_readable_file_size(metrics.speed)}/s"}),
+                ("ELAPSED", {"Elapsed": get_readable_time(elapsed)}),
+                ("ENGINE", {"Engine": task.eng}),
+                ("STA_MODE", {"Mode": task.mode}),
+            ]
+            if task.seeders is not None:
+                parts += [
+                    ("SEEDERS", {"Seeders": task.seeders}),
+                    ("LEECHERS", {"Leechers": task.leechers}),
+                ]
+        elif task.status == MirrorStatus.STATUS_SEEDING:
+            parts += [
+                ("STATUS", {"Status": task.status, "Url": msg_link}),
+                ("SEED_SIZE", {"Size": get_readable_file_size(metrics.total)}),
+                (
+                    "SEED_SPEED",
+                    {"Speed": f"{get_readable_file_size(metrics.up_speed)}/s"},
+                ),
+                ("UPLOADED", {"Upload": get_readable_file_size(metrics.uploaded)}),
+                ("RATIO", {"Ratio": task.ratio}),
+                ("TIME", {"Time": task.seeding_time}),
+                ("SEED_ENGINE", {"Engine": task.eng}),
+            ]
         else:
-            msg += BotTheme("STATUS", Status=download.status(), Url=msg_link)
-            msg += BotTheme("STATUS_SIZE", Size=download.size())
-            msg += BotTheme("NON_ENGINE", Engine=download.eng())
-
-        msg += BotTheme("USER", User=download.message.from_user.mention(style="html"))
-        msg += BotTheme("ID", Id=download.message.from_user.id)
-        if (download.eng()).startswith("qBit"):
-            msg += BotTheme(
-                "BTSEL", Btsel=f"/{BotCommands.BtSelectCommand}_{download.gid()}"
+            parts += [
+                ("STATUS", {"Status": task.status, "Url": msg_link}),
+                ("STATUS_SIZE", {"Size": get_readable_file_size(metrics.total)}),
+                ("NON_ENGINE", {"Engine": task.eng}),
+            ]
+
+        parts += [
+            ("USER", {"User": task.message.from_user.mention(style="html")}),
+            ("ID", {"Id": task.message.from_user.id}),
+        ]
+        if task.eng.startswith("qBit"):
+            parts.append(
+                ("BTSEL", {"Btsel": f"/{BotCommands.BtSelectCommand}_{task.gid}"})
             )
-        msg += BotTheme(
-            "CANCEL", Cancel=f"/{BotCommands.CancelMirror}_{download.gid()}"
-        )
+        parts.append(("CANCEL", {"Cancel": f"/{BotCommands.CancelMirror}_{task.gid}"}))
 
-    if len(msg) == 0:
+    if not parts:
         return None, None
 
-    dl_speed = 0
-
-    def convert_speed_to_bytes_per_second(spd):
-        if "K" in spd:
-            return float(spd.split("K")[0]) * 1024
-        elif "M" in spd:
-            return float(spd.split("M")[0]) * 1048576
-        elif "G" in spd:
-            return float(spd.split("G")[0]) * 1073741824
-        elif "T" in spd:
-            return float(spd.split("T")[0]) * 1099511627776
-        else:
-            return 0
-
-    dl_speed = 0
-    up_speed = 0
-    for download in download_dict.values():
-        tstatus = download.status()
-        spd = (
-            download.speed()
-            if tstatus != MirrorStatus.STATUS_SEEDING
-            else download.upload_speed()
-        )
-        speed_in_bytes_per_second = convert_speed_to_bytes_per_second(spd)
-        if tstatus == MirrorStatus.STATUS_DOWNLOADING:
-            dl_speed += speed_in_bytes_per_second
-        elif tstatus in [
-            MirrorStatus.STATUS_UPLOADING,
-            MirrorStatus.STATUS_SEEDING,
-        ]:
-            up_speed += speed_in_bytes_per_second
-
+    msg = BotThemes(parts)
     msg += BotTheme("FOOTER")
     buttons = ButtonMaker()
     buttons.ibutton(BotTheme("REFRESH", Page=f"{PAGE_NO}/{PAGES}"), "status ref")
@@ -383,37 +413,30 @@ def get_readable_message():
         buttons.ibutton(BotTheme("REFRESH", Page=f"{PAGE_NO}/{PAGES}"), "status ref")
         buttons.ibutton(BotTheme("NEXT"), "status nex")
     button = buttons.build_menu(3)
-    msg += BotTheme("Cpu", cpu=cpu_percent())
+    sample = get_sys_sample()
+    msg += BotTheme("Cpu", cpu=sample.cpu)
     msg += BotTheme(
         "FREE",
-        free=get_readable_file_size(disk_usage(config_dict["DOWNLOAD_DIR"]).free),
-        free_p=round(100 - disk_usage(config_dict["DOWNLOAD_DIR"]).percent, 1),
+        free=get_readable_file_size(sample.disk.free),
+        free_p=round(100 - sample.disk.percent, 1),
     )
-    msg += BotTheme("Ram", ram=virtual_memory().percent)
+    msg += BotTheme("Ram", ram=sample.memory.percent)
     msg += BotTheme("uptime", uptime=get_readable_time(time() - botStartTime))
-    msg += BotTheme("DL", DL=get_readable_file_size(dl_speed))
-    msg += BotTheme("UL", UL=get_readable_file_size(up_speed))
+    msg += BotTheme("DL", DL=get_readable_file_size(snapshot.dl_speed))
+    msg += BotTheme("UL", UL=get_readable_file_size(snapshot.up_speed))
     return msg, button
 
 
-async def turn_page(data):
-    STATUS_LIMIT = config_dict["STATUS_LIMIT"]
-    global STATUS_START, PAGE_NO
-    async with download_dict_lock:
+async def turn_page(data, chat_id):
+    PAGES = get_status_pages(len(download_dict.published[1]))
+    async with status_reply_dict_lock:
+        if not (status := status_reply_dict.get(chat_id)):
+            return
+        PAGE_NO = min(status[2], PAGES)
         if data[1] == "nex":
-            if PAGE_NO == PAGES:
-                STATUS_START = 0
-                PAGE_NO = 1
-            else:
-                STATUS_START += STATUS_LIMIT
-                PAGE_NO += 1
+            status[2] = 1 if PAGE_NO == PAGES else PAGE_NO + 1
         elif data[1] == "pre":
-            if PAGE_NO == 1:
-                STATUS_START = STATUS_LIMIT * (PAGES - 1)
-                PAGE_NO = PAGES
-            else:
-                STATUS_START -= STATUS_LIMIT
-                PAGE_NO -= 1
+            status[2] = PAGES if PAGE_NO == 1 else PAGE_NO - 1
 
 
 def get_readable_time(seconds):
@@ -426,6 +449,13 @@ def get_readable_time(seconds):
     return result
 
 
+def get_time_seconds(time_text):
+    if not (times := re_findall(r"([\d.]+)([wdhms])", time_text)):
+        return None
+    periods = {"w": 604800, "d": 86400, "h": 3600, "m": 60, "s": 1}
+    return sum(float(value) * periods[period] for value, period in times)
+
+
 def is_magnet(url):
     return bool(re_match(MAGNET_REGEX, url))
 
@@ -619,6 +649,28 @@ async def compare_versions(v1, v2):
     return "Already up to date with latest version"
 
 
+def __format_rates(rates, index):
+    return " | ".join(
+        f"{get_readable_file_size(rate[index])}/s" if rate else "N/A" for rate in rates
+    )
+
+
+async def get_official_version():
+    branch = config_dict["UPSTREAM_BRANCH"]
+    cached = bot_cache.get("official_version")
+    if cached and cached[0] == branch and time() - cached[1] < 3600:
+        return cached[2]
+    official_v = (
+        await cmd_exec(
+            f"curl -o latestversion.py https://raw.githubusercontent.com/weebzone/WZML-X/{branch}/bot/version.py -s && python3 latestversion.py && rm latestversion.py",
+            True,
+        )
+    )[0]
+    if official_v:
+        bot_cache["official_version"] = (branch, time(), official_v)
+    return official_v
+
+
 async def get_stats(event, key="home"):
     user_id = event.from_user.id
     btns = ButtonMaker()
@@ -631,10 +683,11 @@ async def get_stats(event, key="home"):
         btns.ibutton("Bot Limits", f"wzmlx {user_id} stats botlimits")
         msg = "⌬ <b><i>Bot & OS Statistics!</i></b>"
     elif key == "stbot":
-        total, used, free, disk = disk_usage("/")
-        swap = swap_memory()
-        memory = virtual_memory()
-        disk_io = disk_io_counters()
+        sample = get_sys_sample()
+        total, used, free, disk = sample.root_disk
+        swap = sample.swap
+        memory = sample.memory
+        disk_io = sample.disk_io
         msg = BotTheme(
             "BOT_STATS",
             bot_uptime=get_readable_time(time() - botStartTime),
@@ -665,19 +718,24 @@ async def get_stats(event, key="home"):
             disk_f=get_readable_file_size(free),
         )
     elif key == "stsys":
-        cpuUsage = cpu_percent(interval=0.5)
+        sample = get_sys_sample()
+        cpuUsage = sample.cpu
+        net_io = sample.net_io
+        rates = [get_sys_rates(period) for period in (60, 300, 900)]
         msg = BotTheme(
             "SYS_STATS",
             os_uptime=get_readable_time(time() - boot_time()),
             os_version=platform.version(),
             os_arch=platform.platform(),
-            up_data=get_readable_file_size(net_io_counters().bytes_sent),
-            dl_data=get_readable_file_size(net_io_counters().bytes_recv),
-            pkt_sent=str(net_io_counters().packets_sent)[:-3],
-            pkt_recv=str(net_io_counters().packets_recv)[:-3],
-            tl_data=get_readable_file_size(
-                net_io_counters().bytes_recv + net_io_counters().bytes_sent
-            ),
+            up_data=get_readable_file_size(net_io.bytes_sent),
+            dl_data=get_readable_file_size(net_io.bytes_recv),
+            pkt_sent=str(net_io.packets_sent)[:-3],
+            pkt_recv=str(net_io.packets_recv)[:-3],
+            tl_data=get_readable_file_size(net_io.bytes_recv + net_io.bytes_sent),
+            up_rate=__format_rates(rates, 0),
+            dl_rate=__format_rates(rates, 1),
+            read_rate=__format_rates(rates, 2),
+            write_rate=__format_rates(rates, 3),
             cpu=cpuUsage,
             cpu_bar=get_progress_bar_string(cpuUsage),
             cpu_freq=(
@@ -708,12 +766,7 @@ async def get_stats(event, key="home"):
                     "git log -1 --pretty=format:'<code>%s</code> <b>By</b> %an'", True
                 )
             )[0]
-        official_v = (
-            await cmd_exec(
-                f"curl -o latestversion.py https://raw.githubusercontent.com/weebzone/WZML-X/{config_dict['UPSTREAM_BRANCH']}/bot/version.py -s && python3 latestversion.py && rm latestversion.py",
-                True,
-            )
-        )[0]
+        official_v = await get_official_version()
         msg = BotTheme(
             "REPO_STATS",
             last_commit=last_commit,
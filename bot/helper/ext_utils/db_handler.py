@@ -241,6 +241,12 @@ class DbManger:
         self.__conn.close
         return notifier_dict  # return a dict ==> {cid: {tag: [{_id: source}, {_id, source}, ...]}}
 
+    async def add_perf_spans(self, spans):
+        if self.__err:
+            return
+        await self.__db.perf[bot_id].insert_many(spans)
+        self.__conn.close
+
     async def trunc_table(self, name):
         if self.__err:
             return
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+from shutil import disk_usage
+
+from bot import DOWNLOAD_DIR, config_dict, download_dict
+from bot.helper.ext_utils.leech_utils import SPLIT_QUEUE_SIZE
+
+DISK_LEDGER = {}
+DISK_WAITING = {}
+
+
+def estimate_stages(size, listener):
+    stages = {"download": size}
+    if listener.extract:
+        stages["extract"] = size
+    if listener.user_dict.get("lmeta") or config_dict["METADATA"]:
+        stages["metadata"] = size
+    split_size = listener.user_dict.get("split_size") or config_dict["LEECH_SPLIT_SIZE"]
+    if listener.compress:
+        pswd = isinstance(listener.compress, str) and listener.compress
+        if listener.isLeech and size > split_size and not pswd:
+            stages["compress"] = min(size, split_size * (SPLIT_QUEUE_SIZE + 2))
+        elif listener.isLeech or pswd or listener.upPath in ["gd", "ddl"]:
+            stages["compress"] = size
+    elif listener.isLeech and size > split_size:
+        stages["split"] = (
+            size
+            if listener.seed and not listener.extract
+            else min(size, split_size * (2 * SPLIT_QUEUE_SIZE + 1))
+        )
+    return stages
+
+
+def __outstanding(uid, stages):
+    outstanding = sum(stages.values())
+    if "download" in stages and (task := download_dict.get(uid)) is not None:
+        try:
+            processed = task.metrics().processed
+        except Exception:
+            processed = 0
+        outstanding -= min(processed, stages["download"])
+    return outstanding
+
+
+def reserved_bytes(exclude=None):
+    return sum(
+        __outstanding(uid, stages)
+        for uid, stages in list(DISK_LEDGER.items())
+        if uid != exclude and uid not in DISK_WAITING
+    )
+
+
+def reserve_disk(uid, stages, threshold):
+    usage = disk_usage(DOWNLOAD_DIR)
+    need = sum(stages.values())
+    if need > usage.total - threshold:
+        return False
+    DISK_LEDGER[uid] = stages
+    if usage.free - reserved_bytes(uid) - need < threshold:
+        DISK_WAITING[uid] = threshold
+    return True
+
+
+def reserve_stage(uid, stage, size):
+    if uid in DISK_LEDGER:
+        DISK_LEDGER[uid][stage] = size
+
+
+def release_stage(uid, stage):
+    if uid in DISK_LEDGER:
+        DISK_LEDGER[uid].pop(stage, None)
+
+
+def release_disk(uid, keep=None):
+    stages = DISK_LEDGER.pop(uid, None)
+    DISK_WAITING.pop(uid, None)
+    if stages and keep in stages:
+        DISK_LEDGER[uid] = {keep: stages[keep]}
+
+
+def disk_ready(order):
+    if not DISK_WAITING:
+        return order
+    free = disk_usage(DOWNLOAD_DIR).free - reserved_bytes()
+    ready = []
+    for uid in order:
+        if (threshold := DISK_WAITING.get(uid)) is None:
+            ready.append(uid)
+            continue
+        need = sum(DISK_LEDGER.get(uid, {}).values())
+        if free - need >= threshold:
+            free -= need
+            del DISK_WAITING[uid]
+            ready.append(uid)
+    return ready
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+from os import link, remove, read, write, sendfile
+from errno import EXDEV, ENOSYS, EINVAL, EOPNOTSUPP, EBADF, EPERM
+from fcntl import ioctl
+from shutil import copymode, move
+from contextlib import suppress
+
+try:
+    from os import copy_file_range
+except ImportError:
+    copy_file_range = None
+
+FICLONE = 0x40049409
+COPY_CHUNK = 1073741824
+FALLBACK_ERRNOS = [EXDEV, ENOSYS, EINVAL, EOPNOTSUPP, EBADF, EPERM]
+
+
+def __stream(copier, src_fd, dst_fd):
+    copied = 0
+    while True:
+        try:
+            sent = copier(src_fd, dst_fd)
+        except OSError as e:
+            if copied == 0 and e.errno in FALLBACK_ERRNOS:
+                return False
+            raise
+        if sent == 0:
+            return True
+        copied += sent
+
+
+def __copy_data(src_fd, dst_fd):
+    if copy_file_range is not None and __stream(
+        lambda src, dst: copy_file_range(src, dst, COPY_CHUNK), src_fd, dst_fd
+    ):
+        return
+    if __stream(lambda src, dst: sendfile(dst, src, None, COPY_CHUNK), src_fd, dst_fd):
+        return
+    while chunk := read(src_fd, 8388608):
+        write(dst_fd, chunk)
+
+
+def copy_file(src, dst, hardlink=True):
+    with suppress(FileNotFoundError):
+        remove(dst)
+    if hardlink:
+        try:
+            link(src, dst)
+            return dst
+        except OSError:
+            pass
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        try:
+            ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            __copy_data(fsrc.fileno(), fdst.fileno())
+    copymode(src, dst)
+    return dst
+
+
+def concat_files(parts, dst):
+    with open(dst, "wb") as fdst:
+        for part in parts:
+            with open(part, "rb") as fsrc:
+                __copy_data(fsrc.fileno(), fdst.fileno())
+    return dst
+
+
+def move_path(src, dst):
+    return move(src, dst, copy_function=lambda s, d: copy_file(s, d, False))
@@ -1,19 +1,24 @@
 #!/usr/bin/env python3
 from os import walk, path as ospath
 from aiofiles.os import remove as aioremove, path as aiopath, listdir, rmdir, makedirs
-from aioshutil import rmtree as aiormtree, move
+from aioshutil import rmtree as aiormtree
 from asyncio import create_subprocess_exec
 from asyncio.subprocess import PIPE
-from shutil import rmtree, disk_usage
+from shutil import rmtree, disk_usage, copyfileobj
+from zipfile import ZipFile, ZipInfo
 from magic import Magic
-from re import split as re_split, I, search as re_search
+from re import split as re_split, I, search as re_search, findall as re_findall
 from subprocess import run as srun
 from sys import exit as sexit
 from bot import bot_cache
 
 from .exceptions import NotSupportedExtractionArchive
 from bot import aria2, LOGGER, DOWNLOAD_DIR, get_client, GLOBAL_EXTENSION_FILTER
-from bot.helper.ext_utils.bot_utils import sync_to_async, cmd_exec
+from bot.helper.ext_utils.bot_utils import sync_to_async, async_to_sync
+from bot.helper.ext_utils.bot_metrics import subprocess_metric
+from bot.helper.ext_utils.media_probe import get_media_probe
+from bot.helper.ext_utils.mkv_tags import edit_mkv_tags
+from bot.helper.ext_utils.file_ops import concat_files, move_path
 
 ARCH_EXT = [
     ".tar.bz2",
@@ -59,6 +64,8 @@ FIRST_SPLIT_REGEX = r"(\.|_)part0*1\.rar$|(\.|_)7z\.0*1$|(\.|_)zip\.0*1$|^(?!.*(
 
 SPLIT_REGEX = r"\.r\d+$|\.7z\.\d+$|\.z\d+$|\.zip\.\d+$"
 
+ZIP_CHUNK_SIZE = 4194304
+
 
 def is_first_archive_split(file):
     return bool(re_search(FIRST_SPLIT_REGEX, file))
@@ -208,10 +215,13 @@ async def join_files(path):
             == "application/octet-stream"
         ):
             final_name = file_.rsplit(".", 1)[0]
-            cmd = f"cat {path}/{final_name}.* > {path}/{final_name}"
-            _, stderr, code = await cmd_exec(cmd, True)
-            if code != 0:
-                LOGGER.error(f"Failed to join {final_name}, stderr: {stderr}")
+            parts = sorted(
+                f"{path}/{part}" for part in files if part.startswith(f"{final_name}.")
+            )
+            try:
+                await sync_to_async(concat_files, parts, f"{path}/{final_name}")
+            except OSError as e:
+                LOGGER.error(f"Failed to join {final_name}, error: {e}")
             else:
                 results.append(final_name)
         else:
@@ -224,14 +234,106 @@ async def join_files(path):
                     await aioremove(f"{path}/{file_}")
 
 
+async def run_7z(listener, cmd, progress=None, procs=None):
+    with subprocess_metric("7z"):
+        proc = listener.suproc = await create_subprocess_exec(
+            cmd[0], "-bsp1", "-bso0", *cmd[1:], stdout=PIPE
+        )
+        if procs is not None:
+            procs.append(proc)
+        while chunk := await proc.stdout.read(4096):
+            if progress is not None and (percents := re_findall(rb"(\d+)%", chunk)):
+                progress(int(percents[-1]))
+        return await proc.wait()
+
+
+def __zip_members(path):
+    root = ospath.dirname(path)
+    if ospath.isfile(path):
+        return [(path, ospath.basename(path))]
+    excluded = tuple(f".{ext.lower()}" for ext in GLOBAL_EXTENSION_FILTER)
+    members = []
+    for dirpath, dirs, files in walk(path):
+        dirs.sort()
+        members.append((dirpath, ospath.relpath(dirpath, root)))
+        members.extend(
+            (f_path, ospath.relpath(f_path, root))
+            for file_ in sorted(files)
+            if not file_.lower().endswith(excluded)
+            and ospath.isfile(f_path := ospath.join(dirpath, file_))
+        )
+    return members
+
+
+def write_zip(path, fp):
+    with ZipFile(fp, "w", allowZip64=True) as zf:
+        for f_path, arcname in __zip_members(path):
+            if ospath.isdir(f_path):
+                zf.write(f_path, arcname)
+                continue
+            with open(f_path, "rb") as src, zf.open(
+                ZipInfo.from_file(f_path, arcname), "w"
+            ) as dest:
+                copyfileobj(src, dest, ZIP_CHUNK_SIZE)
+
+
+class ZipPipe:
+    def __init__(self, stream):
+        self.__stream = stream
+
+    def write(self, data):
+        async_to_sync(self.__write, data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    async def __write(self, data):
+        self.__stream.write(data)
+        await self.__stream.drain()
+
+
+async def has_metadata(media_file: str, metadata: str):
+    probe = await get_media_probe(media_file)
+    if not probe.streams:
+        return False
+
+    def title(tags):
+        return next(
+            (val for key, val in (tags or {}).items() if key.lower() == "title"), None
+        )
+
+    return title((probe.format or {}).get("tags")) == metadata and all(
+        title(stream.get("tags")) == metadata
+        for stream in probe.streams
+        if stream.get("codec_type") in ["video", "audio", "subtitle"]
+    )
+
+
 async def edit_metadata(
-    listener, base_dir: str, media_file: str, outfile: str, metadata: str = ""
+    listener,
+    base_dir: str,
+    media_file: str,
+    outfile: str,
+    metadata: str = "",
+    procs: list = None,
+    progress=None,
 ):
+    try:
+        if await sync_to_async(edit_mkv_tags, media_file, metadata):
+            listener.seed = False
+            return 0
+    except Exception as e:
+        LOGGER.error(f"{e}. In-place metadata edit failed, Path {media_file}")
+    await makedirs(ospath.dirname(outfile), exist_ok=True)
     cmd = [
         bot_cache["pkgs"][2],
         "-hide_banner",
         "-loglevel",
         "error",
+        "-progress",
+        "pipe:1",
+        "-nostats",
         "-ignore_unknown",
         "-i",
         media_file,
@@ -282,16 +384,29 @@ async def edit_metadata(
         outfile,
         "-y",
     ]
-    listener.suproc = await create_subprocess_exec(*cmd, stderr=PIPE)
-    code = await listener.suproc.wait()
+    with subprocess_metric("ffmpeg"):
+        proc = listener.suproc = await create_subprocess_exec(
+            *cmd, stdout=PIPE, stderr=PIPE
+        )
+        if procs is not None:
+            procs.append(proc)
+        async for line in proc.stdout:
+            if progress is not None and line.startswith(b"total_size="):
+                if (written := line[11:].strip()).isdigit():
+                    progress(int(written))
+        code = await proc.wait()
     if code == 0:
         listener.seed = False
         await clean_target(media_file)
-        await move(outfile, base_dir)
+        await sync_to_async(
+            move_path, outfile, ospath.join(base_dir, ospath.basename(outfile))
+        )
     else:
         await clean_target(outfile)
-        LOGGER.error(
-            "%s. Changing metadata failed, Path %s",
-            (await listener.suproc.stderr.read()).decode(),
-            media_file,
-        )
+        if code != -9:
+            LOGGER.error(
+                "%s. Changing metadata failed, Path %s",
+                (await proc.stderr.read()).decode(),
+                media_file,
+            )
+    return code
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+from hashlib import md5, sha1, sha256
+from mmap import mmap, ACCESS_READ
+from collections import OrderedDict
+from threading import Lock
+from os import stat, path as ospath
+
+from bot import LOGGER, config_dict
+from bot.helper.ext_utils.bot_utils import sync_to_async, THREADPOOL
+
+try:
+    from xxhash import xxh64
+except ImportError:
+    xxh64 = None
+
+HASHERS = {"md5": md5, "sha1": sha1, "sha256": sha256, "xxh64": xxh64}
+HASH_CACHE = OrderedDict()
+HASH_LOCK = Lock()
+HASH_CACHE_SIZE = 4096
+HASH_BUFFER = 8388608
+
+
+def file_key(path):
+    st = stat(path)
+    return st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def new_hasher(algo):
+    if HASHERS.get(algo) is None:
+        raise ValueError(f"Unsupported hash algorithm: {algo}")
+    return HASHERS[algo]()
+
+
+def cache_hashes(key, digests):
+    with HASH_LOCK:
+        digests = {**HASH_CACHE.get(key, {}), **digests}
+        HASH_CACHE[key] = digests
+        HASH_CACHE.move_to_end(key)
+        while len(HASH_CACHE) > HASH_CACHE_SIZE:
+            HASH_CACHE.popitem(last=False)
+    return digests
+
+
+def hash_file(path, algos=("md5",)):
+    key = file_key(path)
+    with HASH_LOCK:
+        cached = dict(HASH_CACHE.get(key, {}))
+    if missing := [algo for algo in algos if algo not in cached]:
+        hashers = {algo: new_hasher(algo) for algo in missing}
+        with open(path, "rb") as f:
+            if key[2]:
+                with mmap(f.fileno(), 0, access=ACCESS_READ) as mm:
+                    for offset in range(0, key[2], HASH_BUFFER):
+                        chunk = mm[offset : offset + HASH_BUFFER]
+                        for hasher in hashers.values():
+                            hasher.update(chunk)
+        cached = cache_hashes(
+            key, {algo: hasher.hexdigest() for algo, hasher in hashers.items()}
+        )
+    return {algo: cached[algo] for algo in algos}
+
+
+def caption_hash(listener):
+    return listener.isLeech and "{md5_hash}" in (
+        listener.user_dict.get("lcaption") or config_dict["LEECH_FILENAME_CAPTION"]
+    ).lower()
+
+
+def __prefetch(path, algos):
+    try:
+        hash_file(path, algos)
+    except Exception as e:
+        LOGGER.error(f"Hash Prefetch: {e}")
+
+
+def prefetch_hash(path, algos=("md5",)):
+    THREADPOOL.submit(__prefetch, path, algos)
+
+
+async def get_file_hash(path, algo="md5"):
+    return (await sync_to_async(hash_file, path, (algo,)))[algo]
+
+
+class StreamHasher:
+    def __init__(self, path, algos=("md5",)):
+        self.__paths = [f"{path}.temp", path]
+        self.__hashers = {algo: new_hasher(algo) for algo in algos}
+        self.__offset = 0
+        self.__busy = False
+        self.__failed = False
+
+    def __read(self, path, limit=None):
+        with open(path, "rb") as f:
+            f.seek(self.__offset)
+            while limit is None or self.__offset < limit:
+                size = HASH_BUFFER if limit is None else limit - self.__offset
+                if not (chunk := f.read(min(size, HASH_BUFFER))):
+                    break
+                for hasher in self.__hashers.values():
+                    hasher.update(chunk)
+                self.__offset += len(chunk)
+
+    def __feed(self, current):
+        for path in self.__paths:
+            if ospath.exists(path):
+                self.__read(path, min(current, ospath.getsize(path)))
+                return
+
+    async def feed(self, current):
+        if self.__busy or self.__failed or current - self.__offset < HASH_BUFFER:
+            return
+        self.__busy = True
+        try:
+            await sync_to_async(self.__feed, current)
+        except Exception as e:
+            LOGGER.error(f"Stream Hasher: {e}")
+            self.__failed = True
+        finally:
+            self.__busy = False
+
+    def __finish(self, path):
+        if ospath.getsize(path) < self.__offset:
+            return
+        self.__read(path)
+        cache_hashes(
+            file_key(path),
+            {algo: hasher.hexdigest() for algo, hasher in self.__hashers.items()},
+        )
+
+    async def finish(self, path):
+        if self.__failed:
+            return
+        try:
+            await sync_to_async(self.__finish, path)
+        except Exception as e:
+            LOGGER.error(f"Stream Hasher: {e}")
@@ -393,7 +393,8 @@ help_string = [
 <b>Maintainance:</b>
 ┠ /{BotCommands.RestartCommand[0]} or /{BotCommands.RestartCommand[1]}: Restart and Update the Bot (Only Owner & Sudo).
 ┠ /{BotCommands.RestartCommand[2]}: Restart and Update all Bots (Only Owner & Sudo).
-┖ /{BotCommands.LogCommand}: Get a log file of the bot. Handy for getting crash reports (Only Owner & Sudo).
+┠ /{BotCommands.LogCommand}: Get a log file of the bot. Handy for getting crash reports (Only Owner & Sudo).
+┖ /{BotCommands.PerfCommand} [minutes]: Show p50/p95/p99 timings of task stages per engine (Only Owner & Sudo).
 
 <b>Executors:</b>
 ┠ /{BotCommands.ShellCommand}: Run shell commands (Only Owner).
@@ -464,6 +465,7 @@ default_desp = {
     "DELETE_LINKS": "Delete TgLink/Magnet/File on Start of Task to Auto Clean Group. Default is False",
     "EXCEP_CHATS": "Exception Chats which will not use Logging, chat_id separated by space. Str",
     "SAFE_MODE": "Hide Task Name, Source Link and Indexing of Leech Link for Safety Precautions. Default is False",
+    "PERF_SPANS_DB": "Save pipeline stage timings of every task to Database, shown by /perf. Requires DATABASE_URL. Default is False",
     "SOURCE_LINK": "Add a Extra Button of Source Link whether it is Magnet Link or File Link or DL Link. Default is False",
     "SHOW_EXTRA_CMDS": "Add Extra Commands beside Arg Format for -z or -e. \n\n<b>COMMANDS: </b> /unzipxxx or /zipxxx or /uzx or /zx",
     "BOT_THEME": "Theme of the Bot to Switch. For now Deafault Theme Availabe is minimal. You can make your own Theme and Add in BSet. \n\n<b>Sample Format</b>: https://t.ly/9rVXq",
@@ -486,6 +488,11 @@ default_desp = {
     "LEECH_LOG_ID": "Chat ID to where leeched files would be uploaded. Int. NOTE: Only available for superGroup/channel. Add -100 before channel/superGroup id. In short don't add bot id or your id!",
     "MIRROR_LOG_ID": "Chat ID to where Mirror files would be Send. Int. NOTE: Only available for superGroup/channel. Add -100 before channel/superGroup id. In short don't add bot id or your id!. For Multiple id Separate them by space.",
     "EQUAL_SPLITS": "Split files larger than LEECH_SPLIT_SIZE into equal parts size (Not working with zip cmd). Default is False.",
+    "METADATA_WORKERS": "Number of video files whose metadata is edited at the same time. Files that already have the metadata are skipped. Default is 4. Int",
+    "TG_DOWNLOAD_WORKERS": "Number of parallel range requests used to download Telegram files bigger than 128MB. Spread over the bot and USER_SESSION_STRING when the user can see the chat. Set 1 to disable. Default is 4. Int",
+    "TG_UPLOAD_WORKERS": "Number of leech files whose parts are uploaded to Telegram at the same time. Files are still posted one by one in the original order. Set 1 to disable. Default is 4. Int",
+    "UPLOAD_LOOKAHEAD": "Number of upcoming files to probe, caption and thumbnail while the current file uploads. Set 0 to disable. Default is 2. Int",
+    "STREAM_LEECH": "Upload finished files of multi-file Torrent/Direct leech while the rest keep downloading, in the same order as normal leech (Not working with zip, unzip, seed, join, multi or metadata). Default is False.",
     "EXTENSION_FILTER": "File extensions that won't upload/clone. Separate them by space.",
     "GDRIVE_ID": "This is the Folder/TeamDrive ID of the Google Drive OR root to which you want to upload all the mirrors using google-api-python-client.",
     "INCOMPLETE_TASK_NOTIFIER": "Get incomplete task messages after restart. Require database and superGroup. Default is False",
@@ -493,6 +500,7 @@ default_desp = {
     "IS_TEAM_DRIVE": "Set True if uploading to TeamDrive using google-api-python-client. Default is False",
     "SHOW_MEDIAINFO": "Add Button to Show MediaInfo in Leeched file. Bool",
     "SCREENSHOTS_MODE": "Enable or Diable generating Screenshots via -ss arg. Default is False. Bool",
+    "SCREENSHOTS_SHEET": "Tile -ss Screenshots into 5x5 contact sheets, so one image holds 25 screenshots. Default is False. Bool",
     "CAP_FONT": "Add Custom Caption Font to Leeched Files, Available Values : b, i, u, s, code, spoiler. Reset Var to use Regular ( No Format )",
     "LEECH_FILENAME_PREFIX": "Add custom word prefix to leeched file name. Str",
     "LEECH_FILENAME_SUFFIX": "Add custom word suffix to leeched file name. Str",
@@ -510,6 +518,8 @@ default_desp = {
     "QUEUE_ALL": "Number of parallel tasks of downloads and uploads. For example if 20 task added and QUEUE_ALL is 8, then the summation of uploading and downloading tasks are 8 and the rest in queue. Int. NOTE: if you want to fill QUEUE_DOWNLOAD or QUEUE_UPLOAD, then QUEUE_ALL value must be greater than or equal to the greatest one and less than or equal to summation of QUEUE_UPLOAD and QUEUE_DOWNLOAD",
     "QUEUE_DOWNLOAD": "Number of all parallel downloading tasks. Int",
     "QUEUE_UPLOAD": "Number of all parallel uploading tasks. Int",
+    "QUEUE_PROCESS": "Number of all parallel extract, zip, metadata and split stages, counted apart from downloads and uploads. Int",
+    "QUEUE_MODE": "Order of starting queued tasks. fair: owner, then sudo, then users, taking turns between users with the fewest running tasks. sjf: fair, but each user's smaller tasks first. fifo: order of adding. Default is fair.",
     "RCLONE_FLAGS": "key:value|key|key|key:value . Check here all RcloneFlags.",
     "RCLONE_PATH": "Default rclone path to which you want to upload all the mirrors using rclone.",
     "RCLONE_SERVE_URL": "Valid URL where the bot is deployed to use rclone serve. Format of URL should be http://myip, where myip is the IP/Domain(public) of your bot or if you have chosen port other than 80 so write it in this format http://myip:port (http and not https)",
@@ -1,13 +1,21 @@
 from hashlib import md5
 from time import strftime, gmtime, time
-from re import sub as re_sub, search as re_search
+from re import sub as re_sub, search as re_search, findall as re_findall
 from shlex import split as ssplit
 from natsort import natsorted
-from os import path as ospath
+from os import path as ospath, cpu_count
 from aiofiles.os import remove as aioremove, path as aiopath, mkdir, makedirs, listdir
 from aioshutil import rmtree as aiormtree
 from contextlib import suppress
-from asyncio import create_subprocess_exec, create_task, gather, Semaphore
+from collections import OrderedDict
+from asyncio import (
+    create_subprocess_exec,
+    create_task,
+    gather,
+    Semaphore,
+    CancelledError,
+)
+from concurrent.futures import wait as cwait
 from asyncio.subprocess import PIPE
 from telegraph import upload_file
 from langcodes import Language
@@ -17,75 +25,41 @@ from bot.modules.mediainfo import parseinfo
 from bot.helper.ext_utils.bot_utils import (
     cmd_exec,
     sync_to_async,
+    async_to_sync,
     get_readable_file_size,
     get_readable_time,
 )
-from bot.helper.ext_utils.fs_utils import ARCH_EXT, get_mime_type
+from bot.helper.ext_utils.fs_utils import ARCH_EXT, get_mime_type, run_7z, write_zip
+from bot.helper.ext_utils.bot_metrics import subprocess_metric
 from bot.helper.ext_utils.telegraph_helper import telegraph
+from bot.helper.ext_utils.media_probe import get_media_probe
+from bot.helper.ext_utils.hash_service import get_file_hash
+
+SPLIT_QUEUE_SIZE = 2
+SS_CACHE = OrderedDict()
+SS_CACHE_SIZE = 256
+SS_SHEET_TILE = 5
 
 
 async def is_multi_streams(path):
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_streams",
-                path,
-            ]
-        )
-        if res := result[1]:
-            LOGGER.warning(f"Get Video Streams: {res}")
-    except Exception as e:
-        LOGGER.error(f"Get Video Streams: {e}. Mostly File not found!")
+    probe = await get_media_probe(path)
+    if probe.streams is None:
+        LOGGER.error(f"get_video_streams: no streams found. Path: {path}")
         return False
-    fields = eval(result[0]).get("streams")
-    if fields is None:
-        LOGGER.error(f"get_video_streams: {result}")
-        return False
-    videos = 0
-    audios = 0
-    for stream in fields:
-        if stream.get("codec_type") == "video":
-            videos += 1
-        elif stream.get("codec_type") == "audio":
-            audios += 1
-    return videos > 1 or audios > 1
+    codec_types = probe.codec_types()
+    return codec_types.count("video") > 1 or codec_types.count("audio") > 1
 
 
 async def get_media_info(path, metadata=False):
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_format",
-                "-show_streams",
-                path,
-            ]
-        )
-        if res := result[1]:
-            LOGGER.warning(f"Media Info FF: {res}")
-    except Exception as e:
-        LOGGER.error(f"Media Info: {e}. Mostly File not found!")
-        return (0, "", "", "") if metadata else (0, None, None)
-    ffresult = eval(result[0])
-    fields = ffresult.get("format")
+    probe = await get_media_probe(path)
+    fields = probe.format
     if fields is None:
-        LOGGER.error(f"Media Info Sections: {result}")
+        LOGGER.error(f"Media Info Sections: no format found. Path: {path}")
         return (0, "", "", "") if metadata else (0, None, None)
-    duration = round(float(fields.get("duration", 0)))
+    duration = probe.duration
     if metadata:
         lang, qual, stitles = "", "", ""
-        if (streams := ffresult.get("streams")) and streams[0].get(
+        if (streams := probe.streams) and streams[0].get(
             "codec_type"
         ) == "video":
             qual = int(streams[0].get("height"))
@@ -125,34 +99,12 @@ async def get_document_type(path):
         return False, False, True
     if not mime_type.startswith("video") and not mime_type.endswith("octet-stream"):
         return is_video, is_audio, is_image
-    try:
-        result = await cmd_exec(
-            [
-                "ffprobe",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-print_format",
-                "json",
-                "-show_streams",
-                path,
-            ]
-        )
-        if res := result[1]:
-            LOGGER.warning(f"Get Document Type: {res}")
-    except Exception as e:
-        LOGGER.error(f"Get Document Type: {e}. Mostly File not found!")
+    probe = await get_media_probe(path)
+    if probe.streams is None:
+        LOGGER.error(f"get_document_type: no streams found. Path: {path}")
         return is_video, is_audio, is_image
-    fields = eval(result[0]).get("streams")
-    if fields is None:
-        LOGGER.error(f"get_document_type: {result}")
-        return is_video, is_audio, is_image
-    for stream in fields:
-        if stream.get("codec_type") == "video":
-            is_video = True
-        elif stream.get("codec_type") == "audio":
-            is_audio = True
-    return is_video, is_audio, is_image
+    codec_types = probe.codec_types()
+    return "video" in codec_types, "audio" in codec_types, is_image
 
 
 async def get_audio_thumb(audio_file):
@@ -172,8 +124,10 @@ async def get_audio_thumb(audio_file):
         "copy",
         des_dir,
     ]
-    status = await create_subprocess_exec(*cmd, stderr=PIPE)
-    if await status.wait() != 0 or not await aiopath.exists(des_dir):
+    with subprocess_metric("ffmpeg"):
+        status = await create_subprocess_exec(*cmd, stderr=PIPE)
+        code = await status.wait()
+    if code != 0 or not await aiopath.exists(des_dir):
         err = (await status.stderr.read()).decode().strip()
         LOGGER.error(
             f"Error while extracting thumbnail from audio. Name: {audio_file} stderr: {err}"
@@ -182,7 +136,54 @@ async def get_audio_thumb(audio_file):
     return des_dir
 
 
-async def take_ss(video_file, duration=None, total=1, gen_ss=False):
+async def __ss_frames(video_file, des_dir, total, duration, sheet):
+    interval = duration / (total + 1)
+    vf = f"select='gte(t,{interval / 2})*(isnan(prev_selected_t)+gte(t-prev_selected_t,{interval}))',showinfo"
+    frames = total
+    if sheet:
+        vf += f",scale=480:-2,tile={SS_SHEET_TILE}x{SS_SHEET_TILE}"
+        frames = -(-total // SS_SHEET_TILE**2)
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "info",
+        "-skip_frame",
+        "nokey",
+        "-i",
+        video_file,
+        "-vf",
+        vf,
+        "-vsync",
+        "vfr",
+        "-frames:v",
+        str(frames),
+        ospath.join(des_dir, "wz_thumb_%d.jpg"),
+    ]
+    with subprocess_metric("ffmpeg"):
+        proc = await create_subprocess_exec(*cmd, stderr=PIPE)
+        _, stderr = await proc.communicate()
+    stamps = [
+        strftime("%H:%M:%S", gmtime(float(stamp)))
+        for stamp in re_findall(r"showinfo.*?pts_time:\s*(\S+)", stderr.decode())
+    ]
+    thumbs = natsorted(await listdir(des_dir))
+    if proc.returncode != 0 or not thumbs:
+        LOGGER.error(
+            f"Error while extracting screenshots from video. Name: {video_file} stderr: {stderr.decode().strip()[-500:]}"
+        )
+        return None
+    tstamps = {}
+    per_thumb = SS_SHEET_TILE**2 if sheet else 1
+    for index, thumb in enumerate(thumbs):
+        if part := stamps[index * per_thumb : (index + 1) * per_thumb]:
+            tstamps[thumb] = part[0] if len(part) == 1 else f"{part[0]} - {part[-1]}"
+        else:
+            tstamps[thumb] = ""
+    return tstamps
+
+
+async def take_ss(video_file, duration=None, total=1, gen_ss=False, sheet=False):
     des_dir = ospath.join("Thumbnails", f"{time()}")
     await makedirs(des_dir, exist_ok=True)
     if duration is None:
@@ -190,6 +191,12 @@ async def take_ss(video_file, duration=None, total=1, gen_ss=False):
     if duration == 0:
         duration = 3
     duration = duration - (duration * 2 / 100)
+    if gen_ss:
+        tstamps = await __ss_frames(video_file, des_dir, total, duration, sheet)
+        if tstamps is None:
+            await aiormtree(des_dir)
+            return None
+        return des_dir, tstamps
     cmd = [
         "ffmpeg",
         "-hide_banner",
@@ -215,8 +222,9 @@ async def take_ss(video_file, duration=None, total=1, gen_ss=False):
                 "%H:%M:%S", gmtime(float(cmd[5]))
             )
             cmd[-1] = ospath.join(des_dir, f"wz_thumb_{eq_thumb}.jpg")
-            task = await create_subprocess_exec(*cmd, stderr=PIPE)
-            return (task, await task.wait(), eq_thumb)
+            with subprocess_metric("ffmpeg"):
+                task = await create_subprocess_exec(*cmd, stderr=PIPE)
+                return (task, await task.wait(), eq_thumb)
 
     tasks = [extract_ss(eq_thumb) for eq_thumb in range(1, total + 1)]
     status = await gather(*tasks)
@@ -231,7 +239,137 @@ async def take_ss(video_file, duration=None, total=1, gen_ss=False):
             )
             await aiormtree(des_dir)
             return None
-    return (des_dir, tstamps) if gen_ss else ospath.join(des_dir, "wz_thumb_1.jpg")
+    return ospath.join(des_dir, "wz_thumb_1.jpg")
+
+
+async def get_keyframe_index(path):
+    if (video := (await get_media_probe(path)).video_index()) is None:
+        return None, 0
+    video = str(video)
+    keyframes, total = [], 0
+    with subprocess_metric("ffprobe"):
+        proc = await create_subprocess_exec(
+            "ffprobe",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-show_entries",
+            "packet=stream_index,pts_time,size,flags",
+            "-of",
+            "compact=p=0",
+            path,
+            stdout=PIPE,
+        )
+        async for line in proc.stdout:
+            packet = dict(
+                field.split("=", 1)
+                for field in line.decode().strip().split("|")
+                if "=" in field
+            )
+            if (
+                packet.get("stream_index") == video
+                and packet.get("flags", "").startswith("K")
+                and packet.get("pts_time", "N/A") != "N/A"
+            ):
+                keyframes.append((float(packet["pts_time"]), total))
+            if packet.get("size", "N/A").isdigit():
+                total += int(packet["size"])
+        code = await proc.wait()
+    if code != 0 or not keyframes or not total:
+        return None, 0
+    return keyframes, total
+
+
+def __plan_cuts(keyframes, total, size, split_size):
+    scale = size / total
+    starts, base, candidate = [0], 0, None
+    for pts, offset in keyframes:
+        if pts <= starts[-1]:
+            continue
+        if (offset - base) * scale > split_size and candidate is not None:
+            starts.append(candidate[0])
+            base = candidate[1]
+        candidate = (pts, offset)
+    if (
+        (total - base) * scale > split_size
+        and candidate is not None
+        and candidate[0] > starts[-1]
+    ):
+        starts.append(candidate[0])
+    return starts
+
+
+async def __split_on_keyframes(
+    path,
+    starts,
+    part_limit,
+    base_name,
+    extension,
+    dirpath,
+    multi_streams,
+    listener,
+    part_queue,
+):
+    cut_sem = Semaphore(max((cpu_count() or 1) // 2, 1))
+    procs = []
+
+    def out_path(index):
+        return ospath.join(dirpath, f"{base_name}.part{index + 1:03}{extension}")
+
+    async def cut(index):
+        async with cut_sem:
+            if listener.suproc == "cancelled" or any(
+                proc.returncode == -9 for proc in procs
+            ):
+                return -9
+            cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+            cmd.extend(["-ss", str(starts[index]), "-i", path])
+            if index + 1 < len(starts):
+                cmd.extend(["-t", str(starts[index + 1] - starts[index])])
+            if multi_streams:
+                cmd.extend(["-map", "0"])
+            cmd.extend(["-map_chapters", "-1", "-async", "1", "-strict", "-2"])
+            cmd.extend(["-c", "copy", out_path(index)])
+            with subprocess_metric("ffmpeg"):
+                proc = await create_subprocess_exec(*cmd, stderr=PIPE)
+                listener.suproc = proc
+                procs.append(proc)
+                code = await proc.wait()
+            if code == -9:
+                for proc in procs:
+                    if proc.returncode is None:
+                        proc.kill()
+            return code
+
+    async def stop(index):
+        for task in tasks[index:]:
+            task.cancel()
+        for proc in procs:
+            if proc.returncode is None:
+                proc.kill()
+        await gather(*tasks, return_exceptions=True)
+        for i in range(index, len(starts)):
+            with suppress(Exception):
+                await aioremove(out_path(i))
+
+    window = SPLIT_QUEUE_SIZE if part_queue is not None else len(starts)
+    tasks = [create_task(cut(index)) for index in range(min(window, len(starts)))]
+    for index in range(len(starts)):
+        code = await tasks[index]
+        if code == -9:
+            await stop(index)
+            return False
+        if code != 0 or await aiopath.getsize(out_path(index)) > part_limit:
+            await stop(index)
+            LOGGER.warning(
+                f"Keyframe split failed at part {index + 1}, continuing part by part. Path: {path}"
+            )
+            return starts[index], index + 1
+        if part_queue is not None:
+            await part_queue.put(out_path(index))
+        if len(tasks) < len(starts):
+            tasks.append(create_task(cut(len(tasks))))
+    return True
 
 
 async def split_file(
@@ -245,6 +383,7 @@ async def split_file(
     i=1,
     inLoop=False,
     multi_streams=True,
+    part_queue=None,
 ):
     if (
         listener.suproc == "cancelled"
@@ -271,7 +410,28 @@ async def split_file(
             multi_streams = await is_multi_streams(path)
         duration = (await get_media_info(path))[0]
         base_name, extension = ospath.splitext(file_)
+        part_limit = min(split_size, MAX_SPLIT_SIZE)
         split_size -= 5000000
+        if not inLoop:
+            keyframes, total = await get_keyframe_index(path)
+            starts = (
+                __plan_cuts(keyframes, total, size, split_size) if keyframes else []
+            )
+            if len(starts) > 1:
+                res = await __split_on_keyframes(
+                    path,
+                    starts,
+                    part_limit,
+                    base_name,
+                    extension,
+                    dirpath,
+                    multi_streams,
+                    listener,
+                    part_queue,
+                )
+                if not isinstance(res, tuple):
+                    return res
+                start_time, i = res
         while i <= parts or start_time < duration - 4:
             parted_name = f"{base_name}.part{i:03}{extension}"
             out_path = ospath.join(dirpath, parted_name)
@@ -307,8 +467,9 @@ async def split_file(
                 and listener.suproc.returncode == -9
             ):
                 return False
-            listener.suproc = await create_subprocess_exec(*cmd, stderr=PIPE)
-            code = await listener.suproc.wait()
+            with subprocess_metric("ffmpeg"):
+                listener.suproc = await create_subprocess_exec(*cmd, stderr=PIPE)
+                code = await listener.suproc.wait()
             if code == -9:
                 return False
             elif code != 0:
@@ -332,6 +493,7 @@ async def split_file(
                         i,
                         True,
                         False,
+                        part_queue,
                     )
                 else:
                     LOGGER.warning(
@@ -353,43 +515,123 @@ async def split_file(
                     start_time,
                     i,
                     True,
+                    part_queue=part_queue,
                 )
             lpd = (await get_media_info(out_path))[0]
+            if 0 < lpd <= 3 and duration != lpd:
+                await aioremove(out_path)
+                break
             if lpd == 0:
                 LOGGER.error(
                     f"Something went wrong while splitting, mostly file is corrupted. Path: {path}"
                 )
+                if part_queue is not None:
+                    await aioremove(out_path)
                 break
-            elif duration == lpd:
+            if part_queue is not None:
+                await part_queue.put(out_path)
+            if duration == lpd:
                 LOGGER.warning(
                     f"This file has been splitted with default stream and audio, so you will only see one part with less size from orginal one because it doesn't have all streams and audios. This happens mostly with MKV videos. Path: {path}"
                 )
                 break
-            elif lpd <= 3:
-                await aioremove(out_path)
-                break
             start_time += lpd - 3
             i += 1
     else:
         out_path = ospath.join(dirpath, f"{file_}.")
-        listener.suproc = await create_subprocess_exec(
-            "split",
-            "--numeric-suffixes=1",
-            "--suffix-length=3",
-            f"--bytes={split_size}",
-            path,
-            out_path,
-            stderr=PIPE,
-        )
-        code = await listener.suproc.wait()
+        with subprocess_metric("split"):
+            listener.suproc = await create_subprocess_exec(
+                "split",
+                "--numeric-suffixes=1",
+                "--suffix-length=3",
+                f"--bytes={split_size}",
+                path,
+                out_path,
+                stderr=PIPE,
+            )
+            code = await listener.suproc.wait()
         if code == -9:
             return False
         elif code != 0:
             err = (await listener.suproc.stderr.read()).decode().strip()
             LOGGER.error(err)
+        if part_queue is not None:
+            for part in natsorted(await listdir(dirpath)):
+                if part.startswith(f"{file_}.") and part[len(file_) + 1 :].isdigit():
+                    await part_queue.put(ospath.join(dirpath, part))
     return True
 
 
+class ZipVolumes:
+    def __init__(self, zip_path, volume_size, part_queue):
+        self.cancelled = False
+        self.__zip_path = zip_path
+        self.__volume_size = volume_size
+        self.__part_queue = part_queue
+        self.__index = 0
+        self.__file = None
+        self.__written = 0
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            if self.cancelled:
+                raise Exception("Zip stream cancelled")
+            if self.__file is None:
+                self.__index += 1
+                self.__file = open(f"{self.__zip_path}.{self.__index:03}", "wb")
+            chunk = view[: self.__volume_size - self.__written]
+            self.__file.write(chunk)
+            self.__written += len(chunk)
+            view = view[len(chunk) :]
+            if self.__written == self.__volume_size:
+                self.__release()
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.__file is not None:
+            self.__release()
+
+    def __release(self):
+        self.__file.close()
+        self.__file = None
+        self.__written = 0
+        future = async_to_sync(
+            self.__part_queue.put, f"{self.__zip_path}.{self.__index:03}", wait=False
+        )
+        while not future.done():
+            if self.cancelled:
+                future.cancel()
+                raise Exception("Zip stream cancelled")
+            cwait([future], timeout=1)
+
+
+async def zip_volumes(
+    listener, src_path, zip_path, volume_size, part_queue, cmd=None
+):
+    if cmd is not None:
+        code = await run_7z(listener, cmd)
+        index = 1
+        while code == 0 and await aiopath.exists(f"{zip_path}.{index:03}"):
+            await part_queue.put(f"{zip_path}.{index:03}")
+            index += 1
+        return code
+    volumes = ZipVolumes(zip_path, volume_size, part_queue)
+    try:
+        await sync_to_async(write_zip, src_path, volumes)
+        await sync_to_async(volumes.close)
+    except CancelledError:
+        volumes.cancelled = True
+        raise
+    except Exception as e:
+        LOGGER.error(f"{e}. Streaming zip failed, Path: {src_path}")
+        return 1
+    return 0
+
+
 async def format_filename(file_, user_id, dirpath=None, isMirror=False):
     user_dict = user_data.get(user_id, {})
     ftag, ctag = ("m", "MIRROR") if isMirror else ("l", "LEECH")
@@ -488,7 +730,11 @@ async def format_filename(file_, user_id, dirpath=None, isMirror=False):
             quality=qual,
             languages=lang,
             subtitles=subs,
-            md5_hash=get_md5_hash(up_path),
+            md5_hash=(
+                await get_file_hash(up_path, "md5")
+                if "{md5_hash}" in slit[0]
+                else ""
+            ),
         )
         if len(slit) > 1:
             for rep in range(1, len(slit)):
@@ -503,8 +749,29 @@ async def format_filename(file_, user_id, dirpath=None, isMirror=False):
     return file_, cap_mono
 
 
+def get_file_fingerprint(path, chunk=1048576):
+    size = ospath.getsize(path)
+    fingerprint = md5(str(size).encode())
+    with open(path, "rb") as f:
+        fingerprint.update(f.read(chunk))
+        if size > chunk:
+            f.seek(max(size - chunk, chunk))
+            fingerprint.update(f.read(chunk))
+    return fingerprint.hexdigest()
+
+
 async def get_ss(up_path, ss_no):
-    thumbs_path, tstamps = await take_ss(up_path, total=min(ss_no, 250), gen_ss=True)
+    sheet = config_dict["SCREENSHOTS_SHEET"]
+    key = (await sync_to_async(get_file_fingerprint, up_path), ss_no, sheet)
+    if (link := SS_CACHE.get(key)) is not None:
+        SS_CACHE.move_to_end(key)
+        return link
+    if (
+        res := await take_ss(up_path, total=min(ss_no, 250), gen_ss=True, sheet=sheet)
+    ) is None:
+        raise Exception("Unable to generate screenshots")
+    thumbs_path, tstamps = res
+    label = "Screenshots" if sheet else "Screenshot at"
     th_html = f"📌 <h4>{ospath.basename(up_path)}</h4><br>📇 <b>Total Screenshots:</b> {ss_no}<br><br>"
     up_sem = Semaphore(25)
 
@@ -516,14 +783,17 @@ async def get_ss(up_path, ss_no):
     tasks = [telefile(thumb) for thumb in natsorted(await listdir(thumbs_path))]
     results = await gather(*tasks)
     th_html += "".join(
-        f'<img src="https://graph.org{tele_id}"><br><pre>Screenshot at {stamp}</pre>'
+        f'<img src="https://graph.org{tele_id}"><br><pre>{label} {stamp}</pre>'
         for tele_id, stamp in results
     )
     await aiormtree(thumbs_path)
     link_id = (await telegraph.create_page(title="ScreenShots X", content=th_html))[
         "path"
     ]
-    return f"https://graph.org/{link_id}"
+    SS_CACHE[key] = f"https://graph.org/{link_id}"
+    while len(SS_CACHE) > SS_CACHE_SIZE:
+        SS_CACHE.popitem(last=False)
+    return SS_CACHE[key]
 
 
 async def get_mediainfo_link(up_path):
@@ -533,11 +803,3 @@ async def get_mediainfo_link(up_path):
         tc += parseinfo(stdout)
     link_id = (await telegraph.create_page(title="MediaInfo X", content=tc))["path"]
     return f"https://graph.org/{link_id}"
-
-
-def get_md5_hash(up_path):
-    md5_hash = md5()
-    with open(up_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            md5_hash.update(byte_block)
-        return md5_hash.hexdigest()
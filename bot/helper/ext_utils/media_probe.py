@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+from json import loads as jsonloads
+from asyncio import create_subprocess_exec
+from asyncio.subprocess import PIPE
+from collections import OrderedDict
+from aiofiles.os import stat as aiostat
+
+from bot import LOGGER, bot_loop
+from bot.helper.ext_utils.bot_metrics import subprocess_metric
+
+PROBE_CACHE = OrderedDict()
+PROBE_CACHE_SIZE = 1024
+PROBE_PENDING = {}
+
+
+class MediaProbe:
+    __slots__ = ("path", "format", "streams")
+
+    def __init__(self, path, data=None):
+        self.path = path
+        self.format = (data or {}).get("format")
+        self.streams = (data or {}).get("streams")
+
+    def codec_types(self):
+        return [stream.get("codec_type") for stream in self.streams or []]
+
+    def video_index(self):
+        for stream in self.streams or []:
+            if stream.get("codec_type") == "video":
+                return stream.get("index")
+        return None
+
+    @property
+    def duration(self):
+        try:
+            return round(float((self.format or {}).get("duration", 0)))
+        except ValueError:
+            return 0
+
+
+async def __run_probe(path):
+    try:
+        with subprocess_metric("ffprobe"):
+            proc = await create_subprocess_exec(
+                "ffprobe",
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-print_format",
+                "json",
+                "-show_format",
+                "-show_streams",
+                path,
+                stdout=PIPE,
+                stderr=PIPE,
+            )
+            stdout, stderr = await proc.communicate()
+        if err := stderr.decode().strip():
+            LOGGER.warning(f"Media Probe: {err}")
+        return MediaProbe(path, jsonloads(stdout.decode() or "{}"))
+    except Exception as e:
+        LOGGER.error(f"Media Probe: {e}. Path: {path}")
+        return MediaProbe(path)
+
+
+async def get_media_probe(path):
+    try:
+        st = await aiostat(path)
+    except Exception as e:
+        LOGGER.error(f"Media Probe: {e}. Mostly File not found!")
+        return MediaProbe(path)
+    key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    if (probe := PROBE_CACHE.get(key)) is not None:
+        PROBE_CACHE.move_to_end(key)
+        return probe
+    if (pending := PROBE_PENDING.get(key)) is None:
+        pending = PROBE_PENDING[key] = bot_loop.create_task(__run_probe(path))
+    try:
+        probe = await pending
+    finally:
+        PROBE_PENDING.pop(key, None)
+    PROBE_CACHE[key] = probe
+    while len(PROBE_CACHE) > PROBE_CACHE_SIZE:
+        PROBE_CACHE.popitem(last=False)
+    return probe
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+from os import fstat, fsync, ftruncate, posix_fallocate
+from errno import ENOSPC
+from contextlib import suppress
+from zlib import crc32
+
+EBML = 0x1A45DFA3
+DOC_TYPE = 0x4282
+SEGMENT = 0x18538067
+SEEK_HEAD = 0x114D9B74
+SEEK = 0x4DBB
+SEEK_ID = 0x53AB
+SEEK_POSITION = 0x53AC
+INFO = 0x1549A966
+TITLE = 0x7BA9
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+TRACK_NAME = 0x536E
+TAGS = 0x1254C367
+TAG = 0x7373
+TARGETS = 0x63C0
+TARGET_UIDS = [0x63C5, 0x63C9, 0x63C4, 0x63C6]
+SIMPLE_TAG = 0x67C8
+TAG_NAME = 0x45A3
+TAG_STRING = 0x4487
+CLUSTER = 0x1F43B675
+VOID = 0xEC
+CRC32 = 0xBF
+
+NAMED_TRACKS = [1, 2, 17]
+DROP_TAGS = [
+    "title",
+    "comment",
+    "copyright",
+    "author",
+    "encoded by",
+    "encoded_by",
+    "synopsis",
+    "artist",
+    "purl",
+    "description",
+    "summary",
+    "website",
+]
+
+
+def __vint_length(first):
+    for length in range(1, 9):
+        if first & (0x80 >> (length - 1)):
+            return length
+    raise ValueError("Invalid EBML variable size integer")
+
+
+def __read_id(data, pos):
+    length = __vint_length(data[pos])
+    return int.from_bytes(data[pos : pos + length], "big"), pos + length
+
+
+def __read_size(data, pos):
+    length = __vint_length(data[pos])
+    value = int.from_bytes(data[pos : pos + length], "big") & ((1 << (7 * length)) - 1)
+    if value == (1 << (7 * length)) - 1:
+        value = None
+    return value, pos + length, length
+
+
+def __encode_id(id_):
+    return id_.to_bytes((id_.bit_length() + 7) // 8, "big")
+
+
+def __encode_size(size, width=None):
+    if width is None:
+        width = 1
+        while size >= (1 << (7 * width)) - 1:
+            width += 1
+    if width > 8 or size >= (1 << (7 * width)) - 1:
+        return None
+    return (size | (1 << (7 * width))).to_bytes(width, "big")
+
+
+def __children(data):
+    children = []
+    pos = 0
+    while pos < len(data):
+        id_, pos = __read_id(data, pos)
+        size, pos, _ = __read_size(data, pos)
+        if size is None or pos + size > len(data):
+            raise ValueError("Broken EBML master element")
+        children.append((id_, data[pos : pos + size]))
+        pos += size
+    return children
+
+
+def __element(id_, payload):
+    return __encode_id(id_) + __encode_size(len(payload)) + payload
+
+
+def __master(children):
+    payload = b"".join(__element(id_, data) for id_, data in children if id_ != CRC32)
+    if children and children[0][0] == CRC32:
+        payload = __element(CRC32, crc32(payload).to_bytes(4, "little")) + payload
+    return payload
+
+
+def __void(size):
+    for width in range(1, 9):
+        if (data_size := size - 1 - width) < 0:
+            return None
+        if (header := __encode_size(data_size, width)) is not None:
+            return __encode_id(VOID) + header + bytes(data_size)
+    return None
+
+
+def __fit(id_, payload, slot):
+    id_bytes = __encode_id(id_)
+    for width in range(1, 9):
+        if (header := __encode_size(len(payload), width)) is None:
+            continue
+        gap = slot - len(id_bytes) - len(header) - len(payload)
+        if gap < 0:
+            return None
+        if gap == 0:
+            return id_bytes + header + payload
+        if (void := __void(gap)) is not None:
+            return id_bytes + header + payload + void
+    return None
+
+
+def __set_child(children, id_, payload):
+    children = [child for child in children if child[0] != id_]
+    return children + [(id_, payload)]
+
+
+def __edit_info(payload, title):
+    return __master(__set_child(__children(payload), TITLE, title.encode()))
+
+
+def __edit_tracks(payload, title):
+    children = []
+    for id_, data in __children(payload):
+        if id_ == TRACK_ENTRY:
+            entry = __children(data)
+            track_type = next(
+                (int.from_bytes(val, "big") for key, val in entry if key == TRACK_TYPE),
+                None,
+            )
+            if track_type in NAMED_TRACKS:
+                data = __master(__set_child(entry, TRACK_NAME, title.encode()))
+        children.append((id_, data))
+    return __master(children)
+
+
+def __is_global(tag):
+    for id_, data in tag:
+        if id_ == TARGETS and any(key in TARGET_UIDS for key, _ in __children(data)):
+            return False
+    return True
+
+
+def __tag_name(simple_tag):
+    for id_, data in __children(simple_tag):
+        if id_ == TAG_NAME:
+            return data.decode(errors="ignore").lower()
+    return ""
+
+
+def __simple_tag(name, value):
+    return SIMPLE_TAG, __master(
+        [(TAG_NAME, name.encode()), (TAG_STRING, value.encode())]
+    )
+
+
+def __edit_tags(payload):
+    children = []
+    for id_, data in __children(payload) if payload else []:
+        if id_ == TAG and __is_global(tag := __children(data)):
+            tag = [
+                child
+                for child in tag
+                if child[0] != SIMPLE_TAG or __tag_name(child[1]) not in DROP_TAGS
+            ]
+            if not any(child[0] == SIMPLE_TAG for child in tag):
+                continue
+            data = __master(tag)
+        children.append((id_, data))
+    children.append(
+        (TAG, __master([(TARGETS, b""), __simple_tag("AUTHOR", "Zyradaex")]))
+    )
+    return __master(children)
+
+
+def __edit_seek_head(payload, positions):
+    children = []
+    for id_, data in __children(payload):
+        if id_ == SEEK:
+            seek = __children(data)
+            seek_id = next((val for key, val in seek if key == SEEK_ID), b"")
+            position = positions.pop(int.from_bytes(seek_id, "big"), None)
+            if position is not None:
+                data = __master(__set_child(seek, SEEK_POSITION, __uint(position)))
+        children.append((id_, data))
+    if (position := positions.get(TAGS)) is not None:
+        seek = [(SEEK_ID, __encode_id(TAGS)), (SEEK_POSITION, __uint(position))]
+        children.append((SEEK, __master(seek)))
+    return __master(children)
+
+
+def __uint(value):
+    return value.to_bytes((value.bit_length() + 7) // 8 or 1, "big")
+
+
+def __region(items, size, offset, extra):
+    seek_size = 0
+    if items[0][0] == SEEK_HEAD:
+        seek_size = len(__element(SEEK_HEAD, items[0][1]))
+    for _ in range(4):
+        positions = dict(extra)
+        pos = offset
+        parts = []
+        for id_, payload in items:
+            if id_ == SEEK_HEAD:
+                parts.append(b"")
+                pos += seek_size
+                continue
+            positions.setdefault(id_, pos)
+            parts.append(__element(id_, payload))
+            pos += len(parts[-1])
+        if seek_size:
+            parts[0] = __element(SEEK_HEAD, __edit_seek_head(items[0][1], positions))
+            if len(parts[0]) != seek_size:
+                seek_size = len(parts[0])
+                continue
+        gap = size - sum(len(part) for part in parts)
+        if gap < 0:
+            return None
+        if gap == 1:
+            id_, payload = items[-1]
+            width = len(__encode_size(len(payload))) + 1
+            parts[-1] = __encode_id(id_) + __encode_size(len(payload), width) + payload
+            return b"".join(parts)
+        return b"".join(parts) + (__void(gap) if gap else b"")
+    return None
+
+
+def __read_header(f, pos):
+    f.seek(pos)
+    head = f.read(12)
+    if len(head) < 2:
+        return None
+    id_, cur = __read_id(head, 0)
+    size, cur, width = __read_size(head, cur)
+    return id_, pos + cur, size, width
+
+
+def __scan(f, file_size):
+    header = __read_header(f, 0)
+    if header is None or header[0] != EBML or header[2] is None:
+        return None
+    f.seek(header[1])
+    ebml = dict(__children(f.read(header[2])))
+    if ebml.get(DOC_TYPE, b"").rstrip(b"\0") not in [b"matroska", b"webm"]:
+        return None
+    segment = __read_header(f, header[1] + header[2])
+    if segment is None or segment[0] != SEGMENT:
+        return None
+    _, start, seg_size, seg_width = segment
+    end = file_size if seg_size is None else start + seg_size
+    elements = []
+    pos = start
+    while pos < end:
+        if (element := __read_header(f, pos)) is None:
+            break
+        id_, data_start, size, _ = element
+        if size is None:
+            return None
+        elements.append([id_, pos, data_start, data_start + size])
+        pos = data_start + size
+    return start, end, seg_size, seg_width, elements
+
+
+def __reserve(fd, size, new_size):
+    try:
+        posix_fallocate(fd, size, new_size - size)
+    except OSError as e:
+        if e.errno == ENOSPC:
+            raise
+        ftruncate(fd, new_size)
+
+
+def __apply(f, writes, size):
+    if (new_size := max(pos + len(data) for pos, data in writes)) > size:
+        __reserve(f.fileno(), size, new_size)
+    undo = []
+    try:
+        for pos, data in writes:
+            f.seek(pos)
+            undo.append((pos, f.read(len(data))))
+            f.seek(pos)
+            f.write(data)
+            f.flush()
+            fsync(f.fileno())
+    except OSError:
+        with suppress(OSError):
+            for pos, data in reversed(undo):
+                f.seek(pos)
+                f.write(data)
+            f.truncate(size)
+            f.flush()
+            fsync(f.fileno())
+        raise
+
+
+def __slot(elements, index):
+    end = elements[index][3]
+    for element in elements[index + 1 :]:
+        if element[0] != VOID or element[1] != end:
+            break
+        end = element[3]
+    return end - elements[index][1]
+
+
+def edit_mkv_tags(path, title):
+    with open(path, "r+b") as f:
+        stat = fstat(f.fileno())
+        if stat.st_nlink > 1:
+            return False
+        if (layout := __scan(f, stat.st_size)) is None:
+            return False
+        start, end, seg_size, seg_width, elements = layout
+        first_cluster = next(
+            (i for i, element in enumerate(elements) if element[0] == CLUSTER),
+            len(elements),
+        )
+        items = []
+        for id_, _, data_start, data_end in elements[:first_cluster]:
+            if id_ != VOID:
+                f.seek(data_start)
+                items.append((id_, f.read(data_end - data_start)))
+        ids = [id_ for id_, _ in items]
+        if (
+            INFO not in ids
+            or TRACKS not in ids
+            or len(set(ids)) != len(ids)
+            or SEEK_HEAD in ids[1:]
+        ):
+            return False
+        tail_tags = None
+        for i, element in enumerate(elements[first_cluster:], first_cluster):
+            if element[0] in [SEEK_HEAD, INFO, TRACKS, TAGS]:
+                if element[0] != TAGS or TAGS in ids or tail_tags is not None:
+                    return False
+                tail_tags = i
+        region_pos = elements[0][1]
+        region_size = elements[first_cluster - 1][3] - region_pos
+        offset = region_pos - start
+        old_tags = b""
+        for i, (id_, payload) in enumerate(items):
+            if id_ == INFO:
+                items[i] = (id_, __edit_info(payload, title))
+            elif id_ == TRACKS:
+                items[i] = (id_, __edit_tracks(payload, title))
+            elif id_ == TAGS:
+                old_tags = payload
+        if tail_tags is not None:
+            _, _, data_start, data_end = elements[tail_tags]
+            f.seek(data_start)
+            old_tags = f.read(data_end - data_start)
+        tags = __edit_tags(old_tags)
+
+        writes = []
+        head_items = [item for item in items if item[0] != TAGS]
+        if tail_tags is not None:
+            old = elements[tail_tags]
+            data = __fit(TAGS, tags, __slot(elements, tail_tags))
+            if data is not None and (
+                region := __region(items, region_size, offset, {})
+            ) is not None:
+                writes.extend([(old[1], data), (region_pos, region)])
+        if not writes and (
+            region := __region(head_items + [(TAGS, tags)], region_size, offset, {})
+        ):
+            writes.append((region_pos, region))
+            if tail_tags is not None:
+                writes.append((old[1], __void(old[3] - old[1])))
+        if not writes:
+            if SEEK_HEAD not in ids or end != stat.st_size:
+                return False
+            region = __region(head_items, region_size, offset, {TAGS: end - start})
+            if region is None:
+                return False
+            tail = __element(TAGS, tags)
+            writes.append((end, tail))
+            if seg_size is not None:
+                if (size := __encode_size(seg_size + len(tail), seg_width)) is None:
+                    return False
+                writes.append((start - seg_width, size))
+            writes.append((region_pos, region))
+            if tail_tags is not None:
+                writes.append((old[1], __void(old[3] - old[1])))
+        __apply(f, writes, stat.st_size)
+    return True
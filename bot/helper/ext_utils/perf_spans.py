@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+from time import time
+from resource import getrusage, RUSAGE_CHILDREN
+from collections import deque
+
+PERF_SPANS = deque(maxlen=10000)
+
+
+def children_cpu_time():
+    usage = getrusage(RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class PerfSpan:
+    __slots__ = (
+        "uid",
+        "stage",
+        "engine",
+        "start",
+        "duration",
+        "cpu",
+        "bytes_in",
+        "bytes_out",
+    )
+
+    def __init__(self, uid, stage, engine, bytes_in=0):
+        self.uid = uid
+        self.stage = stage
+        self.engine = engine
+        self.start = time()
+        self.duration = None
+        self.cpu = children_cpu_time()
+        self.bytes_in = bytes_in
+        self.bytes_out = 0
+
+    def finish(self, bytes_out=0):
+        if self.duration is not None:
+            return
+        self.duration = time() - self.start
+        self.cpu = children_cpu_time() - self.cpu
+        self.bytes_out = bytes_out
+        PERF_SPANS.append(self)
+
+    @property
+    def bound(self):
+        if self.stage.endswith("queue"):
+            return "wait"
+        return "cpu" if self.duration and self.cpu / self.duration >= 0.5 else "io"
+
+    def to_dict(self):
+        return {
+            "uid": self.uid,
+            "stage": self.stage,
+            "engine": self.engine,
+            "start": self.start,
+            "duration": self.duration,
+            "cpu": self.cpu,
+            "bound": self.bound,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+def percentile(values, pct):
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def get_perf_stats(window, key):
+    since = time() - window
+    groups = {}
+    for span in list(PERF_SPANS):
+        if span.start >= since:
+            groups.setdefault(key(span), []).append(span)
+    stats = {}
+    for group, spans in groups.items():
+        durations = sorted(span.duration for span in spans)
+        stats[group] = {
+            "count": len(spans),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "p99": percentile(durations, 99),
+            "cpu": sum(span.bound == "cpu" for span in spans),
+            "bytes": sum(span.bytes_in for span in spans),
+        }
+    return dict(sorted(stats.items()))
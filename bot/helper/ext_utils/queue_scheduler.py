@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+from time import time
+from heapq import heappush, heappop
+from collections import deque
+
+from bot import (
+    OWNER_ID,
+    config_dict,
+    download_dict,
+    user_data,
+    queued_dl,
+    queued_up,
+    queued_proc,
+)
+
+QUEUES = {"dl": queued_dl, "up": queued_up, "proc": queued_proc}
+QUEUE_STARTS = {name: deque(maxlen=20) for name in QUEUES}
+ORDER_CACHE = {}
+
+
+def __task_info(uid):
+    if (task := download_dict.get(uid)) is None:
+        return 3, None, 0
+    user_id = task.message.from_user.id
+    if user_id == OWNER_ID:
+        priority = 0
+    elif user_data.get(user_id, {}).get("is_sudo"):
+        priority = 1
+    else:
+        priority = 2
+    try:
+        size = task.metrics().total
+    except Exception:
+        size = 0
+    return priority, user_id, size
+
+
+def queue_order(queue):
+    mode = str(config_dict["QUEUE_MODE"]).lower()
+    if mode == "fifo":
+        return list(queue)
+    groups = {}
+    for uid in list(queue):
+        priority, user_id, size = __task_info(uid)
+        groups.setdefault((priority, user_id), []).append((size or float("inf"), uid))
+    heap = []
+    for index, ((priority, user_id), tasks) in enumerate(groups.items()):
+        if mode == "sjf":
+            tasks.sort(key=lambda task: task[0])
+        tasks.reverse()
+        running = download_dict.user_count(user_id) - len(tasks) if user_id else 0
+        heappush(heap, (priority, running, index, tasks))
+    order = []
+    while heap:
+        priority, running, index, tasks = heappop(heap)
+        order.append(tasks.pop()[1])
+        if tasks:
+            heappush(heap, (priority, running + 1, index, tasks))
+    return order
+
+
+def record_queue_start(name):
+    QUEUE_STARTS[name].append(time())
+
+
+def __estimate(name, position):
+    if len(starts := QUEUE_STARTS[name]) < 2:
+        return None
+    gap = (starts[-1] - starts[0]) / (len(starts) - 1)
+    return max(starts[-1] + gap * position - time(), 0)
+
+
+def queue_position(uid):
+    for name, queue in QUEUES.items():
+        if uid not in queue:
+            continue
+        cached = ORDER_CACHE.get(name)
+        if cached is None or time() - cached[0] >= 1 or uid not in cached[1]:
+            cached = ORDER_CACHE[name] = (time(), queue_order(queue))
+        position = cached[1].index(uid) + 1 if uid in cached[1] else len(cached[1])
+        return position, __estimate(name, position)
+    return None, None
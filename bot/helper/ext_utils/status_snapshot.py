@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+from time import time
+from asyncio import Lock, gather, create_task, shield
+from aria2p import Download
+
+from bot import (
+    LOGGER,
+    aria2,
+    get_client,
+    config_dict,
+    download_dict,
+)
+from bot.helper.ext_utils.bot_utils import (
+    MirrorStatus,
+    get_readable_message,
+    get_status_pages,
+    sync_to_async,
+)
+from bot.helper.ext_utils.queue_scheduler import queue_position
+from bot.helper.mirror_utils.status_utils.aria2_status import Aria2Status
+from bot.helper.mirror_utils.status_utils.qbit_status import QbittorrentStatus
+
+snapshot_lock = Lock()
+qb_client = []
+page_cache = {}
+
+
+class TaskSnapshot:
+    def __init__(self, uid, download):
+        self.uid = uid
+        self.download = download
+        self.message = download.message
+        self.status = download.status()
+        self.name = download.name()
+        self.gid = download.gid()
+        self.mode = download.upload_details["mode"]
+        self.metrics = download.metrics()
+        self.eng = self.metrics.engine
+        self.seeders = self.leechers = None
+        if hasattr(download, "seeders_num"):
+            try:
+                self.seeders = download.seeders_num()
+                self.leechers = download.leechers_num()
+            except Exception:
+                pass
+        self.dl_speed = self.up_speed = 0
+        self.ratio = self.seeding_time = self.queue_pos = None
+        if self.status == MirrorStatus.STATUS_DOWNLOADING:
+            self.dl_speed = self.metrics.speed
+        elif self.status == MirrorStatus.STATUS_UPLOADING:
+            self.up_speed = self.metrics.speed
+        elif self.status == MirrorStatus.STATUS_SEEDING:
+            self.up_speed = self.metrics.up_speed
+            self.ratio = download.ratio()
+            self.seeding_time = download.seeding_time()
+        elif self.status in [
+            MirrorStatus.STATUS_QUEUEDL,
+            MirrorStatus.STATUS_QUEUEUP,
+            MirrorStatus.STATUS_QUEUEPR,
+        ]:
+            self.queue_pos, eta = queue_position(uid)
+            if eta is not None:
+                self.metrics.eta = eta
+
+
+class StatusSnapshot:
+    def __init__(self, version=0, tasks=()):
+        self.version = version
+        self.tasks = tasks
+        self.time = time() if version else 0
+        self.dl_speed = sum(task.dl_speed for task in tasks)
+        self.up_speed = sum(task.up_speed for task in tasks)
+
+    def totals(self, key):
+        totals = {}
+        for task in self.tasks:
+            total = totals.setdefault(key(task), [0, 0])
+            total[0] += task.dl_speed
+            total[1] += task.up_speed
+        return totals
+
+
+latest_snapshot = StatusSnapshot()
+
+
+def __fetch_qbit_torrents():
+    if not qb_client:
+        qb_client.append(get_client())
+    try:
+        return {tor.tags: tor for tor in qb_client[0].torrents_info()}
+    except Exception as e:
+        LOGGER.error(f"{e}: Qbittorrent, while getting all torrents info")
+        qb_client.clear()
+        return {}
+
+
+def __fetch_aria2_downloads():
+    try:
+        results = aria2.client.multicall2(
+            [
+                (aria2.client.TELL_ACTIVE,),
+                (aria2.client.TELL_WAITING, 0, 1000),
+            ]
+        )
+    except Exception as e:
+        LOGGER.error(f"{e}: Aria2c, while getting all downloads info")
+        return {}
+    downloads = {}
+    for result in results:
+        if isinstance(result, list) and result and isinstance(result[0], list):
+            result = result[0]
+        if not isinstance(result, list):
+            continue
+        for struct in result:
+            downloads[struct["gid"]] = Download(aria2, struct)
+    return downloads
+
+
+def __build_tasks(tasks):
+    snapshots = []
+    for uid, download in tasks:
+        try:
+            snapshots.append(TaskSnapshot(uid, download))
+        except Exception as e:
+            LOGGER.error(f"Status Snapshot: {e}")
+    return tuple(snapshots)
+
+
+async def __collect():
+    _, tasks = download_dict.published
+    qbit_tasks = [dl for _, dl in tasks if isinstance(dl, QbittorrentStatus)]
+    aria_tasks = [dl for _, dl in tasks if isinstance(dl, Aria2Status)]
+    torrents, downloads = await gather(
+        sync_to_async(__fetch_qbit_torrents) if qbit_tasks else __empty(),
+        sync_to_async(__fetch_aria2_downloads) if aria_tasks else __empty(),
+    )
+    for dl in qbit_tasks:
+        dl.refresh(torrents.get(dl.tag))
+    for dl in aria_tasks:
+        dl.refresh(downloads.get(dl.cached_gid))
+    return await sync_to_async(__build_tasks, tasks)
+
+
+async def __empty():
+    return {}
+
+
+async def get_status_snapshot(max_age=1):
+    global latest_snapshot
+    async with snapshot_lock:
+        if time() - latest_snapshot.time >= max_age:
+            latest_snapshot = StatusSnapshot(
+                latest_snapshot.version + 1, await __collect()
+            )
+        return latest_snapshot
+
+
+async def __render_page(snapshot, page_no):
+    msg, buttons = await sync_to_async(get_readable_message, snapshot, page_no)
+    return msg, buttons, hash((msg, page_no))
+
+
+async def get_status_page(snapshot, page_no=1):
+    page_no = min(page_no, get_status_pages(len(snapshot.tasks)))
+    key = (snapshot.version, page_no, config_dict["BOT_THEME"])
+    if (page := page_cache.get(key)) is None:
+        for old_key in [k for k in page_cache if k[0] != snapshot.version]:
+            del page_cache[old_key]
+        page = page_cache[key] = create_task(__render_page(snapshot, page_no))
+    try:
+        return await shield(page)
+    except Exception:
+        if page_cache.get(key) is page:
+            del page_cache[key]
+        raise
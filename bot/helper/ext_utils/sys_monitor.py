@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+from time import time
+from asyncio import sleep
+from collections import deque
+from psutil import (
+    cpu_percent,
+    virtual_memory,
+    swap_memory,
+    disk_usage,
+    disk_io_counters,
+    net_io_counters,
+)
+
+from bot import LOGGER, bot_loop, config_dict
+
+SAMPLE_INTERVAL = 5
+SYS_HISTORY = deque(maxlen=900 // SAMPLE_INTERVAL + 1)
+
+
+class SysSample:
+    __slots__ = (
+        "time",
+        "cpu",
+        "memory",
+        "swap",
+        "disk",
+        "root_disk",
+        "disk_io",
+        "net_io",
+    )
+
+    def __init__(self):
+        self.time = time()
+        self.cpu = cpu_percent()
+        self.memory = virtual_memory()
+        self.swap = swap_memory()
+        self.disk = disk_usage(config_dict["DOWNLOAD_DIR"])
+        self.root_disk = disk_usage("/")
+        try:
+            self.disk_io = disk_io_counters()
+        except Exception:
+            self.disk_io = None
+        self.net_io = net_io_counters()
+
+
+def get_sys_sample():
+    if not SYS_HISTORY:
+        SYS_HISTORY.append(SysSample())
+    return SYS_HISTORY[-1]
+
+
+def get_sys_rates(period):
+    if len(SYS_HISTORY) < 2:
+        return None
+    latest = SYS_HISTORY[-1]
+    oldest = next(s for s in SYS_HISTORY if latest.time - s.time <= period + 1)
+    if (elapsed := latest.time - oldest.time) <= 0:
+        return None
+    rates = [
+        (latest.net_io.bytes_sent - oldest.net_io.bytes_sent) / elapsed,
+        (latest.net_io.bytes_recv - oldest.net_io.bytes_recv) / elapsed,
+        0,
+        0,
+    ]
+    if latest.disk_io and oldest.disk_io:
+        rates[2] = (latest.disk_io.read_bytes - oldest.disk_io.read_bytes) / elapsed
+        rates[3] = (latest.disk_io.write_bytes - oldest.disk_io.write_bytes) / elapsed
+    return rates
+
+
+async def sys_sampler():
+    while True:
+        try:
+            SYS_HISTORY.append(await bot_loop.run_in_executor(None, SysSample))
+        except Exception as e:
+            LOGGER.error(f"System sampler: {e}")
+        await sleep(SAMPLE_INTERVAL)
@@ -7,15 +7,26 @@ from bot import (
     config_dict,
     queued_dl,
     queued_up,
+    queued_proc,
     non_queued_up,
     non_queued_dl,
+    non_queued_proc,
     queue_dict_lock,
     LOGGER,
     user_data,
     download_dict,
 )
 from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper
-from bot.helper.ext_utils.fs_utils import get_base_name, check_storage_threshold
+from bot.helper.ext_utils.fs_utils import get_base_name
+from bot.helper.ext_utils.disk_ledger import (
+    DISK_LEDGER,
+    DISK_WAITING,
+    disk_ready,
+    estimate_stages,
+    release_disk,
+    reserve_disk,
+)
+from bot.helper.ext_utils.queue_scheduler import queue_order, record_queue_start
 from bot.helper.ext_utils.bot_utils import (
     get_user_tasks,
     getdailytasks,
@@ -72,30 +83,71 @@ async def is_queued(uid):
     dl_limit = config_dict["QUEUE_DOWNLOAD"]
     event = None
     added_to_queue = False
-    if all_limit or dl_limit:
+    if all_limit or dl_limit or uid in DISK_WAITING:
         async with queue_dict_lock:
             dl = len(non_queued_dl)
             up = len(non_queued_up)
             if (
-                all_limit and dl + up >= all_limit and (not dl_limit or dl >= dl_limit)
-            ) or (dl_limit and dl >= dl_limit):
+                (
+                    all_limit
+                    and dl + up >= all_limit
+                    and (not dl_limit or dl >= dl_limit)
+                )
+                or (dl_limit and dl >= dl_limit)
+                or uid in DISK_WAITING
+            ):
                 added_to_queue = True
                 event = Event()
                 queued_dl[uid] = event
     return added_to_queue, event
 
 
+async def is_process_queued(uid):
+    event = None
+    if proc_limit := config_dict["QUEUE_PROCESS"]:
+        async with queue_dict_lock:
+            if uid in non_queued_proc:
+                return False, None
+            if queued_proc or len(non_queued_proc) >= proc_limit:
+                event = Event()
+                queued_proc[uid] = event
+            else:
+                non_queued_proc.add(uid)
+    return event is not None, event
+
+
 def start_dl_from_queued(uid):
     queued_dl[uid].set()
     del queued_dl[uid]
+    record_queue_start("dl")
 
 
 def start_up_from_queued(uid):
     queued_up[uid].set()
     del queued_up[uid]
+    record_queue_start("up")
+
+
+def start_proc_from_queued(uid):
+    non_queued_proc.add(uid)
+    queued_proc[uid].set()
+    del queued_proc[uid]
+    record_queue_start("proc")
+
+
+async def __start_queued_proc():
+    async with queue_dict_lock:
+        if not queued_proc:
+            return
+        proc_limit = config_dict["QUEUE_PROCESS"]
+        for uid in queue_order(queued_proc):
+            if proc_limit and len(non_queued_proc) >= proc_limit:
+                break
+            start_proc_from_queued(uid)
 
 
 async def start_from_queued():
+    await __start_queued_proc()
     if all_limit := config_dict["QUEUE_ALL"]:
         dl_limit = config_dict["QUEUE_DOWNLOAD"]
         up_limit = config_dict["QUEUE_UPLOAD"]
@@ -106,14 +158,16 @@ async def start_from_queued():
             if all_ < all_limit:
                 f_tasks = all_limit - all_
                 if queued_up and (not up_limit or up < up_limit):
-                    for index, uid in enumerate(list(queued_up.keys()), start=1):
+                    for index, uid in enumerate(queue_order(queued_up), start=1):
                         f_tasks = all_limit - all_
                         start_up_from_queued(uid)
                         f_tasks -= 1
                         if f_tasks == 0 or (up_limit and index >= up_limit - up):
                             break
                 if queued_dl and (not dl_limit or dl < dl_limit) and f_tasks != 0:
-                    for index, uid in enumerate(list(queued_dl.keys()), start=1):
+                    for index, uid in enumerate(
+                        disk_ready(queue_order(queued_dl)), start=1
+                    ):
                         start_dl_from_queued(uid)
                         if (dl_limit and index >= dl_limit - dl) or index == f_tasks:
                             break
@@ -124,14 +178,14 @@ async def start_from_queued():
             up = len(non_queued_up)
             if queued_up and up < up_limit:
                 f_tasks = up_limit - up
-                for index, uid in enumerate(list(queued_up.keys()), start=1):
+                for index, uid in enumerate(queue_order(queued_up), start=1):
                     start_up_from_queued(uid)
                     if index == f_tasks:
                         break
     else:
         async with queue_dict_lock:
             if queued_up:
-                for uid in list(queued_up.keys()):
+                for uid in queue_order(queued_up):
                     start_up_from_queued(uid)
 
     if dl_limit := config_dict["QUEUE_DOWNLOAD"]:
@@ -139,14 +193,16 @@ async def start_from_queued():
             dl = len(non_queued_dl)
             if queued_dl and dl < dl_limit:
                 f_tasks = dl_limit - dl
-                for index, uid in enumerate(list(queued_dl.keys()), start=1):
+                for index, uid in enumerate(
+                    disk_ready(queue_order(queued_dl)), start=1
+                ):
                     start_dl_from_queued(uid)
                     if index == f_tasks:
                         break
     else:
         async with queue_dict_lock:
             if queued_dl:
-                for uid in list(queued_dl.keys()):
+                for uid in disk_ready(queue_order(queued_dl)):
                     start_dl_from_queued(uid)
 
 
@@ -158,10 +214,14 @@ async def limit_checker(
     isDriveLink=False,
     isYtdlp=False,
     isPlayList=None,
+    started=False,
 ):
     LOGGER.info("Checking Size Limit of link/file/folder/tasks...")
     user_id = listener.message.from_user.id
+    STORAGE_THRESHOLD = config_dict["STORAGE_THRESHOLD"]
     if await CustomFilters.sudo("", listener.message):
+        if STORAGE_THRESHOLD and not listener.isClone:
+            DISK_LEDGER[listener.uid] = estimate_stages(size, listener)
         return
     limit_exceeded = ""
     if listener.isClone:
@@ -205,16 +265,16 @@ async def limit_checker(
             if size > limit:
                 limit_exceeded = f"Leech limit is {get_readable_file_size(limit)}"
 
-        if (
-            STORAGE_THRESHOLD := config_dict["STORAGE_THRESHOLD"]
-        ) and not listener.isClone:
-            arch = any([listener.compress, listener.extract])
+        if STORAGE_THRESHOLD and not listener.isClone:
             limit = STORAGE_THRESHOLD * 1024**3
-            acpt = await sync_to_async(check_storage_threshold, size, limit, arch)
+            stages = estimate_stages(size, listener)
+            acpt = await sync_to_async(reserve_disk, listener.uid, stages, limit)
             if not acpt:
                 limit_exceeded = (
                     f"You must leave {get_readable_file_size(limit)} free storage."
                 )
+            elif started and listener.uid in DISK_WAITING:
+                limit_exceeded = f"Not enough free storage now, {get_readable_file_size(sum(stages.values()))} needed with other tasks in progress."
 
         if config_dict["DAILY_TASK_LIMIT"] and config_dict[
             "DAILY_TASK_LIMIT"
@@ -248,6 +308,7 @@ async def limit_checker(
                     f"User : {user_id} | Daily Leech Size : {get_readable_file_size(lsize)}"
                 )
     if limit_exceeded:
+        release_disk(listener.uid)
         if size:
             return f"{limit_exceeded}.\nYour List/File/Folder size is {get_readable_file_size(size)}."
         elif isPlayList != 0:
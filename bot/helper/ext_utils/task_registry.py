@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+from threading import RLock
+
+
+class TaskRegistry(dict):
+    def __init__(self):
+        super().__init__()
+        self.__lock = RLock()
+        self.__keys = {}
+        self.__gids = {}
+        self.__users = {}
+        self.__pending = set()
+        self.__version = 0
+        self.__published = (0, ())
+
+    @staticmethod
+    def __task_gid(task, fresh=False):
+        try:
+            if not fresh and hasattr(task, "cached_gid"):
+                return task.cached_gid
+            return task.gid()
+        except Exception:
+            return None
+
+    def __index(self, uid, task, gid):
+        user_id = task.message.from_user.id
+        self.__keys[uid] = (gid, user_id)
+        if gid is None:
+            self.__pending.add(uid)
+        else:
+            self.__gids[gid] = uid
+        self.__users.setdefault(user_id, set()).add(uid)
+
+    def __unindex(self, uid):
+        if (keys := self.__keys.pop(uid, None)) is None:
+            return
+        gid, user_id = keys
+        self.__pending.discard(uid)
+        if gid is not None and self.__gids.get(gid) == uid:
+            del self.__gids[gid]
+        self.__users[user_id].discard(uid)
+        if not self.__users[user_id]:
+            del self.__users[user_id]
+
+    def __publish(self):
+        self.__version += 1
+
+    @property
+    def published(self):
+        if (published := self.__published)[0] == self.__version:
+            return published
+        with self.__lock:
+            if self.__published[0] != self.__version:
+                self.__published = (self.__version, tuple(super().items()))
+            return self.__published
+
+    def __setitem__(self, uid, task):
+        with self.__lock:
+            self.__unindex(uid)
+            super().__setitem__(uid, task)
+            self.__index(uid, task, self.__task_gid(task))
+            self.__publish()
+
+    def __delitem__(self, uid):
+        with self.__lock:
+            super().__delitem__(uid)
+            self.__unindex(uid)
+            self.__publish()
+
+    def pop(self, uid, *default):
+        with self.__lock:
+            self.__unindex(uid)
+            task = super().pop(uid, *default)
+            self.__publish()
+            return task
+
+    def clear(self):
+        with self.__lock:
+            super().clear()
+            self.__publish()
+            for index in (self.__keys, self.__gids, self.__users, self.__pending):
+                index.clear()
+
+    def reindex(self, uid, fresh=False):
+        with self.__lock:
+            if uid not in self.__keys:
+                return
+            task = self[uid]
+            self.__unindex(uid)
+            self.__index(uid, task, self.__task_gid(task, fresh))
+
+    def move_gid(self, old_gid, new_gid):
+        with self.__lock:
+            if (uid := self.__gids.pop(old_gid, None)) is None:
+                return
+            self.__gids[new_gid] = uid
+            self.__keys[uid] = (new_gid, self.__keys[uid][1])
+
+    def by_gid(self, gid):
+        with self.__lock:
+            if (uid := self.__gids.get(gid)) is None and self.__pending:
+                for pending in list(self.__pending):
+                    self.reindex(pending, True)
+                uid = self.__gids.get(gid)
+            return None if uid is None else self.get(uid)
+
+    def by_user(self, user_id):
+        with self.__lock:
+            return [self[uid] for uid in self.__users.get(user_id, ())]
+
+    def user_count(self, user_id):
+        return len(self.__users.get(user_id, ()))
@@ -73,7 +73,7 @@ async def __onDownloadStarted(api, gid):
                 download = download.live
             size = download.total_length
             LOGGER.info(f"listener size : {size}")
-            if limit_exceeded := await limit_checker(size, listener):
+            if limit_exceeded := await limit_checker(size, listener, started=True):
                 await listener.onDownloadError(limit_exceeded)
                 await sync_to_async(api.remove, [download], force=True, files=True)
     if config_dict["STOP_DUPLICATE"]:
@@ -126,6 +126,8 @@ async def __onDownloadComplete(api, gid):
     if download.followed_by_ids:
         new_gid = download.followed_by_ids[0]
         LOGGER.info(f"Gid changed from {gid} to {new_gid}")
+        async with download_dict_lock:
+            download_dict.move_gid(gid, new_gid)
         if dl := await getDownloadByGid(new_gid):
             listener = dl.listener()
             if config_dict["BASE_URL"] and listener.select:
@@ -2,6 +2,7 @@ from time import sleep
 
 from bot import LOGGER, aria2
 from bot.helper.ext_utils.bot_utils import async_to_sync, sync_to_async
+from bot.helper.ext_utils.hash_service import caption_hash, prefetch_hash
 
 
 class DirectListener:
@@ -12,6 +13,9 @@ class DirectListener:
         self.__a2c_opt = a2c_opt
         self.__proc_bytes = 0
         self.__failed = 0
+        self.__files = []
+        self.__completed = set()
+        self.__hash = caption_hash(listener)
         self.task = None
         self.name = foldername
         self.total_size = total_size
@@ -26,8 +30,19 @@ class DirectListener:
     def speed(self):
         return self.task.download_speed if self.task else 0
 
+    def stream_files(self):
+        return [(path, path in self.__completed) for path in self.__files]
+
     def download(self, contents):
         self.is_downloading = True
+        self.__files = [
+            (
+                f"{self.__path}/{content['path']}/{content['filename']}"
+                if content["path"]
+                else f"{self.__path}/{content['filename']}"
+            )
+            for content in contents
+        ]
         for content in contents:
             if self.__is_cancelled:
                 break
@@ -59,6 +74,9 @@ class DirectListener:
                     break
                 elif self.task.is_complete:
                     self.__proc_bytes += self.task.total_length
+                    self.__completed.add(f"{self.__a2c_opt['dir']}/{filename}")
+                    if self.__hash:
+                        prefetch_hash(f"{self.__a2c_opt['dir']}/{filename}")
                     self.task.remove(True)
                     break
                 sleep(1)
@@ -80,7 +80,9 @@ async def __size_checked(tor):
     if hasattr(download, "listener"):
         listener = download.listener()
         size = tor.size
-        if limit_exceeded := await limit_checker(size, listener, isTorrent=True):
+        if limit_exceeded := await limit_checker(
+            size, listener, isTorrent=True, started=True
+        ):
             await __onDownloadError(limit_exceeded, tor)
 
 
@@ -7,10 +7,10 @@ from datetime import datetime
 from urllib.parse import unquote, quote
 from requests import utils as rutils
 from aiofiles.os import path as aiopath, remove as aioremove, listdir, makedirs
-from os import walk, path as ospath
+from os import walk, path as ospath, cpu_count
+from re import sub as re_sub
 from html import escape
-from aioshutil import move
-from asyncio import create_subprocess_exec, sleep, Event
+from asyncio import sleep, Event, Semaphore, gather
 from pyrogram.enums import ChatType
 
 from bot import (
@@ -31,6 +31,8 @@ from bot import (
     non_queued_dl,
     queued_up,
     queued_dl,
+    queued_proc,
+    non_queued_proc,
     queue_dict_lock,
     bot,
     GLOBAL_EXTENSION_FILTER,
@@ -53,14 +55,21 @@ from bot.helper.ext_utils.fs_utils import (
     is_archive_split,
     join_files,
     edit_metadata,
+    has_metadata,
+    run_7z,
 )
+from bot.helper.ext_utils.file_ops import move_path
 from bot.helper.ext_utils.leech_utils import (
+    SPLIT_QUEUE_SIZE,
     split_file,
     format_filename,
     get_document_type,
 )
 from bot.helper.ext_utils.exceptions import NotSupportedExtractionArchive
-from bot.helper.ext_utils.task_manager import start_from_queued
+from bot.helper.ext_utils.task_manager import start_from_queued, is_process_queued
+from bot.helper.ext_utils.bot_metrics import inc_metric
+from bot.helper.ext_utils.perf_spans import PerfSpan
+from bot.helper.ext_utils.disk_ledger import reserve_stage, release_stage, release_disk
 from bot.helper.mirror_utils.status_utils.extract_status import ExtractStatus
 from bot.helper.mirror_utils.status_utils.zip_status import ZipStatus
 from bot.helper.mirror_utils.status_utils.split_status import SplitStatus
@@ -71,6 +80,7 @@ from bot.helper.mirror_utils.status_utils.rclone_status import RcloneStatus
 from bot.helper.mirror_utils.status_utils.queue_status import QueueStatus
 from bot.helper.mirror_utils.upload_utils.gdriveTools import GoogleDriveHelper
 from bot.helper.mirror_utils.upload_utils.pyrogramEngine import TgUploader
+from bot.helper.mirror_utils.upload_utils.stream_leech import StreamLeech, is_streamable
 from bot.helper.mirror_utils.upload_utils.ddlEngine import DDLUploader
 from bot.helper.mirror_utils.rclone_utils.transfer import RcloneTransferHelper
 from bot.helper.mirror_utils.status_utils.metadata_status import MetadataStatus
@@ -160,6 +170,9 @@ class MirrorLeechListener:
             )
         )
         self.source_msg = ""
+        self.spans = []
+        self.upload_span = None
+        self.streamer = None
         self.__setModeEng()
         self.__parseSource()
 
@@ -177,9 +190,170 @@ class MirrorLeechListener:
     def __setModeEng(self):
         mode = f" #{'Leech' if self.isLeech else 'Clone' if self.isClone else 'RClone' if self.upPath not in ['gd', 'ddl'] else 'DDL' if self.upPath != 'gd' else 'GDrive'}"
         mode += " (Zip)" if self.compress else " (Unzip)" if self.extract else ""
-        mode += f" | #{'qBit' if self.isQbit else 'ytdlp' if self.isYtdlp else 'GDrive' if (self.isClone or self.isGdrive) else 'Mega' if self.isMega else 'Aria2' if self.source_url and self.source_url != self.message.link else 'Tg'}"
+        self.engine = (
+            "qBit"
+            if self.isQbit
+            else (
+                "ytdlp"
+                if self.isYtdlp
+                else (
+                    "GDrive"
+                    if (self.isClone or self.isGdrive)
+                    else (
+                        "Mega"
+                        if self.isMega
+                        else (
+                            "Aria2"
+                            if self.source_url and self.source_url != self.message.link
+                            else "Tg"
+                        )
+                    )
+                )
+            )
+        )
+        mode += f" | #{self.engine}"
         self.upload_details["mode"] = mode
 
+    def __start_span(self, stage, bytes_in=0):
+        span = PerfSpan(self.uid, stage, self.engine, bytes_in)
+        self.spans.append(span)
+        return span
+
+    async def __wait_process(self, name, size, gid):
+        added_to_queue, event = await is_process_queued(self.uid)
+        if not added_to_queue:
+            return True
+        LOGGER.info(f"Added to Queue/Process: {name}")
+        span = self.__start_span("proc_queue", size)
+        async with download_dict_lock:
+            download_dict[self.uid] = QueueStatus(name, size, gid, self, "pr")
+        await update_all_messages()
+        await event.wait()
+        span.finish(size)
+        async with download_dict_lock:
+            if self.uid not in download_dict:
+                return False
+        LOGGER.info(f"Start from Queued/Process: {name}")
+        return True
+
+    async def wait_proc_slot(self, name):
+        added_to_queue, event = await is_process_queued(self.uid)
+        if not added_to_queue:
+            return True
+        LOGGER.info(f"Added to Queue/Process: {name}")
+        await event.wait()
+        async with queue_dict_lock:
+            if self.uid not in non_queued_proc:
+                return False
+        LOGGER.info(f"Start from Queued/Process: {name}")
+        return True
+
+    async def release_proc_slot(self):
+        async with queue_dict_lock:
+            if self.uid in non_queued_proc:
+                non_queued_proc.remove(self.uid)
+        await start_from_queued()
+
+    async def __extract_archives(self, archives, dir_files, pswd, status):
+        extract_sem = Semaphore(max((cpu_count() or 1) // 2, 1))
+        procs = []
+
+        async def extract(dirpath, file_):
+            f_path = ospath.join(dirpath, file_)
+            stem = re_sub(r"((\.|_)part0*1)?\.rar$|\.0*1$", "", file_)
+            weight = 0
+            for f in dir_files[dirpath]:
+                if f == file_ or f.startswith(f"{stem}.") and (
+                    is_archive_split(f) or is_archive(f)
+                ):
+                    weight += await aiopath.getsize(ospath.join(dirpath, f))
+            status.set_progress(f_path, weight, 0)
+            async with extract_sem:
+                if self.suproc == "cancelled":
+                    return -9
+                t_path = (
+                    dirpath.replace(self.dir, self.newDir) if self.seed else dirpath
+                )
+                cmd = [
+                    "7z",
+                    "x",
+                    f"-p{pswd}",
+                    f_path,
+                    f"-o{t_path}",
+                    "-aot",
+                    "-xr!@PaxHeader",
+                ]
+                if not pswd:
+                    del cmd[2]
+                code = await run_7z(
+                    self,
+                    cmd,
+                    lambda percent: status.set_progress(f_path, weight, percent),
+                    procs,
+                )
+                if code == -9 or self.suproc == "cancelled":
+                    self.suproc = "cancelled"
+                    for proc in procs:
+                        if proc.returncode is None:
+                            proc.kill()
+                    return -9
+                status.set_progress(f_path, weight, 100)
+                return code
+
+        codes = await gather(*(extract(dirpath, file_) for dirpath, file_ in archives))
+        return None if -9 in codes else codes
+
+    async def __edit_metadata(self, meta_path, metadata, status):
+        if await aiopath.isfile(meta_path):
+            files = [ospath.split(meta_path)]
+        else:
+            files = [
+                (dirpath, file)
+                for dirpath, _, dir_files in await sync_to_async(walk, meta_path)
+                for file in dir_files
+            ]
+        meta_sem = Semaphore(max(config_dict["METADATA_WORKERS"], 1))
+        procs = []
+
+        async def edit(index, dirpath, file):
+            video_file = ospath.join(dirpath, file)
+            async with meta_sem:
+                if self.suproc == "cancelled":
+                    return
+                size = await aiopath.getsize(video_file)
+                if (await get_document_type(video_file))[0] and not await has_metadata(
+                    video_file, metadata
+                ):
+                    outfile = ospath.join(self.newDir, str(index), file)
+                    code = await edit_metadata(
+                        self,
+                        dirpath,
+                        video_file,
+                        outfile,
+                        metadata,
+                        procs,
+                        lambda written: status.set_progress(index, written),
+                    )
+                    if code == -9 or self.suproc == "cancelled":
+                        self.suproc = "cancelled"
+                        for proc in procs:
+                            if proc.returncode is None:
+                                proc.kill()
+                        return
+                status.set_progress(index, size)
+
+        await gather(
+            *(edit(index, dirpath, file) for index, (dirpath, file) in enumerate(files))
+        )
+        return self.suproc != "cancelled"
+
+    async def __flush_spans(self):
+        if DATABASE_URL and config_dict["PERF_SPANS_DB"]:
+            if spans := [
+                span.to_dict() for span in self.spans if span.duration is not None
+            ]:
+                await DbManger().add_perf_spans(spans)
+
     def __parseSource(self):
         if self.source_url == self.message.link:
             file = self.message.reply_to_message
@@ -239,9 +413,16 @@ class MirrorLeechListener:
                 self.source_url,
                 self.message.text,
             )
+        if self.streamer is None and is_streamable(self):
+            self.streamer = StreamLeech(self)
+            self.streamer.start()
 
     async def onDownloadComplete(self):
         multi_links = False
+        if self.streamer is not None:
+            await self.streamer.stop()
+        if self.sameDir:
+            span = self.__start_span("same_dir")
         while True:
             if self.sameDir:
                 if (
@@ -268,11 +449,15 @@ class MirrorLeechListener:
                         continue
                     item_path = f"{self.dir}/{folder_name}/{item}"
                     if item in await listdir(des_path):
-                        await move(item_path, f"{des_path}/{self.uid}-{item}")
+                        await sync_to_async(
+                            move_path, item_path, f"{des_path}/{self.uid}-{item}"
+                        )
                     else:
-                        await move(item_path, f"{des_path}/{item}")
+                        await sync_to_async(move_path, item_path, f"{des_path}/{item}")
                 multi_links = True
             download = download_dict[self.uid]
+            if self.sameDir:
+                span.finish()
             name = str(download.name()).replace("/", "")
             gid = download.gid()
         LOGGER.info(f"Download Completed: {name}")
@@ -296,6 +481,7 @@ class MirrorLeechListener:
         dl_path = f"{self.dir}/{name}"
         up_path = ""
         size = await get_path_size(dl_path)
+        release_stage(self.uid, "download")
         async with queue_dict_lock:
             if self.uid in non_queued_dl:
                 non_queued_dl.remove(self.uid)
@@ -303,66 +489,57 @@ class MirrorLeechListener:
         user_dict = user_data.get(self.message.from_user.id, {})
 
         if self.join and await aiopath.isdir(dl_path):
+            if not await self.__wait_process(name, size, gid):
+                return
+            span = self.__start_span("join", size)
             await join_files(dl_path)
+            span.finish(await get_path_size(dl_path))
 
         if self.extract:
+            if not await self.__wait_process(name, size, gid):
+                return
             pswd = self.extract if isinstance(self.extract, str) else ""
+            reserve_stage(self.uid, "extract", size)
+            span = self.__start_span("extract", size)
             try:
                 if await aiopath.isfile(dl_path):
                     up_path = get_base_name(dl_path)
                 LOGGER.info(f"Extracting: {name}")
+                status = ExtractStatus(name, size, gid, self)
                 async with download_dict_lock:
-                    download_dict[self.uid] = ExtractStatus(name, size, gid, self)
+                    download_dict[self.uid] = status
                 if await aiopath.isdir(dl_path):
                     if self.seed:
                         self.newDir = f"{self.dir}10000"
                         up_path = f"{self.newDir}/{name}"
                     else:
                         up_path = dl_path
+                    archives = []
+                    dir_files = {}
                     for dirpath, _, files in await sync_to_async(
                         walk, dl_path, topdown=False
                     ):
+                        dir_files[dirpath] = files
                         for file_ in files:
                             if (
                                 is_first_archive_split(file_)
                                 or is_archive(file_)
                                 and not file_.endswith(".rar")
                             ):
-                                f_path = ospath.join(dirpath, file_)
-                                t_path = (
-                                    dirpath.replace(self.dir, self.newDir)
-                                    if self.seed
-                                    else dirpath
-                                )
-                                cmd = [
-                                    "7z",
-                                    "x",
-                                    f"-p{pswd}",
-                                    f_path,
-                                    f"-o{t_path}",
-                                    "-aot",
-                                    "-xr!@PaxHeader",
-                                ]
-                                if not pswd:
-                                    del cmd[2]
-                                if (
-                                    self.suproc == "cancelled"
-                                    or self.suproc is not None
-                                    and self.suproc.returncode == -9
-                                ):
-                                    return
-                                self.suproc = await create_subprocess_exec(*cmd)
-                                code = await self.suproc.wait()
-                                if code == -9:
-                                    return
-                                elif code != 0:
-                                    LOGGER.error("Unable to extract archive splits!")
-                        if (
-                            not self.seed
-                            and self.suproc is not None
-                            and self.suproc.returncode == 0
-                        ):
-                            for file_ in files:
+                                archives.append((dirpath, file_))
+                    codes = await self.__extract_archives(
+                        archives, dir_files, pswd, status
+                    )
+                    if codes is None:
+                        return
+                    failed = set()
+                    for (dirpath, _), code in zip(archives, codes):
+                        if code != 0:
+                            LOGGER.error("Unable to extract archive splits!")
+                            failed.add(dirpath)
+                    if not self.seed:
+                        for dirpath in {dirpath for dirpath, _ in archives} - failed:
+                            for file_ in dir_files[dirpath]:
                                 if is_archive_split(file_) or is_archive(file_):
                                     del_path = ospath.join(dirpath, file_)
                                     try:
@@ -386,8 +563,11 @@ class MirrorLeechListener:
                         del cmd[2]
                     if self.suproc == "cancelled":
                         return
-                    self.suproc = await create_subprocess_exec(*cmd)
-                    code = await self.suproc.wait()
+                    code = await run_7z(
+                        self,
+                        cmd,
+                        lambda percent: status.set_progress(dl_path, size, percent),
+                    )
                     if code == -9:
                         return
                     elif code == 0:
@@ -405,34 +585,26 @@ class MirrorLeechListener:
                 LOGGER.info("Not any valid archive, uploading file as it is.")
                 self.newDir = ""
                 up_path = dl_path
+            span.finish(await get_path_size(up_path))
+            release_stage(self.uid, "extract")
 
         if metadata := self.user_dict.get("lmeta") or config_dict["METADATA"]:
             meta_path = up_path or dl_path
+            if not await self.__wait_process(name, size, gid):
+                return
+            span = self.__start_span("metadata", await get_path_size(meta_path))
+            reserve_stage(self.uid, "metadata", span.bytes_in)
             self.newDir = f"{self.dir}10000"
             await makedirs(self.newDir, exist_ok=True)
+            status = MetadataStatus(name, span.bytes_in, gid, self)
             async with download_dict_lock:
-                download_dict[self.uid] = MetadataStatus(name, size, gid, self)
-            if (
-                await aiopath.isfile(meta_path)
-                and (await get_document_type(meta_path))[0]
-            ):
-                base_dir, file_name = ospath.split(meta_path)
-                outfile = ospath.join(self.newDir, file_name)
-                await edit_metadata(self, base_dir, meta_path, outfile, metadata)
-                if self.suproc == "cancelled":
-                    return
-            elif await aiopath.isdir(meta_path):
-                for dirpath, _, files in await sync_to_async(walk, meta_path):
-                    for file in files:
-                        if self.suproc == "cancelled":
-                            return
-                        video_file = ospath.join(dirpath, file)
-                        if (await get_document_type(video_file))[0]:
-                            outfile = ospath.join(self.newDir, file)
-                            await edit_metadata(
-                                self, dirpath, video_file, outfile, metadata
-                            )
+                download_dict[self.uid] = status
+            if not await self.__edit_metadata(meta_path, metadata, status):
+                return
+            span.finish(await get_path_size(meta_path))
+            release_stage(self.uid, "metadata")
 
+        zip_stream = None
         if self.compress:
             pswd = self.compress if isinstance(self.compress, str) else ""
             if up_path:
@@ -443,8 +615,6 @@ class MirrorLeechListener:
                 up_path = f"{self.newDir}/{name}.zip"
             else:
                 up_path = f"{dl_path}.zip"
-            async with download_dict_lock:
-                download_dict[self.uid] = ZipStatus(name, size, gid, self)
             LEECH_SPLIT_SIZE = (
                 user_dict.get("split_size", False) or config_dict["LEECH_SPLIT_SIZE"]
             )
@@ -464,34 +634,63 @@ class MirrorLeechListener:
                 if not pswd:
                     del cmd[4]
                 LOGGER.info(f"Zip: orig_path: {dl_path}, zip_path: {up_path}.0*")
+                zip_stream = (dl_path, up_path, LEECH_SPLIT_SIZE, cmd if pswd else None)
+                reserve_stage(
+                    self.uid,
+                    "compress",
+                    (
+                        size
+                        if pswd
+                        else min(size, LEECH_SPLIT_SIZE * (SPLIT_QUEUE_SIZE + 2))
+                    ),
+                )
+            elif not (self.isLeech or pswd or self.upPath in ["gd", "ddl"]):
+                LOGGER.info(f"Zip: orig_path: {dl_path}, streaming to: {up_path}")
+                zip_stream = (dl_path, up_path, 0, None)
             else:
                 del cmd[1]
                 if not pswd:
                     del cmd[3]
+                if not await self.__wait_process(name, size, gid):
+                    return
                 LOGGER.info(f"Zip: orig_path: {dl_path}, zip_path: {up_path}")
-            if self.suproc == "cancelled":
-                return
-            self.suproc = await create_subprocess_exec(*cmd)
-            code = await self.suproc.wait()
-            if code == -9:
-                return
-            elif not self.seed:
-                await clean_target(dl_path)
+                reserve_stage(self.uid, "compress", size)
+                compress_span = self.__start_span("compress", size)
+                status = ZipStatus(name, size, gid, self)
+                async with download_dict_lock:
+                    download_dict[self.uid] = status
+                if self.suproc == "cancelled":
+                    return
+                code = await run_7z(
+                    self,
+                    cmd,
+                    lambda percent: status.set_progress(dl_path, size, percent),
+                )
+                if code == -9:
+                    return
+                elif not self.seed:
+                    await clean_target(dl_path)
 
         if not self.compress and not self.extract:
             up_path = dl_path
 
         up_dir, up_name = up_path.rsplit("/", 1)
-        size = await get_path_size(up_dir)
+        if zip_stream is None:
+            size = await get_path_size(up_dir)
+        if self.compress and zip_stream is None:
+            compress_span.finish(size)
+            release_stage(self.uid, "compress")
+        LEECH_SPLIT_SIZE = 0
         if self.isLeech:
             m_size = []
             o_files = []
             if not self.compress:
-                checked = False
                 LEECH_SPLIT_SIZE = (
                     user_dict.get("split_size", False)
                     or config_dict["LEECH_SPLIT_SIZE"]
                 )
+            if LEECH_SPLIT_SIZE and self.seed and not self.newDir:
+                checked = False
                 for dirpath, _, files in await sync_to_async(
                     walk, up_dir, topdown=False
                 ):
@@ -500,12 +699,16 @@ class MirrorLeechListener:
                         f_size = await aiopath.getsize(f_path)
                         if f_size > LEECH_SPLIT_SIZE:
                             if not checked:
+                                if not await self.__wait_process(up_name, size, gid):
+                                    return
                                 checked = True
+                                span = self.__start_span("split", size)
                                 async with download_dict_lock:
                                     download_dict[self.uid] = SplitStatus(
                                         up_name, size, gid, self
                                     )
                                 LOGGER.info(f"Splitting: {up_name}")
+                            reserve_stage(self.uid, "split", size)
                             res = await split_file(
                                 f_path, f_size, file_, dirpath, LEECH_SPLIT_SIZE, self
                             )
@@ -518,14 +721,19 @@ class MirrorLeechListener:
                                     await aioremove(f_path)
                                 except Exception:
                                     return
-                            elif not self.seed or self.newDir:
-                                try:
-                                    await aioremove(f_path)
-                                except Exception:
-                                    return
                             else:
                                 m_size.append(f_size)
                                 o_files.append(file_)
+                if checked:
+                    span.finish(await get_path_size(up_dir))
+                release_stage(self.uid, "split")
+
+        split_inline = LEECH_SPLIT_SIZE and (not self.seed or self.newDir)
+        release_disk(
+            self.uid,
+            "split" if split_inline else "compress" if zip_stream else None,
+        )
+        await self.release_proc_slot()
 
         up_limit = config_dict["QUEUE_UPLOAD"]
         all_limit = config_dict["QUEUE_ALL"]
@@ -541,21 +749,33 @@ class MirrorLeechListener:
                 event = Event()
                 queued_up[self.uid] = event
         if added_to_queue:
+            span = self.__start_span("queue", size)
             async with download_dict_lock:
                 download_dict[self.uid] = QueueStatus(name, size, gid, self, "Up")
             await event.wait()
+            span.finish(size)
             async with download_dict_lock:
                 if self.uid not in download_dict:
                     return
             LOGGER.info(f"Start from Queued/Upload: {name}")
         async with queue_dict_lock:
             non_queued_up.add(self.uid)
+        self.upload_span = self.__start_span("upload", size)
         if self.isLeech:
-            size = await get_path_size(up_dir)
+            if zip_stream is None:
+                size = await get_path_size(up_dir)
             for s in m_size:
                 size = size - s
             LOGGER.info(f"Leech Name: {up_name}")
-            tg = TgUploader(up_name, up_dir, self)
+            if self.streamer is not None:
+                tg = self.streamer.uploader
+                tg.name = up_name
+                size += self.streamer.uploaded_size
+            else:
+                tg = TgUploader(up_name, up_dir, self)
+            if split_inline:
+                tg.split_size = LEECH_SPLIT_SIZE
+            tg.zip_stream = zip_stream
             tg_upload_status = TelegramStatus(
                 tg, size, self.message, gid, "up", self.upload_details
             )
@@ -587,7 +807,8 @@ class MirrorLeechListener:
             await update_all_messages()
             await ddl.upload(up_name, size)
         else:
-            size = await get_path_size(up_path)
+            if zip_stream is None:
+                size = await get_path_size(up_path)
             LOGGER.info(f"Upload Name: {up_name} via RClone")
             RCTransfer = RcloneTransferHelper(self, up_name)
             async with download_dict_lock:
@@ -595,17 +816,32 @@ class MirrorLeechListener:
                     RCTransfer, self.message, gid, "up", self.upload_details
                 )
             await update_all_messages()
-            await RCTransfer.upload(up_path, size)
+            await RCTransfer.upload(
+                up_path, size, zip_stream[0] if zip_stream else None
+            )
 
     async def onUploadComplete(
         self, link, size, files, folders, mime_type, name, rclonePath="", private=False
     ):
+        release_disk(self.uid)
         if (
             self.isSuperGroup
             and config_dict["INCOMPLETE_TASK_NOTIFIER"]
             and DATABASE_URL
         ):
             await DbManger().rm_complete_task(self.message.link)
+        if self.upload_span:
+            self.upload_span.finish(size)
+        await self.__flush_spans()
+        inc_metric(
+            "wzml_uploaded_bytes_total",
+            size,
+            destination=(
+                "tg"
+                if self.isLeech
+                else self.upPath if self.upPath in ["gd", "ddl"] else "rclone"
+            ),
+        )
         user_id = self.message.from_user.id
         name, _ = await format_filename(name, user_id, isMirror=not self.isLeech)
         user_dict = user_data.get(user_id, {})
@@ -904,6 +1140,8 @@ class MirrorLeechListener:
         await delete_links(self.message)
 
     async def onDownloadError(self, error, button=None):
+        if self.streamer is not None:
+            await self.streamer.cancel()
         async with download_dict_lock:
             if self.uid in download_dict.keys():
                 del download_dict[self.uid]
@@ -929,6 +1167,7 @@ class MirrorLeechListener:
             and DATABASE_URL
         ):
             await DbManger().rm_complete_task(self.message.link)
+        await self.__flush_spans()
 
         async with queue_dict_lock:
             if self.uid in queued_dl:
@@ -941,6 +1180,12 @@ class MirrorLeechListener:
                 non_queued_dl.remove(self.uid)
             if self.uid in non_queued_up:
                 non_queued_up.remove(self.uid)
+            if self.uid in queued_proc:
+                queued_proc[self.uid].set()
+                del queued_proc[self.uid]
+            if self.uid in non_queued_proc:
+                non_queued_proc.remove(self.uid)
+            release_disk(self.uid)
 
         await start_from_queued()
         await sleep(3)
@@ -949,6 +1194,8 @@ class MirrorLeechListener:
             await clean_download(self.newDir)
 
     async def onUploadError(self, error):
+        if self.streamer is not None:
+            await self.streamer.cancel()
         async with download_dict_lock:
             if self.uid in download_dict.keys():
                 del download_dict[self.uid]
@@ -971,6 +1218,7 @@ class MirrorLeechListener:
             and DATABASE_URL
         ):
             await DbManger().rm_complete_task(self.message.link)
+        await self.__flush_spans()
 
         async with queue_dict_lock:
             if self.uid in queued_dl:
@@ -983,6 +1231,12 @@ class MirrorLeechListener:
                 non_queued_dl.remove(self.uid)
             if self.uid in non_queued_up:
                 non_queued_up.remove(self.uid)
+            if self.uid in queued_proc:
+                queued_proc[self.uid].set()
+                del queued_proc[self.uid]
+            if self.uid in non_queued_proc:
+                non_queued_proc.remove(self.uid)
+            release_disk(self.uid)
 
         await start_from_queued()
         await sleep(3)
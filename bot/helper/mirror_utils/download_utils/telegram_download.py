@@ -1,8 +1,23 @@
 #!/usr/bin/env python3
 from logging import getLogger, ERROR
 from time import time
-from asyncio import Lock
+from math import ceil
+from asyncio import Lock, create_task, wait, gather, shield, sleep, FIRST_EXCEPTION
+from contextlib import suppress
+from os import (
+    path as ospath,
+    open as osopen,
+    close as osclose,
+    pwrite,
+    ftruncate,
+    posix_fallocate,
+    O_WRONLY,
+    O_CREAT,
+    O_TRUNC,
+)
+from aiofiles.os import makedirs, remove as aioremove, rename as aiorename
 from pyrogram import Client
+from pyrogram.errors import FloodWait
 
 from bot import (
     LOGGER,
@@ -13,6 +28,7 @@ from bot import (
     bot,
     user,
     IS_PREMIUM_USER,
+    config_dict,
 )
 from bot.helper.mirror_utils.status_utils.telegram_status import TelegramStatus
 from bot.helper.mirror_utils.status_utils.queue_status import QueueStatus
@@ -21,6 +37,8 @@ from bot.helper.telegram_helper.message_utils import (
     sendMessage,
     delete_links,
 )
+from bot.helper.ext_utils.bot_utils import sync_to_async
+from bot.helper.ext_utils.hash_service import StreamHasher, caption_hash
 from bot.helper.ext_utils.task_manager import (
     is_queued,
     limit_checker,
@@ -29,6 +47,9 @@ from bot.helper.ext_utils.task_manager import (
 
 global_lock = Lock()
 GLOBAL_GID = set()
+CHUNK_SIZE = 1048576
+RANGE_CHUNKS = 64
+RANGE_RETRIES = 3
 getLogger("pyrogram").setLevel(ERROR)
 
 
@@ -43,6 +64,8 @@ class TelegramDownloadHelper:
         self.__decrypter = None
         self.__id = ""
         self.__is_cancelled = False
+        self.__hasher = None
+        self.__parallel = False
 
     @property
     def speed(self):
@@ -79,6 +102,8 @@ class TelegramDownloadHelper:
         if self.__is_cancelled:
             self.__client.stop_transmission()
         self.__processed_bytes = current
+        if self.__hasher is not None:
+            await self.__hasher.feed(current)
 
     async def __onDownloadError(self, error):
         async with global_lock:
@@ -93,6 +118,110 @@ class TelegramDownloadHelper:
         async with global_lock:
             GLOBAL_GID.remove(self.__id)
 
+    @staticmethod
+    def __preallocate(fd, size):
+        try:
+            posix_fallocate(fd, 0, size)
+        except OSError:
+            ftruncate(fd, size)
+
+    async def __sources(self, message):
+        sources = [(self.__client, message)]
+        if user and self.__client is bot:
+            try:
+                user_message = await user.get_messages(
+                    chat_id=message.chat.id, message_ids=message.id
+                )
+                if user_message and user_message.media:
+                    sources.append((user, user_message))
+            except Exception:
+                pass
+        return sources
+
+    async def __parallel_download(self, message, path, size):
+        sources = await self.__sources(message)
+        ranges = list(range(0, ceil(size / CHUNK_SIZE), RANGE_CHUNKS))
+        temp_path = f"{path}.temp"
+        await makedirs(ospath.dirname(path), exist_ok=True)
+        fd = await sync_to_async(osopen, temp_path, O_WRONLY | O_CREAT | O_TRUNC)
+        retries = {}
+        writes = set()
+        tasks = []
+        finished = set()
+        prefix = [0]
+
+        async def worker(client, msg):
+            while ranges and not self.__is_cancelled:
+                start = ranges.pop(0)
+                offset = start * CHUNK_SIZE
+                end = min(offset + RANGE_CHUNKS * CHUNK_SIZE, size)
+                written = 0
+                try:
+                    async for chunk in client.stream_media(
+                        msg, limit=RANGE_CHUNKS, offset=start
+                    ):
+                        if self.__is_cancelled:
+                            return
+                        write = await sync_to_async(
+                            pwrite, fd, chunk, offset + written, wait=False
+                        )
+                        writes.add(write)
+                        await shield(write)
+                        writes.discard(write)
+                        written += len(chunk)
+                        self.__processed_bytes += len(chunk)
+                    if offset + written < end:
+                        raise Exception(
+                            f"Incomplete Telegram range at {offset + written}/{end}"
+                        )
+                except Exception as e:
+                    self.__processed_bytes -= written
+                    retries[start] = retries.get(start, 0) + 1
+                    if retries[start] > RANGE_RETRIES:
+                        raise
+                    LOGGER.warning(f"Retrying Telegram range at {offset}: {e}")
+                    ranges.append(start)
+                    await sleep(e.value if isinstance(e, FloodWait) else retries[start])
+                    continue
+                finished.add(start)
+                while prefix[0] in finished:
+                    finished.remove(prefix[0])
+                    prefix[0] += RANGE_CHUNKS
+                if self.__hasher is not None:
+                    await self.__hasher.feed(min(prefix[0] * CHUNK_SIZE, size))
+
+        try:
+            await sync_to_async(self.__preallocate, fd, size)
+            tasks.extend(
+                create_task(worker(*sources[index % len(sources)]))
+                for index in range(config_dict["TG_DOWNLOAD_WORKERS"])
+            )
+            done, _ = await wait(tasks, return_when=FIRST_EXCEPTION)
+            for task in done:
+                if task.exception() is not None:
+                    raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            await gather(*writes, return_exceptions=True)
+            await sync_to_async(osclose, fd)
+            if self.__is_cancelled or ranges or self.__processed_bytes < size:
+                with suppress(Exception):
+                    await aioremove(temp_path)
+        if self.__is_cancelled:
+            return None
+        await aiorename(temp_path, path)
+        return path
+
+    async def __fetch(self, message, path):
+        if self.__parallel:
+            media = getattr(message, message.media.value)
+            return await self.__parallel_download(message, path, media.file_size)
+        return await self.__client.download_media(
+            message=message, file_name=path, progress=self.__onDownloadProgress
+        )
+
     async def __download(self, message, path):
         try:
             if self.__client is None and self.__decrypter is not None:
@@ -105,19 +234,13 @@ class TelegramDownloadHelper:
                         in_memory=True,
                         no_updates=True,
                     ) as self.__client:
-                        download = await self.__client.download_media(
-                            message=message,
-                            file_name=path,
-                            progress=self.__onDownloadProgress,
-                        )
+                        download = await self.__fetch(message, path)
                 except Exception as e:
                     if not self.__is_cancelled:
                         await self.__onDownloadError(f"ERROR: {e}")
                         return
             else:
-                download = await self.__client.download_media(
-                    message=message, file_name=path, progress=self.__onDownloadProgress
-                )
+                download = await self.__fetch(message, path)
             if self.__is_cancelled:
                 await self.__onDownloadError("Cancelled by user!")
                 return
@@ -126,6 +249,8 @@ class TelegramDownloadHelper:
             await self.__onDownloadError(str(e))
             return
         if download is not None:
+            if self.__hasher is not None:
+                await self.__hasher.finish(download)
             await self.__onDownloadComplete()
         elif not self.__is_cancelled:
             await self.__onDownloadError("Internal Error occurred")
@@ -183,6 +308,16 @@ class TelegramDownloadHelper:
                 else:
                     from_queue = False
                 await self.__onDownloadStart(name, size, gid, from_queue)
+                file_path = path if filename else ospath.join(path, name)
+                self.__parallel = (
+                    config_dict["TG_DOWNLOAD_WORKERS"] > 1
+                    and size >= 2 * RANGE_CHUNKS * CHUNK_SIZE
+                    and bool(filename or getattr(media, "file_name", None))
+                )
+                if self.__parallel:
+                    path = file_path
+                if caption_hash(self.__listener):
+                    self.__hasher = StreamHasher(file_path)
                 await self.__download(message, path)
             else:
                 await self.__onDownloadError("File already being downloaded!")
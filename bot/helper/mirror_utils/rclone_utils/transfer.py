@@ -1,5 +1,6 @@
 from asyncio import create_subprocess_exec, gather
 from asyncio.subprocess import PIPE
+from contextlib import suppress
 from re import findall as re_findall
 from json import loads
 from aiofiles.os import path as aiopath, mkdir, listdir
@@ -10,7 +11,13 @@ from logging import getLogger
 
 from bot import config_dict, GLOBAL_EXTENSION_FILTER
 from bot.helper.ext_utils.bot_utils import cmd_exec, sync_to_async
-from bot.helper.ext_utils.fs_utils import get_mime_type, count_files_and_folders
+from bot.helper.ext_utils.fs_utils import (
+    get_mime_type,
+    count_files_and_folders,
+    write_zip,
+    ZipPipe,
+)
+from bot.helper.ext_utils.bot_metrics import inc_metric
 
 
 LOGGER = getLogger(__name__)
@@ -79,6 +86,7 @@ class RcloneTransferHelper:
         else:
             self.__sa_index += 1
         self.__sa_count += 1
+        inc_metric("wzml_sa_switches_total", engine="rclone")
         remote = f"sa{self.__sa_index:03}"
         LOGGER.info(f"Switching to {remote} remote")
         return remote
@@ -225,9 +233,30 @@ class RcloneTransferHelper:
             link = ""
         return link, destination
 
-    async def __start_upload(self, cmd, remote_type):
-        self.__proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
-        _, return_code = await gather(self.__progress(), self.__proc.wait())
+    async def __stream_zip(self, src_path):
+        try:
+            await sync_to_async(write_zip, src_path, ZipPipe(self.__proc.stdin))
+        except Exception as e:
+            with suppress(Exception):
+                self.__proc.kill()
+            return None if self.__is_cancelled else f"{e}. Streaming zip failed!"
+        self.__proc.stdin.close()
+
+    async def __start_upload(self, cmd, remote_type, src_path=None):
+        if src_path is None:
+            self.__proc = await create_subprocess_exec(*cmd, stdout=PIPE, stderr=PIPE)
+            _, return_code = await gather(self.__progress(), self.__proc.wait())
+        else:
+            self.__proc = await create_subprocess_exec(
+                *cmd, stdin=PIPE, stdout=PIPE, stderr=PIPE
+            )
+            _, error, return_code = await gather(
+                self.__progress(), self.__stream_zip(src_path), self.__proc.wait()
+            )
+            if error and return_code == -9:
+                LOGGER.error(f"{error} Path: {src_path}")
+                await self.__listener.onUploadError(error)
+                return False
 
         if self.__is_cancelled:
             return False
@@ -245,6 +274,7 @@ class RcloneTransferHelper:
             LOGGER.error(error)
             if (
                 self.__sa_number != 0
+                and src_path is None
                 and remote_type == "drive"
                 and "RATE_LIMIT_EXCEEDED" in error
                 and config_dict["USE_SERVICE_ACCOUNTS"]
@@ -266,7 +296,7 @@ class RcloneTransferHelper:
         else:
             return True
 
-    async def upload(self, path, size):
+    async def upload(self, path, size, src_path=None):
         self.__is_upload = True
         rc_path = self.__listener.upPath.strip("/")
         if rc_path.startswith("mrcc:"):
@@ -277,7 +307,11 @@ class RcloneTransferHelper:
 
         oremote, rc_path = rc_path.split(":", 1)
 
-        if await aiopath.isdir(path):
+        if src_path is not None:
+            mime_type = "application/zip"
+            folders = 0
+            files = 1
+        elif await aiopath.isdir(path):
             mime_type = "Folder"
             folders, files = await count_files_and_folders(path)
             rc_path += f"/{self.name}" if rc_path else self.name
@@ -319,9 +353,15 @@ class RcloneTransferHelper:
         method = (
             "move" if not self.__listener.seed or self.__listener.newDir else "copy"
         )
-        cmd = self.__getUpdatedCommand(
-            fconfig_path, path, f"{fremote}:{rc_path}", rcflags, method
-        )
+        if src_path is None:
+            cmd = self.__getUpdatedCommand(
+                fconfig_path, path, f"{fremote}:{rc_path}", rcflags, method
+            )
+        else:
+            destination = f"{rc_path}/{self.name}" if rc_path else self.name
+            cmd = self.__getUpdatedCommand(
+                fconfig_path, f"{fremote}:{destination}", None, rcflags, "rcat"
+            )
         if (
             remote_type == "drive"
             and not config_dict["RCLONE_FLAGS"]
@@ -331,7 +371,7 @@ class RcloneTransferHelper:
         elif remote_type != "drive":
             cmd.extend(("--retries-sleep", "3s"))
 
-        result = await self.__start_upload(cmd, remote_type)
+        result = await self.__start_upload(cmd, remote_type, src_path)
         if not result:
             return
 
@@ -443,7 +483,6 @@ class RcloneTransferHelper:
             config_path,
             "-P",
             source,
-            destination,
             "--exclude",
             ext,
             "--ignore-case",
@@ -455,6 +494,8 @@ class RcloneTransferHelper:
             "--log-level",
             "DEBUG",
         ]
+        if destination is not None:
+            cmd.insert(7, destination)
         if rcflags:
             rcflags = rcflags.split("|")
             for flag in rcflags:
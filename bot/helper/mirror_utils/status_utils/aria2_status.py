@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 from time import time
 
-from bot import aria2, LOGGER
+from bot import aria2, download_dict, LOGGER
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     MirrorStatus,
+    TaskMetrics,
     get_readable_time,
     sync_to_async,
 )
@@ -29,8 +30,11 @@ class Aria2Status:
         self.start_time = 0
         self.seeding = seeding
         self.message = self.__listener.message
+        self.__last_update = time() if self.__download else 0
 
     def __update(self):
+        if time() - self.__last_update < 1:
+            return
         if self.__download is None:
             self.__download = get_download(self.__gid)
         else:
@@ -38,6 +42,19 @@ class Aria2Status:
         if self.__download.followed_by_ids:
             self.__gid = self.__download.followed_by_ids[0]
             self.__download = get_download(self.__gid)
+            download_dict.reindex(self.__listener.uid)
+        self.__last_update = time()
+
+    def refresh(self, download):
+        if download is None or download.followed_by_ids:
+            self.__last_update = 0
+            return
+        self.__download = download
+        self.__last_update = time()
+
+    @property
+    def cached_gid(self):
+        return self.__gid
 
     def progress(self):
         return self.__download.progress_string()
@@ -57,6 +74,16 @@ class Aria2Status:
     def eta(self):
         return self.__download.eta_string()
 
+    def metrics(self):
+        return TaskMetrics(
+            self.__download.completed_length,
+            self.__download.total_length,
+            self.__download.download_speed,
+            engine=self.eng(),
+            up_speed=self.__download.upload_speed,
+            uploaded=self.__download.upload_length,
+        )
+
     def listener(self):
         return self.__listener
 
@@ -96,6 +123,15 @@ class Aria2Status:
     def download(self):
         return self
 
+    def stream_files(self):
+        if (download := get_download(self.__gid)) is None or download.is_metadata:
+            return []
+        return [
+            (str(f.path), f.completed_length == f.length)
+            for f in download.files
+            if f.selected
+        ]
+
     def gid(self):
         self.__update()
         return self.__gid
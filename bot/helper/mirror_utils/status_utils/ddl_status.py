@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 from bot.helper.ext_utils.bot_utils import (
     MirrorStatus,
+    TaskMetrics,
     get_readable_file_size,
     get_readable_time,
 )
@@ -43,6 +44,11 @@ class DDLStatus:
         except Exception:
             return "-"
 
+    def metrics(self):
+        return TaskMetrics(
+            self.__obj.processed_bytes, self.__size, self.__obj.speed, engine=self.eng()
+        )
+
     def gid(self) -> str:
         return self.__gid
 
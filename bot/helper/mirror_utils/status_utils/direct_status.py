@@ -3,6 +3,7 @@
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     MirrorStatus,
+    TaskMetrics,
     get_readable_file_size,
     get_readable_time,
 )
@@ -54,8 +55,19 @@ class DirectStatus:
     def processed_bytes(self):
         return get_readable_file_size(self.__obj.processed_bytes)
 
+    def metrics(self):
+        return TaskMetrics(
+            self.__obj.processed_bytes,
+            self.__obj.total_size,
+            self.__obj.speed,
+            engine=self.eng(),
+        )
+
     def download(self):
         return self.__obj
 
+    def stream_files(self):
+        return self.__obj.stream_files()
+
     def eng(self):
         return EngineStatus().STATUS_ARIA
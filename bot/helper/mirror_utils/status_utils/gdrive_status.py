@@ -2,6 +2,7 @@
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     MirrorStatus,
+    TaskMetrics,
     get_readable_file_size,
     get_readable_time,
 )
@@ -33,6 +34,11 @@ class GdriveStatus:
     def name(self):
         return self.__obj.name
 
+    def metrics(self):
+        return TaskMetrics(
+            self.__obj.processed_bytes, self.__size, self.__obj.speed, engine=self.eng()
+        )
+
     def gid(self) -> str:
         return self.__gid
 
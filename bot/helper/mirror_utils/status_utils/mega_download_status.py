@@ -3,6 +3,7 @@ from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     get_readable_file_size,
     MirrorStatus,
+    TaskMetrics,
     get_readable_time,
 )
 
@@ -48,6 +49,14 @@ class MegaDownloadStatus:
     def speed(self):
         return f"{get_readable_file_size(self.__obj.speed)}/s"
 
+    def metrics(self):
+        return TaskMetrics(
+            self.__obj.downloaded_bytes,
+            self.__size,
+            self.__obj.speed,
+            engine=self.eng(),
+        )
+
     def gid(self):
         return self.__gid
 
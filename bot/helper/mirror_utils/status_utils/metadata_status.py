@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
+from time import time
 
 from bot import LOGGER
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     get_readable_file_size,
     MirrorStatus,
+    TaskMetrics,
+    get_readable_time,
 )
 
 
@@ -14,17 +17,28 @@ class MetadataStatus:
         self.__gid = gid
         self.__size = size
         self.__listener = listener
+        self.__start_time = time()
+        self.__files = {}
         self.upload_details = listener.upload_details
         self.message = listener.message
 
     def gid(self):
         return self.__gid
 
+    def speed_raw(self):
+        return self.processed_raw() / (time() - self.__start_time)
+
+    def progress_raw(self):
+        try:
+            return self.processed_raw() / self.__size * 100
+        except Exception:
+            return 0
+
     def progress(self):
-        return "0"
+        return f"{round(self.progress_raw(), 2)}%"
 
     def speed(self):
-        return "0"
+        return f"{get_readable_file_size(self.speed_raw())}/s"
 
     def name(self):
         return self.__name
@@ -33,13 +47,32 @@ class MetadataStatus:
         return get_readable_file_size(self.__size)
 
     def eta(self):
-        return "0s"
+        try:
+            seconds = (self.__size - self.processed_raw()) / self.speed_raw()
+            return get_readable_time(seconds)
+        except Exception:
+            return "-"
 
     def status(self):
         return MirrorStatus.STATUS_METADATA
 
+    def set_progress(self, key, processed):
+        self.__files[key] = processed
+
+    def processed_raw(self):
+        return min(sum(self.__files.values()), self.__size)
+
     def processed_bytes(self):
-        return 0
+        return get_readable_file_size(self.processed_raw())
+
+    def metrics(self):
+        processed = self.processed_raw()
+        return TaskMetrics(
+            processed,
+            self.__size,
+            processed / (time() - self.__start_time),
+            engine=self.eng(),
+        )
 
     def download(self):
         return self
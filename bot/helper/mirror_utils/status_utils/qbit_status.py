@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 from asyncio import sleep
+from time import time
 
 from bot import LOGGER, get_client, QbTorrents, qb_listener_lock
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     MirrorStatus,
+    TaskMetrics,
     get_readable_file_size,
     get_readable_time,
     sync_to_async,
@@ -29,11 +31,23 @@ class QbittorrentStatus:
         self.queued = queued
         self.seeding = seeding
         self.message = listener.message
+        self.tag = f"{listener.uid}"
+        self.__last_update = time() if self.__info else 0
 
     def __update(self):
-        new_info = get_download(self.__client, f"{self.__listener.uid}")
+        if time() - self.__last_update < 1:
+            return
+        new_info = get_download(self.__client, self.tag)
         if new_info is not None:
             self.__info = new_info
+            self.__last_update = time()
+
+    def refresh(self, info):
+        if info is None:
+            self.__last_update = 0
+            return
+        self.__info = info
+        self.__last_update = time()
 
     def progress(self):
         return f"{round(self.__info.progress*100, 2)}%"
@@ -56,6 +70,17 @@ class QbittorrentStatus:
     def eta(self):
         return get_readable_time(self.__info.eta)
 
+    def metrics(self):
+        return TaskMetrics(
+            self.__info.completed,
+            self.__info.size,
+            self.__info.dlspeed,
+            self.__info.eta if self.__info.eta < 8640000 else None,
+            self.eng(),
+            self.__info.upspeed,
+            self.__info.uploaded,
+        )
+
     def status(self):
         self.__update()
         state = self.__info.state
@@ -93,6 +118,18 @@ class QbittorrentStatus:
     def download(self):
         return self
 
+    def stream_files(self):
+        files = self.__client.torrents_files(torrent_hash=self.__info.hash)
+        return [
+            (f"{self.__info.save_path.rstrip('/')}/{f.name}", f.progress == 1)
+            for f in files
+            if f.priority > 0
+        ]
+
+    @property
+    def cached_gid(self):
+        return self.__info.hash[:12] if self.__info else None
+
     def gid(self):
         return self.hash()[:12]
 
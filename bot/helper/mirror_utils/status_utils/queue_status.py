@@ -3,8 +3,11 @@ from bot import LOGGER
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     get_readable_file_size,
+    get_readable_time,
     MirrorStatus,
+    TaskMetrics,
 )
+from bot.helper.ext_utils.queue_scheduler import queue_position
 
 
 class QueueStatus:
@@ -29,8 +32,13 @@ class QueueStatus:
     def status(self):
         if self.__status == "dl":
             return MirrorStatus.STATUS_QUEUEDL
+        elif self.__status == "pr":
+            return MirrorStatus.STATUS_QUEUEPR
         return MirrorStatus.STATUS_QUEUEUP
 
+    def queue_position(self):
+        return queue_position(self.__listener.uid)
+
     def processed_bytes(self):
         return 0
 
@@ -41,7 +49,12 @@ class QueueStatus:
         return "0B/s"
 
     def eta(self):
-        return "-"
+        _, eta = self.queue_position()
+        return "-" if eta is None else get_readable_time(eta)
+
+    def metrics(self):
+        _, eta = self.queue_position()
+        return TaskMetrics(total=self.__size, eta=eta, engine=self.eng())
 
     def download(self):
         return self
@@ -52,6 +65,10 @@ class QueueStatus:
             await self.__listener.onDownloadError(
                 "task have been removed from queue/download"
             )
+        elif self.__status == "pr":
+            await self.__listener.onUploadError(
+                "task have been removed from queue/process"
+            )
         else:
             await self.__listener.onUploadError(
                 "task have been removed from queue/upload"
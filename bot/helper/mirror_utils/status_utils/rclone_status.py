@@ -1,4 +1,10 @@
-from bot.helper.ext_utils.bot_utils import EngineStatus, MirrorStatus
+from bot.helper.ext_utils.bot_utils import (
+    EngineStatus,
+    MirrorStatus,
+    TaskMetrics,
+    get_size_bytes,
+    get_time_seconds,
+)
 
 
 class RcloneStatus:
@@ -38,6 +44,15 @@ class RcloneStatus:
     def processed_bytes(self):
         return self.__obj.transferred_size
 
+    def metrics(self):
+        return TaskMetrics(
+            get_size_bytes(self.__obj.transferred_size),
+            get_size_bytes(self.__obj.size),
+            get_size_bytes(self.__obj.speed),
+            get_time_seconds(self.__obj.eta),
+            self.eng(),
+        )
+
     def download(self):
         return self.__obj
 
@@ -4,6 +4,7 @@ from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     get_readable_file_size,
     MirrorStatus,
+    TaskMetrics,
 )
 
 
@@ -40,6 +41,9 @@ class SplitStatus:
     def processed_bytes(self):
         return 0
 
+    def metrics(self):
+        return TaskMetrics(total=self.__size, engine=self.eng())
+
     def download(self):
         return self
 
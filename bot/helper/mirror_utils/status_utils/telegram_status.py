@@ -2,6 +2,7 @@
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     MirrorStatus,
+    TaskMetrics,
     get_readable_file_size,
     get_readable_time,
 )
@@ -47,6 +48,11 @@ class TelegramStatus:
         except Exception:
             return "-"
 
+    def metrics(self):
+        return TaskMetrics(
+            self.__obj.processed_bytes, self.__size, self.__obj.speed, engine=self.eng()
+        )
+
     def gid(self) -> str:
         return self.__gid
 
@@ -2,6 +2,7 @@
 from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     MirrorStatus,
+    TaskMetrics,
     get_readable_file_size,
     get_readable_time,
     async_to_sync,
@@ -55,6 +56,15 @@ class YtDlpDownloadStatus:
         except Exception:
             return "-"
 
+    def metrics(self):
+        return TaskMetrics(
+            self.processed_raw(),
+            self.__obj.size,
+            self.__obj.download_speed,
+            self.__obj.eta if self.__obj.eta != "-" else None,
+            self.eng(),
+        )
+
     def download(self):
         return self.__obj
 
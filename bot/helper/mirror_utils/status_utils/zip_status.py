@@ -6,10 +6,9 @@ from bot.helper.ext_utils.bot_utils import (
     EngineStatus,
     get_readable_file_size,
     MirrorStatus,
+    TaskMetrics,
     get_readable_time,
-    async_to_sync,
 )
-from bot.helper.ext_utils.fs_utils import get_path_size
 
 
 class ZipStatus:
@@ -21,6 +20,7 @@ class ZipStatus:
         self.upload_details = listener.upload_details
         self.__uid = listener.uid
         self.__start_time = time()
+        self.__archives = {}
         self.message = listener.message
 
     def gid(self):
@@ -57,24 +57,38 @@ class ZipStatus:
     def status(self):
         return MirrorStatus.STATUS_ARCHIVING
 
+    def set_progress(self, key, weight, percent):
+        self.__archives[key] = (weight, percent)
+
     def processed_raw(self):
-        if self.__listener.newDir:
-            return async_to_sync(get_path_size, self.__listener.newDir)
-        else:
-            return async_to_sync(get_path_size, self.__listener.dir) - self.__size
+        if not (total := sum(weight for weight, _ in self.__archives.values())):
+            return 0
+        done = sum(weight * percent for weight, percent in self.__archives.values())
+        return min(done / total / 100, 1) * self.__size
 
     def processed_bytes(self):
         return get_readable_file_size(self.processed_raw())
 
+    def metrics(self):
+        processed = self.processed_raw()
+        return TaskMetrics(
+            processed,
+            self.__size,
+            processed / (time() - self.__start_time),
+            engine=self.eng(),
+        )
+
     def download(self):
         return self
 
     async def cancel_download(self):
         LOGGER.info(f"Cancelling Archive: {self.__name}")
         if self.__listener.suproc is not None:
-            self.__listener.suproc.kill()
-        else:
-            self.__listener.suproc = "cancelled"
+            try:
+                self.__listener.suproc.kill()
+            except:
+                pass
+        self.__listener.suproc = "cancelled"
         await self.__listener.onUploadError("archiving stopped by user!")
 
     def eng(self):
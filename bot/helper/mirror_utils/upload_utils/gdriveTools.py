@@ -27,6 +27,7 @@ from bot.helper.ext_utils.bot_utils import (
     fetch_user_tds,
 )
 from bot.helper.ext_utils.fs_utils import get_mime_type
+from bot.helper.ext_utils.bot_metrics import inc_metric
 from bot.helper.ext_utils.leech_utils import format_filename
 
 LOGGER = getLogger(__name__)
@@ -121,6 +122,7 @@ class GoogleDriveHelper:
         else:
             self.__sa_index += 1
         self.__sa_count += 1
+        inc_metric("wzml_sa_switches_total", engine="gdrive")
         LOGGER.info(f"Switching to {self.__sa_index} index")
         self.__service = self.__authorize()
 
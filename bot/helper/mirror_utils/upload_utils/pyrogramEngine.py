@@ -8,13 +8,15 @@ from aiofiles.os import (
     makedirs,
     rmdir,
     mkdir,
+    stat as aiostat,
 )
 from os import walk, path as ospath
 from time import time
 from PIL import Image
 from pyrogram.types import InputMediaVideo, InputMediaDocument, InlineKeyboardMarkup
 from pyrogram.errors import FloodWait, RPCError, PeerIdInvalid, ChannelInvalid
-from asyncio import sleep
+from asyncio import sleep, create_task, wait, Queue, FIRST_COMPLETED
+from contextlib import suppress
 from tenacity import (
     retry,
     wait_exponential,
@@ -24,7 +26,6 @@ from tenacity import (
 )
 from re import match as re_match, sub as re_sub
 from natsort import natsorted
-from aioshutil import copy
 
 from bot import (
     config_dict,
@@ -33,6 +34,8 @@ from bot import (
     bot,
     user,
     IS_PREMIUM_USER,
+    MAX_SPLIT_SIZE,
+    PRE_UPLOADS,
 )
 from bot.helper.themes import BotTheme
 from bot.helper.telegram_helper.button_build import ButtonMaker
@@ -45,6 +48,9 @@ from bot.helper.telegram_helper.message_utils import (
     get_tg_link_content,
 )
 from bot.helper.ext_utils.fs_utils import clean_unwanted, is_archive, get_base_name
+from bot.helper.ext_utils.bot_metrics import inc_metric
+from bot.helper.ext_utils.perf_spans import PerfSpan
+from bot.helper.ext_utils.file_ops import copy_file
 from bot.helper.ext_utils.bot_utils import (
     get_readable_file_size,
     is_telegram_link,
@@ -60,12 +66,14 @@ from bot.helper.ext_utils.leech_utils import (
     get_ss,
     get_mediainfo_link,
     format_filename,
+    split_file,
+    zip_volumes,
+    SPLIT_QUEUE_SIZE,
 )
 
 LOGGER = getLogger(__name__)
 getLogger("pyrogram").setLevel(ERROR)
 
-
 class TgUploader:
 
     def __init__(self, name=None, path=None, listener=None):
@@ -97,6 +105,14 @@ class TgUploader:
         self.__user_id = listener.message.from_user.id
         self.__leechmsg = {}
         self.__leech_utils = self.__listener.leech_utils
+        self.__prepared = False
+        self.__log_deleted = False
+        self.split_size = 0
+        self.zip_stream = None
+        self.__lookahead = {}
+        self.__pre_uploads = {}
+        self.__parts_done = {}
+        self.__ss_thumb = None
 
     async def get_custom_thumb(self, thumb):
         if is_telegram_link(thumb):
@@ -254,6 +270,51 @@ class TgUploader:
         self.__last_uploaded = current
         self.__processed_bytes += chunk_size
 
+    async def __part_progress(self, current, total, up_path):
+        if self.__is_cancelled:
+            if IS_PREMIUM_USER:
+                user.stop_transmission()
+            bot.stop_transmission()
+        self.__processed_bytes += current - self.__parts_done.get(up_path, 0)
+        self.__parts_done[up_path] = current
+
+    async def __save_parts(self, client, up_path):
+        try:
+            with open(up_path, "rb") as f:
+                return await client.save_file(
+                    f, progress=self.__part_progress, progress_args=(up_path,)
+                )
+        except BaseException:
+            self.__processed_bytes -= self.__parts_done.get(up_path, 0)
+            raise
+        finally:
+            self.__parts_done.pop(up_path, None)
+
+    async def __schedule_upload(self, up_path):
+        self.__pre_uploads[up_path] = None
+        try:
+            st = await aiostat(up_path)
+        except OSError:
+            return
+        if (
+            up_path.lower().endswith(tuple(GLOBAL_EXTENSION_FILTER))
+            or st.st_size == 0
+            or self.split_size
+            and st.st_size > self.split_size
+        ):
+            return
+        client = user if (st.st_size > 2097152000 and IS_PREMIUM_USER) else bot
+        key = (client, st.st_dev, st.st_ino)
+        PRE_UPLOADS[key] = create_task(self.__save_parts(client, up_path))
+        self.__pre_uploads[up_path] = (key, PRE_UPLOADS[key])
+
+    def __drop_pre_upload(self, up_path):
+        if entry := self.__pre_uploads.pop(up_path, None):
+            key, task = entry
+            if PRE_UPLOADS.get(key) is task:
+                del PRE_UPLOADS[key]
+            task.cancel()
+
     async def __user_settings(self):
         user_dict = user_data.get(self.__user_id, {})
         self.__as_doc = user_dict.get("as_doc", False) or (
@@ -308,9 +369,11 @@ class TgUploader:
             self.__sent_msg = self.__listener.message
         return True
 
-    async def __prepare_file(self, prefile_, dirpath):
+    async def __prepare_file(self, prefile_, dirpath, name=None):
         try:
-            file_, cap_mono = await format_filename(prefile_, self.__user_id, dirpath)
+            file_, cap_mono = name or await format_filename(
+                prefile_, self.__user_id, dirpath
+            )
         except Exception as err:
             LOGGER.info(format_exc())
             return await self.__listener.onUploadError(
@@ -325,7 +388,9 @@ class TgUploader:
                 dirpath = f"{dirpath}/copied_mltb"
                 await makedirs(dirpath, exist_ok=True)
                 new_path = ospath.join(dirpath, file_)
-                self.__up_path = await copy(self.__up_path, new_path)
+                self.__up_path = await sync_to_async(
+                    copy_file, self.__up_path, new_path
+                )
             else:
                 new_path = ospath.join(dirpath, file_)
                 await aiorename(self.__up_path, new_path)
@@ -354,7 +419,9 @@ class TgUploader:
                 dirpath = f"{dirpath}/copied_mltb"
                 await makedirs(dirpath, exist_ok=True)
                 new_path = ospath.join(dirpath, f"{name}{ext}")
-                self.__up_path = await copy(self.__up_path, new_path)
+                self.__up_path = await sync_to_async(
+                    copy_file, self.__up_path, new_path
+                )
             else:
                 new_path = ospath.join(dirpath, f"{name}{ext}")
                 await aiorename(self.__up_path, new_path)
@@ -427,88 +494,262 @@ class TgUploader:
             if not self.__is_cancelled:
                 LOGGER.error(f"Failed To Send in User Dump:\n{str(err)}")
 
-    async def upload(self, o_files, m_size, size):
-        await self.__user_settings()
-        res = await self.__msg_to_reply()
-        if not res:
-            return
-        isDeleted = False
-        for dirpath, _, files in sorted(await sync_to_async(walk, self.__path)):
-            if dirpath.endswith("/yt-dlp-thumb"):
-                continue
-            for file_ in natsorted(files):
-                self.__up_path = ospath.join(dirpath, file_)
-                if file_.lower().endswith(tuple(GLOBAL_EXTENSION_FILTER)):
-                    await aioremove(self.__up_path)
-                    continue
-                try:
-                    f_size = await aiopath.getsize(self.__up_path)
-                    if self.__listener.seed and file_ in o_files and f_size in m_size:
-                        continue
-                    self.__total_files += 1
-                    if f_size == 0:
-                        LOGGER.error(
-                            f"{self.__up_path} size is zero, telegram don't upload zero size files"
-                        )
-                        self.__corrupted += 1
-                        continue
-                    if self.__is_cancelled:
-                        return
-                    self.__prm_media = True if f_size > 2097152000 else False
-                    cap_mono, file_ = await self.__prepare_file(file_, dirpath)
-                    if self.__last_msg_in_group:
-                        group_lists = [
-                            x for v in self.__media_dict.values() for x in v.keys()
-                        ]
-                        if (
-                            match := re_match(
-                                r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+)", self.__up_path
-                            )
-                        ) and match.group(0) not in group_lists:
-                            for key, value in list(self.__media_dict.items()):
-                                for subkey, msgs in list(value.items()):
-                                    if len(msgs) > 1:
-                                        await self.__send_media_group(subkey, key, msgs)
-                    self.__last_msg_in_group = False
-                    self.__last_uploaded = 0
-                    await self.__switching_client()
-                    await self.__upload_file(cap_mono, file_)
-                    if (
-                        self.__leechmsg
-                        and not isDeleted
-                        and config_dict["CLEAN_LOG_MSG"]
+    async def __prepare(self):
+        if not self.__prepared:
+            await self.__user_settings()
+            self.__prepared = await self.__msg_to_reply()
+        return self.__prepared
+
+    async def __prefetch(self, dirpath, file_):
+        up_path = ospath.join(dirpath, file_)
+        if file_.lower().endswith(tuple(GLOBAL_EXTENSION_FILTER)) or (
+            self.split_size and await aiopath.getsize(up_path) > self.split_size
+        ):
+            return None
+        name = await format_filename(file_, self.__user_id, dirpath)
+        thumb = None
+        if (
+            (self.__thumb is None or not await aiopath.exists(self.__thumb))
+            and not self.__leech_utils["thumb"]
+            and not await aiopath.isfile(
+                f"{self.__path}/yt-dlp-thumb/{ospath.splitext(name[0])[0]}.jpg"
+            )
+            and (await get_document_type(up_path))[0]
+        ):
+            thumb = await take_ss(up_path, (await get_media_info(up_path))[0])
+        return name, thumb
+
+    async def __drop_lookahead(self):
+        for task in self.__lookahead.values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is None:
+                if (res := task.result()) and res[1] and await aiopath.exists(res[1]):
+                    await aioremove(res[1])
+        self.__lookahead.clear()
+
+    async def __upload_files(self, items, o_files, m_size):
+        ahead = config_dict["UPLOAD_LOOKAHEAD"]
+        workers = config_dict["TG_UPLOAD_WORKERS"]
+        try:
+            for index, (dirpath, file_) in enumerate(items):
+                for n_dirpath, n_file in items[index + 1 : index + workers]:
+                    n_path = ospath.join(n_dirpath, n_file)
+                    if n_path not in self.__pre_uploads and not (
+                        self.__listener.seed and n_file in o_files
                     ):
-                        await deleteMessage(list(self.__leechmsg.values())[0])
-                        isDeleted = True
-                    if self.__is_cancelled:
-                        return
-                    if not self.__is_corrupted and (
-                        self.__listener.isSuperGroup or config_dict["LEECH_LOG_ID"]
+                        await self.__schedule_upload(n_path)
+                for n_dirpath, n_file in items[index + 1 : index + 1 + ahead]:
+                    n_path = ospath.join(n_dirpath, n_file)
+                    if n_path not in self.__lookahead and not (
+                        self.__listener.seed and n_file in o_files
                     ):
-                        self.__msgs_dict[self.__sent_msg.link] = file_
-                    await sleep(1)
-                except Exception as err:
-                    if isinstance(err, RetryError):
-                        LOGGER.info(
-                            f"Total Attempts: {err.last_attempt.attempt_number}"
+                        self.__lookahead[n_path] = create_task(
+                            self.__prefetch(n_dirpath, n_file)
                         )
-                    else:
-                        LOGGER.error(f"{format_exc()}. Path: {self.__up_path}")
-                    if self.__is_cancelled:
-                        return
+                if not await self.__upload_one(dirpath, file_, o_files, m_size):
+                    return False
+            return True
+        finally:
+            await self.__drop_lookahead()
+            for up_path in list(self.__pre_uploads):
+                self.__drop_pre_upload(up_path)
+
+    async def __upload_parts(self, producer, parts, dirpath):
+        while True:
+            if parts.empty():
+                if producer.done():
+                    return True
+                getter = create_task(parts.get())
+                await wait([getter, producer], return_when=FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
                     continue
-                finally:
-                    if (
-                        not self.__is_cancelled
-                        and await aiopath.exists(self.__up_path)
-                        and (
-                            not self.__listener.seed
-                            or self.__listener.newDir
-                            or dirpath.endswith("/splited_files_mltb")
-                            or "/copied_mltb/" in self.__up_path
-                        )
-                    ):
-                        await aioremove(self.__up_path)
+                part = getter.result()
+            else:
+                part = parts.get_nowait()
+            if not await self.__upload_one(dirpath, ospath.basename(part), [], []):
+                producer.cancel()
+                if self.__listener.suproc not in [None, "cancelled"]:
+                    with suppress(Exception):
+                        self.__listener.suproc.kill()
+                return False
+
+    async def __run_producer(self, func, *args, **kwargs):
+        if not await self.__listener.wait_proc_slot(self.name):
+            return None
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            await self.__listener.release_proc_slot()
+
+    async def __upload_zip(self):
+        src_path, zip_path, volume_size, cmd = self.zip_stream
+        span = PerfSpan(self.__listener.uid, "compress", self.__listener.engine)
+        self.__listener.spans.append(span)
+        LOGGER.info(f"Zipping While Uploading: {self.name}")
+        volumes = Queue(SPLIT_QUEUE_SIZE)
+        producer = create_task(
+            self.__run_producer(
+                zip_volumes,
+                self.__listener,
+                src_path,
+                zip_path,
+                volume_size,
+                volumes,
+                cmd,
+            )
+        )
+        if not await self.__upload_parts(producer, volumes, ospath.dirname(zip_path)):
+            return False
+        code = producer.result()
+        span.finish(self.__processed_bytes)
+        if code is None or code == -9:
+            return False
+        if code != 0:
+            LOGGER.error(f"Unable to create archive! Path: {zip_path}")
+        return True
+
+    async def __upload_split(self, dirpath, file_):
+        f_path = ospath.join(dirpath, file_)
+        f_size = await aiopath.getsize(f_path)
+        span = PerfSpan(self.__listener.uid, "split", self.__listener.engine, f_size)
+        self.__listener.spans.append(span)
+        LOGGER.info(f"Splitting While Uploading: {file_}")
+        parts = Queue(SPLIT_QUEUE_SIZE)
+        producer = create_task(
+            self.__run_producer(
+                split_file,
+                f_path,
+                f_size,
+                file_,
+                dirpath,
+                self.split_size,
+                self.__listener,
+                part_queue=parts,
+            )
+        )
+        if not await self.__upload_parts(producer, parts, dirpath):
+            return False
+        res = producer.result()
+        span.finish(f_size)
+        if not res:
+            return False
+        if res == "errored" and f_size <= MAX_SPLIT_SIZE:
+            return await self.__upload_one(dirpath, file_, [], [], False)
+        await aioremove(f_path)
+        return True
+
+    async def __upload_one(self, dirpath, file_, o_files, m_size, can_split=True):
+        self.__up_path = src_path = ospath.join(dirpath, file_)
+        if file_.lower().endswith(tuple(GLOBAL_EXTENSION_FILTER)):
+            await aioremove(self.__up_path)
+            return True
+        if (
+            can_split
+            and self.split_size
+            and await aiopath.getsize(self.__up_path) > self.split_size
+        ):
+            return await self.__upload_split(dirpath, file_)
+        prefetched = None
+        if (task := self.__lookahead.pop(self.__up_path, None)) is not None:
+            with suppress(Exception):
+                prefetched = await task
+        try:
+            f_size = await aiopath.getsize(self.__up_path)
+            if self.__listener.seed and file_ in o_files and f_size in m_size:
+                return True
+            self.__total_files += 1
+            if f_size == 0:
+                LOGGER.error(
+                    f"{self.__up_path} size is zero, telegram don't upload zero size files"
+                )
+                self.__corrupted += 1
+                return True
+            if self.__is_cancelled:
+                return False
+            self.__prm_media = True if f_size > 2097152000 else False
+            cap_mono, file_ = await self.__prepare_file(
+                file_, dirpath, prefetched and prefetched[0]
+            )
+            self.__ss_thumb = prefetched and prefetched[1]
+            if self.__last_msg_in_group:
+                group_lists = [
+                    x for v in self.__media_dict.values() for x in v.keys()
+                ]
+                if (
+                    match := re_match(
+                        r".+(?=\.0*\d+$)|.+(?=\.part\d+\..+)", self.__up_path
+                    )
+                ) and match.group(0) not in group_lists:
+                    for key, value in list(self.__media_dict.items()):
+                        for subkey, msgs in list(value.items()):
+                            if len(msgs) > 1:
+                                await self.__send_media_group(subkey, key, msgs)
+            self.__last_msg_in_group = False
+            self.__last_uploaded = 0
+            await self.__switching_client()
+            await self.__upload_file(cap_mono, file_)
+            if (
+                self.__leechmsg
+                and not self.__log_deleted
+                and config_dict["CLEAN_LOG_MSG"]
+            ):
+                await deleteMessage(list(self.__leechmsg.values())[0])
+                self.__log_deleted = True
+            if self.__is_cancelled:
+                return False
+            if not self.__is_corrupted and (
+                self.__listener.isSuperGroup or config_dict["LEECH_LOG_ID"]
+            ):
+                self.__msgs_dict[self.__sent_msg.link] = file_
+            await sleep(1)
+        except Exception as err:
+            if isinstance(err, RetryError):
+                LOGGER.info(
+                    f"Total Attempts: {err.last_attempt.attempt_number}"
+                )
+            else:
+                LOGGER.error(f"{format_exc()}. Path: {self.__up_path}")
+            if self.__is_cancelled:
+                return False
+            return True
+        finally:
+            self.__drop_pre_upload(src_path)
+            if (
+                not self.__is_cancelled
+                and await aiopath.exists(self.__up_path)
+                and (
+                    not self.__listener.seed
+                    or self.__listener.newDir
+                    or dirpath.endswith("/splited_files_mltb")
+                    or "/copied_mltb/" in self.__up_path
+                )
+            ):
+                await aioremove(self.__up_path)
+        return True
+
+    async def stream_upload(self, dirpath, files):
+        if not await self.__prepare():
+            return False
+        items = [(dirpath, file_) for file_ in natsorted(files)]
+        return await self.__upload_files(items, [], [])
+
+    async def upload(self, o_files, m_size, size):
+        if not await self.__prepare():
+            return
+        if self.zip_stream is not None:
+            if not await self.__upload_zip():
+                return
+        else:
+            items = [
+                (dirpath, file_)
+                for dirpath, _, files in sorted(await sync_to_async(walk, self.__path))
+                if not dirpath.endswith("/yt-dlp-thumb")
+                for file_ in natsorted(files)
+            ]
+            if not await self.__upload_files(items, o_files, m_size):
+                return
         for key, value in list(self.__media_dict.items()):
             for subkey, msgs in list(value.items()):
                 if len(msgs) > 1:
@@ -551,6 +792,7 @@ class TgUploader:
         if self.__thumb is not None and not await aiopath.exists(self.__thumb):
             self.__thumb = None
         thumb = self.__thumb
+        ss_thumb, self.__ss_thumb = self.__ss_thumb, None
         self.__is_corrupted = False
         try:
             is_video, is_audio, is_image = await get_document_type(self.__up_path)
@@ -573,7 +815,7 @@ class TgUploader:
             ):
                 key = "documents"
                 if is_video and thumb is None:
-                    thumb = await take_ss(self.__up_path, None)
+                    thumb = ss_thumb or await take_ss(self.__up_path, None)
                 if self.__is_cancelled:
                     return
                 buttons = await self.__buttons(self.__up_path, is_video)
@@ -608,7 +850,7 @@ class TgUploader:
                 key = "videos"
                 duration = (await get_media_info(self.__up_path))[0]
                 if thumb is None:
-                    thumb = await take_ss(self.__up_path, duration)
+                    thumb = ss_thumb or await take_ss(self.__up_path, duration)
                 if thumb is not None:
                     with Image.open(thumb) as img:
                         width, height = img.size
@@ -627,7 +869,9 @@ class TgUploader:
                         new_path = ospath.join(
                             dirpath, f"{ospath.splitext(file_)[0]}.mp4"
                         )
-                        self.__up_path = await copy(self.__up_path, new_path)
+                        self.__up_path = await sync_to_async(
+                            copy_file, self.__up_path, new_path
+                        )
                     else:
                         new_path = f"{ospath.splitext(self.__up_path)[0]}.mp4"
                         await aiorename(self.__up_path, new_path)
@@ -733,6 +977,7 @@ class TgUploader:
             self.__retry_error = False
         except FloodWait as f:
             LOGGER.warning(str(f))
+            inc_metric("wzml_floodwait_seconds_total", f.value)
             await sleep(f.value)
         except Exception as err:
             self.__retry_error = True
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+from os import link, path as ospath
+from asyncio import Event, wait_for, current_task, TimeoutError
+from contextlib import suppress
+from aiofiles.os import path as aiopath, remove as aioremove, makedirs
+from natsort import natsorted
+
+from bot import LOGGER, bot_loop, config_dict, download_dict
+from bot.helper.ext_utils.bot_utils import sync_to_async
+from bot.helper.ext_utils.fs_utils import clean_download
+from bot.helper.mirror_utils.upload_utils.pyrogramEngine import TgUploader
+
+
+def is_streamable(listener):
+    return (
+        config_dict["STREAM_LEECH"]
+        and listener.isLeech
+        and listener.engine in ["qBit", "Aria2"]
+        and not (
+            listener.extract
+            or listener.compress
+            or listener.join
+            or listener.seed
+            or listener.sameDir
+            or listener.user_dict.get("lmeta")
+            or config_dict["METADATA"]
+        )
+    )
+
+
+class StreamLeech:
+    def __init__(self, listener):
+        self.__listener = listener
+        self.__path = f"{listener.dir}_stream"
+        self.__streamed = set()
+        self.__stop_event = Event()
+        self.__task = None
+        self.uploader = TgUploader(None, listener.dir, listener)
+        self.uploader.split_size = (
+            listener.user_dict.get("split_size") or config_dict["LEECH_SPLIT_SIZE"]
+        )
+        self.uploaded_size = 0
+
+    def start(self):
+        self.__task = bot_loop.create_task(self.__stream())
+
+    @staticmethod
+    def __order(files):
+        dirs = {}
+        for f_path, done in files:
+            dirpath, file_ = ospath.split(f_path)
+            dirs.setdefault(dirpath, {})[file_] = done
+        return [
+            (dirpath, file_, dirs[dirpath][file_])
+            for dirpath in sorted(dirs)
+            for file_ in natsorted(dirs[dirpath])
+        ]
+
+    async def __stream(self):
+        uid = self.__listener.uid
+        while not self.__stop_event.is_set():
+            with suppress(TimeoutError):
+                await wait_for(self.__stop_event.wait(), 5)
+            if self.__stop_event.is_set():
+                return
+            if not hasattr(task := download_dict.get(uid), "stream_files"):
+                continue
+            try:
+                files = self.__order(await sync_to_async(task.stream_files))
+            except Exception as e:
+                LOGGER.error(f"{e}: Stream leech, while getting files. Uid: {uid}")
+                continue
+            if len(files) < 2:
+                continue
+            if self.uploader.name is None:
+                self.uploader.name = task.name()
+            for dirpath, file_, done in files:
+                if ospath.join(dirpath, file_) in self.__streamed:
+                    continue
+                if not done or self.__stop_event.is_set():
+                    break
+                try:
+                    if not await self.__upload(dirpath, file_):
+                        return
+                except Exception as e:
+                    LOGGER.error(f"{e}: Stream leech stopped. Path: {dirpath}/{file_}")
+                    return
+
+    async def __upload(self, dirpath, file_):
+        f_path = ospath.join(dirpath, file_)
+        if not dirpath.startswith(self.__listener.dir) or not await aiopath.exists(
+            f_path
+        ):
+            return False
+        s_dir = dirpath.replace(self.__listener.dir, self.__path, 1)
+        s_path = ospath.join(s_dir, file_)
+        await makedirs(s_dir, exist_ok=True)
+        await sync_to_async(link, f_path, s_path)
+        size = await aiopath.getsize(s_path)
+        if not await self.uploader.stream_upload(s_dir, [file_]):
+            return False
+        self.__streamed.add(f_path)
+        self.uploaded_size += size
+        return True
+
+    async def stop(self):
+        self.__stop_event.set()
+        if self.__task is not None:
+            await self.__task
+        for f_path in self.__streamed:
+            with suppress(Exception):
+                await aioremove(f_path)
+        await clean_download(self.__path)
+        if self.__streamed:
+            LOGGER.info(
+                f"Streamed {len(self.__streamed)} files while downloading: {self.uploader.name}"
+            )
+
+    async def cancel(self):
+        self.__stop_event.set()
+        if self.__task is not None and self.__task is not current_task():
+            self.__task.cancel()
+        await clean_download(self.__path)
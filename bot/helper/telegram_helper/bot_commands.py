@@ -68,6 +68,7 @@ class _BotCommands:
         self.StatsCommand = [f"stats{CMD_SUFFIX}", f"st{CMD_SUFFIX}"]
         self.HelpCommand = f"help{CMD_SUFFIX}"
         self.LogCommand = f"log{CMD_SUFFIX}"
+        self.PerfCommand = f"perf{CMD_SUFFIX}"
         self.ShellCommand = f"shell{CMD_SUFFIX}"
         self.EvalCommand = f"eval{CMD_SUFFIX}"
         self.ExecCommand = f"exec{CMD_SUFFIX}"
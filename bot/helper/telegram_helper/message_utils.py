@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 from traceback import format_exc
-from asyncio import sleep
+from asyncio import sleep, gather
 from aiofiles.os import remove as aioremove
 from random import choice as rchoice
 from time import time
@@ -36,20 +36,21 @@ from bot import (
     Interval,
     bot,
     user,
-    download_dict_lock,
 )
 from bot.helper.ext_utils.bot_utils import (
-    get_readable_message,
     setInterval,
-    sync_to_async,
     download_image_url,
     fetch_user_tds,
     fetch_user_dumps,
     new_thread,
 )
+from bot.helper.ext_utils.status_snapshot import get_status_snapshot, get_status_page
+from bot.helper.ext_utils.bot_metrics import inc_metric
 from bot.helper.telegram_helper.button_build import ButtonMaker
 from bot.helper.ext_utils.exceptions import TgLinkException
 
+status_edits = set()
+
 
 async def sendMessage(message, text, buttons=None, photo=None, **kwargs):
     try:
@@ -91,6 +92,7 @@ async def sendMessage(message, text, buttons=None, photo=None, **kwargs):
         )
     except FloodWait as f:
         LOGGER.warning(str(f))
+        inc_metric("wzml_floodwait_seconds_total", f.value)
         await sleep(f.value * 1.2)
         return await sendMessage(message, text, buttons, photo)
     except ReplyMarkupInvalid:
@@ -133,6 +135,7 @@ async def sendCustomMsg(chat_id, text, buttons=None, photo=None, debug=False):
         )
     except FloodWait as f:
         LOGGER.warning(str(f))
+        inc_metric("wzml_floodwait_seconds_total", f.value)
         await sleep(f.value * 1.2)
         return await sendCustomMsg(chat_id, text, buttons, photo)
     except ReplyMarkupInvalid:
@@ -199,6 +202,7 @@ async def sendMultiMessage(chat_ids, text, buttons=None, photo=None):
             msg_dict[f"{chat.id}:{topic_id}"] = sent
         except FloodWait as f:
             LOGGER.warning(str(f))
+            inc_metric("wzml_floodwait_seconds_total", f.value)
             await sleep(f.value * 1.2)
             return await sendMultiMessage(chat_ids, text, buttons, photo)
         except Exception as e:
@@ -220,6 +224,7 @@ async def editMessage(message, text, buttons=None, photo=None):
         )
     except FloodWait as f:
         LOGGER.warning(str(f))
+        inc_metric("wzml_floodwait_seconds_total", f.value)
         await sleep(f.value * 1.2)
         return await editMessage(message, text, buttons, photo)
     except (MessageNotModified, MessageEmpty):
@@ -252,6 +257,7 @@ async def sendFile(message, file, caption=None, buttons=None):
         )
     except FloodWait as f:
         LOGGER.warning(str(f))
+        inc_metric("wzml_floodwait_seconds_total", f.value)
         await sleep(f.value * 1.2)
         return await sendFile(message, file, caption)
     except Exception as e:
@@ -277,6 +283,7 @@ async def sendRss(text):
             )
     except FloodWait as f:
         LOGGER.warning(str(f))
+        inc_metric("wzml_floodwait_seconds_total", f.value)
         await sleep(f.value * 1.2)
         return await sendRss(text)
     except Exception as e:
@@ -400,36 +407,52 @@ async def get_tg_link_content(link, user_id, decrypter=None):
         )
 
 
-async def update_all_messages(force=False):
+async def __edit_status(chat_id, status, snapshot):
+    msg, buttons, page_hash = await get_status_page(snapshot, status[2])
+    if msg is None or page_hash == status[3]:
+        return
+    rmsg = await editMessage(status[0], msg, buttons, "IMAGES")
     async with status_reply_dict_lock:
-        if (
-            not status_reply_dict
-            or not Interval
-            or (not force and time() - list(status_reply_dict.values())[0][1] < 3)
-        ):
+        if status_reply_dict.get(chat_id) is not status:
             return
-        for chat_id in list(status_reply_dict.keys()):
-            status_reply_dict[chat_id][1] = time()
-    async with download_dict_lock:
-        msg, buttons = await sync_to_async(get_readable_message)
-    if msg is None:
-        return
+        if isinstance(rmsg, str) and rmsg.startswith("Telegram says: [400"):
+            del status_reply_dict[chat_id]
+            return
+        status[0].text = msg
+        status[1] = time()
+        status[3] = page_hash
+
+
+async def update_all_messages(force=False):
     async with status_reply_dict_lock:
-        for chat_id in list(status_reply_dict.keys()):
-            if status_reply_dict[chat_id] and msg != status_reply_dict[chat_id][0].text:
-                rmsg = await editMessage(
-                    status_reply_dict[chat_id][0], msg, buttons, "IMAGES"
-                )
-                if isinstance(rmsg, str) and rmsg.startswith("Telegram says: [400"):
-                    del status_reply_dict[chat_id]
-                    continue
-                status_reply_dict[chat_id][0].text = msg
-                status_reply_dict[chat_id][1] = time()
+        if not status_reply_dict or not Interval:
+            return
+        chats = {
+            chat_id: status
+            for chat_id, status in status_reply_dict.items()
+            if chat_id not in status_edits and (force or time() - status[1] >= 3)
+        }
+        if not chats:
+            return
+        for status in chats.values():
+            status[1] = time()
+        status_edits.update(chats)
+    try:
+        snapshot = await get_status_snapshot()
+        await gather(
+            *(
+                __edit_status(chat_id, status, snapshot)
+                for chat_id, status in chats.items()
+            )
+        )
+    finally:
+        async with status_reply_dict_lock:
+            status_edits.difference_update(chats)
 
 
 async def sendStatusMessage(msg):
-    async with download_dict_lock:
-        progress, buttons = await sync_to_async(get_readable_message)
+    snapshot = await get_status_snapshot(0)
+    progress, buttons, page_hash = await get_status_page(snapshot)
     if progress is None:
         return
     async with status_reply_dict_lock:
@@ -443,7 +466,7 @@ async def sendStatusMessage(msg):
                 message.caption = progress
             else:
                 message.text = progress
-        status_reply_dict[chat_id] = [message, time()]
+        status_reply_dict[chat_id] = [message, time(), 1, page_hash]
         if not Interval:
             Interval.append(
                 setInterval(config_dict["STATUS_UPDATE_INTERVAL"], update_all_messages)
@@ -2,6 +2,7 @@
 from os import listdir
 from importlib import import_module
 from random import choice as rchoice
+from string import Formatter
 from bot import config_dict, LOGGER
 from bot.helper.themes import wzml_minimal
 
@@ -10,23 +11,72 @@ for theme in listdir("bot/helper/themes"):
     if theme.startswith("wzml_") and theme.endswith(".py"):
         AVL_THEMES[theme[5:-3]] = import_module(f"bot.helper.themes.{theme[:-3]}")
 
+THEME_CACHE = {"name": None, "templates": {}}
+FORMATTER = Formatter()
+
+
+def __parse(text):
+    template = tuple(FORMATTER.parse(text))
+    if any(spec or conversion for _, _, spec, conversion in template):
+        return template
+    return "".join(
+        literal.replace("%", "%%") + ("" if field is None else f"%({field})s")
+        for literal, field, _, _ in template
+    )
 
-def BotTheme(var_name, **format_vars):
-    text = None
-    theme_ = config_dict["BOT_THEME"]
 
+def __render(template, format_vars):
+    if isinstance(template, str):
+        return template % format_vars
+    return "".join(
+        literal
+        + (
+            ""
+            if field is None
+            else format(FORMATTER.convert_field(format_vars[field], conversion), spec)
+        )
+        for literal, field, spec, conversion in template
+    )
+
+
+def __compile_theme(theme_):
+    templates = {
+        var_name: __parse(text)
+        for var_name, text in vars(wzml_minimal.WZMLStyle).items()
+        if isinstance(text, str) and not var_name.startswith("__")
+    }
     if theme_ in AVL_THEMES:
-        text = getattr(AVL_THEMES[theme_].WZMLStyle(), var_name, None)
+        style = AVL_THEMES[theme_].WZMLStyle
+    elif theme_ == "random":
+        style = rchoice(list(AVL_THEMES.values())).WZMLStyle
+        LOGGER.info(f"Random Theme Chosen: {style.__module__}")
+    else:
+        return templates
+    for var_name in list(templates):
+        text = getattr(style, var_name, None)
         if text is None:
             LOGGER.error(
                 f"{var_name} not Found in {theme_}. Please recheck with Official Repo"
             )
-    elif theme_ == "random":
-        rantheme = rchoice(list(AVL_THEMES.values()))
-        LOGGER.info(f"Random Theme Chosen: {rantheme}")
-        text = getattr(rantheme.WZMLStyle(), var_name, None)
+            continue
+        templates[var_name] = __parse(text)
+    return templates
+
+
+def get_theme():
+    theme_ = config_dict["BOT_THEME"]
+    if THEME_CACHE["name"] != theme_:
+        THEME_CACHE["templates"] = __compile_theme(theme_)
+        THEME_CACHE["name"] = theme_
+    return THEME_CACHE["templates"]
+
+
+def BotTheme(var_name, **format_vars):
+    return __render(get_theme()[var_name], format_vars)
 
-    if text is None:
-        text = getattr(wzml_minimal.WZMLStyle(), var_name)
 
-    return text.format_map(format_vars)
+def BotThemes(parts):
+    templates = get_theme()
+    return "".join(
+        __render(templates[var_name], format_vars) for var_name, format_vars in parts
+    )
@@ -74,6 +74,12 @@ class WZMLStyle:
 ┠ <b>Pkts Received:</b> {pkt_recv}k
 ┖ <b>Total I/O Data:</b> {tl_data}
 
+⌬ <b><i>I/O RATES :</i></b> <i>(1m | 5m | 15m)</i>
+┠ <b>Upload:</b> {up_rate}
+┠ <b>Download:</b> {dl_rate}
+┠ <b>Disk Read:</b> {read_rate}
+┖ <b>Disk Write:</b> {write_rate}
+
 ┎ <b>CPU :</b>
 ┃ {cpu_bar} {cpu}%
 ┠ <b>CPU Frequency :</b> {cpu_freq}
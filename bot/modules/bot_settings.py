@@ -61,9 +61,14 @@ handler_dict = {}
 default_values = {
     "AUTO_DELETE_MESSAGE_DURATION": 30,
     "DEFAULT_UPLOAD": "gd",
+    "QUEUE_MODE": "fair",
     "DOWNLOAD_DIR": "/usr/src/app/downloads/",
     "LEECH_SPLIT_SIZE": MAX_SPLIT_SIZE,
     "RSS_DELAY": 600,
+    "UPLOAD_LOOKAHEAD": 2,
+    "TG_DOWNLOAD_WORKERS": 4,
+    "TG_UPLOAD_WORKERS": 4,
+    "METADATA_WORKERS": 4,
     "STATUS_UPDATE_INTERVAL": 10,
     "SEARCH_LIMIT": 0,
     "UPSTREAM_BRANCH": "master",
@@ -84,11 +89,13 @@ bool_vars = [
     "SHOW_MEDIAINFO",
     "SOURCE_LINK",
     "SAFE_MODE",
+    "PERF_SPANS_DB",
     "SHOW_EXTRA_CMDS",
     "IS_TEAM_DRIVE",
     "USE_SERVICE_ACCOUNTS",
     "WEB_PINCODE",
     "EQUAL_SPLITS",
+    "STREAM_LEECH",
     "DISABLE_DRIVE_LINK",
     "DELETE_LINKS",
     "CLEAN_LOG_MSG",
@@ -96,6 +103,7 @@ bool_vars = [
     "INCOMPLETE_TASK_NOTIFIER",
     "UPGRADE_PACKAGES",
     "SCREENSHOTS_MODE",
+    "SCREENSHOTS_SHEET",
 ]
 
 
@@ -188,6 +196,9 @@ async def load_config():
 
     METADATA = environ.get("METADATA", "")
 
+    METADATA_WORKERS = environ.get("METADATA_WORKERS", "")
+    METADATA_WORKERS = 4 if len(METADATA_WORKERS) == 0 else int(METADATA_WORKERS)
+
     GDTOT_CRYPT = environ.get("GDTOT_CRYPT", "")
     if len(GDTOT_CRYPT) == 0:
         GDTOT_CRYPT = ""
@@ -338,6 +349,13 @@ async def load_config():
     QUEUE_UPLOAD = environ.get("QUEUE_UPLOAD", "")
     QUEUE_UPLOAD = "" if len(QUEUE_UPLOAD) == 0 else int(QUEUE_UPLOAD)
 
+    QUEUE_PROCESS = environ.get("QUEUE_PROCESS", "")
+    QUEUE_PROCESS = "" if len(QUEUE_PROCESS) == 0 else int(QUEUE_PROCESS)
+
+    QUEUE_MODE = environ.get("QUEUE_MODE", "").lower()
+    if QUEUE_MODE not in ["fifo", "sjf"]:
+        QUEUE_MODE = "fair"
+
     INCOMPLETE_TASK_NOTIFIER = environ.get("INCOMPLETE_TASK_NOTIFIER", "")
     INCOMPLETE_TASK_NOTIFIER = INCOMPLETE_TASK_NOTIFIER.lower() == "true"
     if not INCOMPLETE_TASK_NOTIFIER and DATABASE_URL:
@@ -379,6 +397,18 @@ async def load_config():
     EQUAL_SPLITS = environ.get("EQUAL_SPLITS", "")
     EQUAL_SPLITS = EQUAL_SPLITS.lower() == "true"
 
+    STREAM_LEECH = environ.get("STREAM_LEECH", "")
+    STREAM_LEECH = STREAM_LEECH.lower() == "true"
+
+    UPLOAD_LOOKAHEAD = environ.get("UPLOAD_LOOKAHEAD", "")
+    UPLOAD_LOOKAHEAD = 2 if len(UPLOAD_LOOKAHEAD) == 0 else int(UPLOAD_LOOKAHEAD)
+
+    TG_DOWNLOAD_WORKERS = environ.get("TG_DOWNLOAD_WORKERS", "")
+    TG_DOWNLOAD_WORKERS = 4 if len(TG_DOWNLOAD_WORKERS) == 0 else int(TG_DOWNLOAD_WORKERS)
+
+    TG_UPLOAD_WORKERS = environ.get("TG_UPLOAD_WORKERS", "")
+    TG_UPLOAD_WORKERS = 4 if len(TG_UPLOAD_WORKERS) == 0 else int(TG_UPLOAD_WORKERS)
+
     MEDIA_GROUP = environ.get("MEDIA_GROUP", "")
     MEDIA_GROUP = MEDIA_GROUP.lower() == "true"
 
@@ -543,9 +573,15 @@ async def load_config():
     SAFE_MODE = environ.get("SAFE_MODE", "")
     SAFE_MODE = SAFE_MODE.lower() == "true"
 
+    PERF_SPANS_DB = environ.get("PERF_SPANS_DB", "")
+    PERF_SPANS_DB = PERF_SPANS_DB.lower() == "true"
+
     SCREENSHOTS_MODE = environ.get("SCREENSHOTS_MODE", "")
     SCREENSHOTS_MODE = SCREENSHOTS_MODE.lower() == "true"
 
+    SCREENSHOTS_SHEET = environ.get("SCREENSHOTS_SHEET", "")
+    SCREENSHOTS_SHEET = SCREENSHOTS_SHEET.lower() == "true"
+
     CLEAN_LOG_MSG = environ.get("CLEAN_LOG_MSG", "")
     CLEAN_LOG_MSG = CLEAN_LOG_MSG.lower() == "true"
 
@@ -719,6 +755,10 @@ async def load_config():
             "GDTOT_CRYPT": GDTOT_CRYPT,
             "JIODRIVE_TOKEN": JIODRIVE_TOKEN,
             "EQUAL_SPLITS": EQUAL_SPLITS,
+            "STREAM_LEECH": STREAM_LEECH,
+            "UPLOAD_LOOKAHEAD": UPLOAD_LOOKAHEAD,
+            "TG_DOWNLOAD_WORKERS": TG_DOWNLOAD_WORKERS,
+            "TG_UPLOAD_WORKERS": TG_UPLOAD_WORKERS,
             "EXTENSION_FILTER": EXTENSION_FILTER,
             "GDRIVE_ID": GDRIVE_ID,
             "INCOMPLETE_TASK_NOTIFIER": INCOMPLETE_TASK_NOTIFIER,
@@ -738,11 +778,14 @@ async def load_config():
             "MEGA_EMAIL": MEGA_EMAIL,
             "MEGA_PASSWORD": MEGA_PASSWORD,
             "METADATA": METADATA,
+            "METADATA_WORKERS": METADATA_WORKERS,
             "MDL_TEMPLATE": MDL_TEMPLATE,
             "OWNER_ID": OWNER_ID,
             "QUEUE_ALL": QUEUE_ALL,
             "QUEUE_DOWNLOAD": QUEUE_DOWNLOAD,
             "QUEUE_UPLOAD": QUEUE_UPLOAD,
+            "QUEUE_PROCESS": QUEUE_PROCESS,
+            "QUEUE_MODE": QUEUE_MODE,
             "RCLONE_FLAGS": RCLONE_FLAGS,
             "RCLONE_PATH": RCLONE_PATH,
             "RCLONE_SERVE_URL": RCLONE_SERVE_URL,
@@ -753,12 +796,14 @@ async def load_config():
             "RSS_DELAY": RSS_DELAY,
             "SAVE_MSG": SAVE_MSG,
             "SAFE_MODE": SAFE_MODE,
+            "PERF_SPANS_DB": PERF_SPANS_DB,
             "SEARCH_API_LINK": SEARCH_API_LINK,
             "SEARCH_LIMIT": SEARCH_LIMIT,
             "SEARCH_PLUGINS": SEARCH_PLUGINS,
             "SET_COMMANDS": SET_COMMANDS,
             "SHOW_MEDIAINFO": SHOW_MEDIAINFO,
             "SCREENSHOTS_MODE": SCREENSHOTS_MODE,
+            "SCREENSHOTS_SHEET": SCREENSHOTS_SHEET,
             "CLEAN_LOG_MSG": CLEAN_LOG_MSG,
             "SHOW_EXTRA_CMDS": SHOW_EXTRA_CMDS,
             "SOURCE_LINK": SOURCE_LINK,
@@ -998,7 +1043,13 @@ async def edit_variable(_, message, pre_message, key):
         await DbManger().update_config({key: value})
     if key in ["SEARCH_PLUGINS", "SEARCH_API_LINK"]:
         await initiate_search_tools()
-    elif key in ["QUEUE_ALL", "QUEUE_DOWNLOAD", "QUEUE_UPLOAD"]:
+    elif key in [
+        "QUEUE_ALL",
+        "QUEUE_DOWNLOAD",
+        "QUEUE_UPLOAD",
+        "QUEUE_PROCESS",
+        "QUEUE_MODE",
+    ]:
         await start_from_queued()
     elif key in [
         "RCLONE_SERVE_URL",
@@ -1297,7 +1348,13 @@ async def edit_bot_settings(client, query):
             await DbManger().update_config({data[2]: value})
         if data[2] in ["SEARCH_PLUGINS", "SEARCH_API_LINK"]:
             await initiate_search_tools()
-        elif data[2] in ["QUEUE_ALL", "QUEUE_DOWNLOAD", "QUEUE_UPLOAD"]:
+        elif data[2] in [
+            "QUEUE_ALL",
+            "QUEUE_DOWNLOAD",
+            "QUEUE_UPLOAD",
+            "QUEUE_PROCESS",
+            "QUEUE_MODE",
+        ]:
             await start_from_queued()
         elif data[2] in [
             "RCLONE_SERVE_URL",
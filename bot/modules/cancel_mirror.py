@@ -68,9 +68,7 @@ async def cancel_all(status):
 
 
 async def cancell_all_buttons(_, message):
-    async with download_dict_lock:
-        count = len(download_dict)
-    if count == 0:
+    if not download_dict.published[1]:
         await sendMessage(message, "No active tasks!")
         return
     buttons = button_build.ButtonMaker()
@@ -82,6 +80,7 @@ async def cancell_all_buttons(_, message):
     buttons.ibutton("Archiving", f"canall {MirrorStatus.STATUS_ARCHIVING}")
     buttons.ibutton("QueuedDl", f"canall {MirrorStatus.STATUS_QUEUEDL}")
     buttons.ibutton("QueuedUp", f"canall {MirrorStatus.STATUS_QUEUEUP}")
+    buttons.ibutton("QueuedPr", f"canall {MirrorStatus.STATUS_QUEUEPR}")
     buttons.ibutton("Paused", f"canall {MirrorStatus.STATUS_PAUSED}")
     buttons.ibutton("All", "canall all")
     buttons.ibutton("Close", "canall close")
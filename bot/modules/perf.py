@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+from pyrogram.handlers import MessageHandler
+from pyrogram.filters import command
+
+from bot import bot
+from bot.helper.telegram_helper.message_utils import sendMessage
+from bot.helper.ext_utils.bot_utils import new_task, get_readable_file_size
+from bot.helper.ext_utils.perf_spans import get_perf_stats
+from bot.helper.telegram_helper.filters import CustomFilters
+from bot.helper.telegram_helper.bot_commands import BotCommands
+
+
+def __perf_table(stats):
+    rows = [f"{'Stage':<18}{'N':>5}{'p50':>8}{'p95':>8}{'p99':>8}{'CPU':>5}  Bytes"]
+    for group, stat in stats.items():
+        name = group if isinstance(group, str) else "/".join(group)
+        rows.append(
+            f"{name[:17]:<18}{stat['count']:>5}{stat['p50']:>7.1f}s{stat['p95']:>7.1f}s"
+            f"{stat['p99']:>7.1f}s{stat['cpu']:>5}  {get_readable_file_size(stat['bytes'])}"
+        )
+    return "\n".join(rows)
+
+
+@new_task
+async def perf_report(_, message):
+    args = message.text.split()
+    minutes = int(args[1]) if len(args) > 1 and args[1].isdigit() else 60
+    window = minutes * 60
+    by_stage = get_perf_stats(window, lambda span: span.stage)
+    if not by_stage:
+        await sendMessage(message, f"<i>No task stages finished in last {minutes}m.</i>")
+        return
+    by_engine = get_perf_stats(window, lambda span: (span.engine, span.stage))
+    msg = f"⌬ <b><i>Task Stage Timings</i></b> <i>(last {minutes}m)</i>\n\n"
+    msg += f"<b>By Stage :</b>\n<pre>{__perf_table(by_stage)}</pre>\n\n"
+    msg += f"<b>By Engine :</b>\n<pre>{__perf_table(by_engine)}</pre>\n\n"
+    msg += "<i>CPU: spans whose child processes used over half of the wall time.</i>"
+    await sendMessage(message, msg)
+
+
+bot.add_handler(
+    MessageHandler(
+        perf_report, filters=command(BotCommands.PerfCommand) & CustomFilters.sudo
+    )
+)
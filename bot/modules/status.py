@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 from pyrogram.handlers import MessageHandler, CallbackQueryHandler
 from pyrogram.filters import command, regex
-from psutil import cpu_percent, virtual_memory, disk_usage
 from time import time
 from asyncio import sleep
 
@@ -9,7 +8,6 @@ from bot import (
     bot_cache,
     status_reply_dict_lock,
     download_dict,
-    download_dict_lock,
     botStartTime,
     Interval,
     config_dict,
@@ -34,22 +32,22 @@ from bot.helper.ext_utils.bot_utils import (
     setInterval,
     new_task,
 )
+from bot.helper.ext_utils.sys_monitor import get_sys_sample
 from bot.helper.themes import BotTheme
 
 
 @new_task
 async def mirror_status(_, message):
-    async with download_dict_lock:
-        count = len(download_dict)
-    if count == 0:
+    if not download_dict.published[1]:
         currentTime = get_readable_time(time() - botStartTime)
-        free = get_readable_file_size(disk_usage(config_dict["DOWNLOAD_DIR"]).free)
+        sample = get_sys_sample()
+        free = get_readable_file_size(sample.disk.free)
         msg = BotTheme(
             "NO_ACTIVE_DL",
-            cpu=cpu_percent(),
+            cpu=sample.cpu,
             free=free,
-            free_p=round(100 - disk_usage(config_dict["DOWNLOAD_DIR"]).percent, 1),
-            ram=virtual_memory().percent,
+            free_p=round(100 - sample.disk.percent, 1),
+            ram=sample.memory.percent,
             uptime=currentTime,
         )
         reply_message = await sendMessage(message, msg)
@@ -91,7 +89,7 @@ async def status_pages(_, query):
         await sleep(1.5)
         await update_all_messages(True)
     elif data[1] in ["nex", "pre"]:
-        await turn_page(data)
+        await turn_page(data, query.message.chat.id)
         await update_all_messages(True)
     elif data[1] == "close":
         await delete_all_messages()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+from sys import modules
+from types import ModuleType
+from logging import getLogger
+from timeit import repeat
+
+bot = ModuleType("bot")
+bot.__path__ = ["bot"]
+bot.config_dict = {"BOT_THEME": "minimal"}
+bot.LOGGER = getLogger(__name__)
+modules["bot"] = bot
+
+from bot.helper.themes import AVL_THEMES, BotTheme, BotThemes, wzml_minimal
+
+TASKS = 500
+BLOCK = [
+    ("STATUS_NAME", {"Name": "Some.Movie.2024.1080p.WEB-DL.mkv"}),
+    ("BAR", {"Bar": "■■■■■■□□□□□□ 48.5%"}),
+    ("PROCESSED", {"Processed": "1.21GB of 2.50GB"}),
+    ("STATUS", {"Status": "Download", "Url": "https://t.me/c/1/2"}),
+    ("ETA", {"Eta": "3m12s"}),
+    ("SPEED", {"Speed": "6.71MB/s"}),
+    ("ELAPSED", {"Elapsed": "2m01s"}),
+    ("ENGINE", {"Engine": "Aria2c v1.36.0"}),
+    ("STA_MODE", {"Mode": "#Leech"}),
+    ("SEEDERS", {"Seeders": 12}),
+    ("LEECHERS", {"Leechers": 3}),
+    ("USER", {"User": "<a href='tg://user?id=1'>user</a>"}),
+    ("ID", {"Id": 1}),
+    ("BTSEL", {"Btsel": "/btsel_abc"}),
+    ("CANCEL", {"Cancel": "/cancel_abc"}),
+]
+
+
+def OldBotTheme(var_name, **format_vars):
+    text = None
+    theme_ = bot.config_dict["BOT_THEME"]
+    if theme_ in AVL_THEMES:
+        text = getattr(AVL_THEMES[theme_].WZMLStyle(), var_name, None)
+    if text is None:
+        text = getattr(wzml_minimal.WZMLStyle(), var_name)
+    return text.format_map(format_vars)
+
+
+def before():
+    msg = ""
+    for _ in range(TASKS):
+        for var_name, format_vars in BLOCK:
+            msg += OldBotTheme(var_name, **format_vars)
+    return msg
+
+
+def per_call():
+    msg = ""
+    for _ in range(TASKS):
+        for var_name, format_vars in BLOCK:
+            msg += BotTheme(var_name, **format_vars)
+    return msg
+
+
+def bulk():
+    return BotThemes(BLOCK * TASKS)
+
+
+if __name__ == "__main__":
+    assert before() == per_call() == bulk()
+    for name, func in [("before", before), ("BotTheme", per_call), ("BotThemes", bulk)]:
+        best = min(repeat(func, number=20, repeat=25)) / 20
+        print(f"{name:>9}: {best * 1000:.2f} ms per {TASKS}-task page")
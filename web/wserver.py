@@ -783,6 +783,15 @@ def set_priority(id_):
     return list_torrent_contents(id_)
 
 
+@app.route("/metrics")
+def metrics():
+    try:
+        with open("metrics.prom") as f:
+            return f.read(), 200, {"Content-Type": "text/plain; version=0.0.4"}
+    except FileNotFoundError:
+        return "# metrics not published yet\n", 503, {"Content-Type": "text/plain"}
+
+
 @app.route("/")
 def homepage():
     return """